@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Measure moves per second and decision latency of concurrent async games.
+
+The policy stand-in picks random legal actions after a fixed delay, like a
+remote policy endpoint answering a batch.
+"""
+
+import argparse
+import asyncio
+
+import numpy as np
+
+from gym_azul.envs.async_azul_env import GameManager
+
+
+def make_policy(delay):
+    np_random = np.random.RandomState(0)
+
+    async def policy(observations, action_masks):
+        await asyncio.sleep(delay)
+        actions = np.argmax(
+            action_masks * np_random.rand(*action_masks.shape), axis=1)
+        return np.column_stack(np.unravel_index(actions, (6, 5, 5)))
+    return policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=2000,
+                        help='games to play with 100 envs or more; runs with '
+                        'fewer envs play proportionally fewer')
+    parser.add_argument('--envs', type=int, nargs='+',
+                        default=[1, 100, 1000])
+    parser.add_argument('--delay', type=float, default=0.002,
+                        help='seconds the policy takes per batch')
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    for num_envs in args.envs:
+        manager = GameManager(make_policy(args.delay), num_envs,
+                              args.max_batch_size)
+        manager.run(max(args.games * min(num_envs, 100) // 100, 1))
+        stats = manager.stats()
+        print('%5d envs %10.0f moves/s  batch %6.1f  latency p50 %.4fs '
+              'p99 %.4fs' % (num_envs, stats['moves_per_second'],
+                             stats['mean_batch_size'], stats['latency'][0.5],
+                             stats['latency'][0.99]))
+
+
+if __name__ == '__main__':
+    main()
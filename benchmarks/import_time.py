@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Time `import gym_azul` plus `gym.make('azul-v0')` in fresh interpreters."""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+CODE = "import gym, gym_azul; gym.make('azul-v0')"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, '-c', 'import gym'], check=True)
+    baseline, total = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import gym'], check=True)
+        baseline.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', CODE], check=True)
+        total.append(time.perf_counter() - start)
+
+    print('import gym:               %.1f ms' %
+          (statistics.median(baseline) * 1e3))
+    print('import gym_azul + make:   %.1f ms' %
+          (statistics.median(total) * 1e3))
+    print('gym_azul overhead:        %.1f ms' %
+          ((statistics.median(total) - statistics.median(baseline)) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Measure adversary moves per second of envs stepped in turn from one
+process, with the model in process or behind an `InferenceServer`."""
+
+import argparse
+import time
+
+import numpy as np
+
+from gym_azul.envs import AzulEnv
+from gym_azul.envs.inference_server import InferenceServer
+
+
+class MlpModel:
+    """Stand-in for a PPO2 policy: one hidden layer and softmax heads."""
+
+    def __init__(self, num_fields=67, num_hidden=64, seed=0):
+        np_random = np.random.RandomState(seed)
+        self.hidden = np_random.randn(num_fields, num_hidden) / num_fields
+        self.heads = [np_random.randn(num_hidden, n) for n in (6, 5, 5)]
+
+    def action_probability(self, observations):
+        hidden = np.tanh(np.asarray(observations, np.float32) @ self.hidden)
+        probabilities = []
+        for head in self.heads:
+            logits = np.exp(hidden @ head)
+            probabilities.append(logits / logits.sum(axis=1, keepdims=True))
+        return probabilities
+
+
+def load_mlp_model(model_path):
+    return MlpModel()
+
+
+def play(envs, num_steps):
+    """Steps every env in turn, like a DummyVecEnv, and returns the number
+    of adversary moves per second."""
+    for env in envs:
+        env.seed(0)
+        env.reset()
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        for env in envs:
+            # Legal picks, so that the adversary moves after every step
+            pick = np.flatnonzero(env.action_masks())[0]
+            action = np.unravel_index(pick, env.action_space.nvec)
+            if env.step(np.array(action))[2]:
+                env.reset()
+    return num_steps * len(envs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--envs', type=int, default=16)
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args()
+
+    model = MlpModel()
+    print('%-32s %10.0f moves/s' % ('in process', play(
+        [AzulEnv(adv_model=model) for _ in range(args.envs)], args.steps)))
+    for max_wait in (0.001, 0):
+        server = InferenceServer(None, max_wait=max_wait,
+                                 loader=load_mlp_model)
+        envs = [AzulEnv(adv_model=server.client())
+                for _ in range(args.envs)]
+        with server:
+            rate = play(envs, args.steps)
+        print('%-32s %10.0f moves/s (mean batch %.1f)' % (
+            'server, max_wait=%g' % max_wait, rate, server.mean_batch_size))
+
+    # One request for the observations of all the envs
+    server = InferenceServer(None, loader=load_mlp_model)
+    client = server.client()
+    observations = np.stack([env.reset() for env in envs])
+    with server:
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            client.action_probability(observations)
+        rate = args.steps * args.envs / (time.perf_counter() - start)
+    print('%-32s %10.0f observations/s' % ('server, one batched client',
+                                           rate))
+
+
+if __name__ == '__main__':
+    main()
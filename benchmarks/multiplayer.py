@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Measure random moves per second of AzulGame for 2, 3 and 4 players."""
+
+import argparse
+import time
+
+import numpy as np
+
+from gym_azul.envs.azul_game import AzulGame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=200)
+    args = parser.parse_args()
+
+    for num_players in AzulGame.NUM_FACTORIES:
+        game = AzulGame(num_players, np.random.RandomState(0))
+        np_random = game.np_random
+        num_moves = 0
+        start = time.perf_counter()
+        for _ in range(args.games):
+            game.reset()
+            while not game.done():
+                moves, _ = game.legal_moves()
+                game.play(*moves[np_random.randint(len(moves))])
+                num_moves += 1
+        elapsed = time.perf_counter() - start
+        print('%d players %10.0f moves/s' %
+              (num_players, num_moves / elapsed))
+
+
+if __name__ == '__main__':
+    main()
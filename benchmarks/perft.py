@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Count move sequences to a given depth from seeded starts (perft)."""
+
+import argparse
+import time
+
+from gym_azul.envs import AzulEnv
+from gym_azul.envs.moves import perft
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--wall-type', default='array')
+    args = parser.parse_args()
+
+    env = AzulEnv(wall_type=args.wall_type)
+    for seed in args.seeds:
+        env.seed(seed)
+        env.reset()
+        for depth in range(1, args.depth + 1):
+            start = time.perf_counter()
+            count = perft(env, depth)
+            elapsed = time.perf_counter() - start
+            print('seed %d depth %d: %12d sequences %10.0f /s' %
+                  (seed, depth, count, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
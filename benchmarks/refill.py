@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Measure factory refills (rounds) per second for refill buffer sizes."""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from gym_azul.envs import AzulEnv
+from gym_azul.envs.factories import Factories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--buffers', type=int, nargs='+',
+                        default=[0, 16, 256, 4096])
+    args = parser.parse_args()
+
+    for refill_buffer in args.buffers:
+        factories = Factories(AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE,
+                              AzulEnv.NUM_FACTORIES, np.random.RandomState(0),
+                              refill_buffer=refill_buffer)
+        elapsed = min(timeit.repeat(factories.reset, number=args.number,
+                                    repeat=3))
+        print('refill_buffer=%-5d %10.0f rounds/s' %
+              (refill_buffer, args.number / elapsed))
+
+
+if __name__ == '__main__':
+    main()
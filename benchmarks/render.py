@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Measure `AzulEnv.render('rgb_array')` frames per second over games."""
+
+import argparse
+import time
+
+from gym_azul.envs import AzulEnv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=20)
+    args = parser.parse_args()
+
+    env = AzulEnv()
+    env.seed(0)
+    num_frames = 0
+    elapsed = 0
+    for _ in range(args.games):
+        env.reset()
+        done = False
+        while not done:
+            _, _, done, _ = env.step(env.action_space.sample())
+            start = time.perf_counter()
+            env.render(mode='rgb_array')
+            elapsed += time.perf_counter() - start
+            num_frames += 1
+    print('%d frames, %.0f frames/s' % (num_frames, num_frames / elapsed))
+
+
+if __name__ == '__main__':
+    main()
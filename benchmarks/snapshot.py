@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Measure AzulEnv snapshots, restores and clones per second."""
+
+import argparse
+import copy
+import timeit
+
+from gym_azul.envs import AzulEnv
+
+
+def rate(function, number):
+    return number / min(timeit.repeat(function, number=number, repeat=3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument('--wall-type', default='array')
+    args = parser.parse_args()
+
+    env = AzulEnv(wall_type=args.wall_type)
+    env.seed(0)
+    env.reset()
+    for _ in range(10):
+        env.step(env.action_space.sample())
+    state = env.get_state()
+    game_state = env.get_state(include_rng=False)
+
+    print('snapshot size:           %d bytes (%d without RNG)' %
+          (len(state), len(game_state)))
+    print('get_state:               %.0f /s' %
+          rate(env.get_state, args.number))
+    print('get_state (no RNG):      %.0f /s' %
+          rate(lambda: env.get_state(include_rng=False), args.number))
+    print('set_state:               %.0f /s' %
+          rate(lambda: env.set_state(state), args.number))
+    print('set_state (no RNG):      %.0f /s' %
+          rate(lambda: env.set_state(game_state), args.number))
+    print('clone:                   %.0f /s' %
+          rate(env.clone, args.number // 10))
+    print('copy.deepcopy:           %.0f /s' %
+          rate(lambda: copy.deepcopy(env), args.number // 10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Time the hot paths of gym-azul and compare them with a baseline.
+
+Every benchmark reports operations per second, where an operation is a
+step, a reset, a frame, and so on (one per game in batched benchmarks).
+With `--baseline`, benchmarks slower than the baseline by more than
+`--tolerance` are flagged and the exit status is 1.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+import numpy as np
+
+from gym_azul.envs import AzulEnv, BatchedAzulEnv
+from gym_azul.envs.board import Board
+from gym_azul.envs.moves import generate_moves
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def legal_step(env):
+    # Plays random legal actions, starting a new game when one ends
+    np_random = np.random.RandomState(0)
+
+    def step():
+        picks = env.factories.legal_picks()
+        factory_idx, color_idx = divmod(
+            int(picks[np_random.randint(len(picks))]), env.NUM_COLORS)
+        _, _, done, _ = env.step(np.array(
+            [factory_idx, color_idx, np_random.randint(env.NUM_COLORS)]))
+        if done:
+            env.reset()
+    return step
+
+
+def make_env(**kwargs):
+    env = AzulEnv(**{'copy_observation': False, **kwargs})
+    env.seed(0)
+    env.reset()
+    return env
+
+
+@benchmark('env.step')
+def env_step():
+    return legal_step(make_env()), 1
+
+
+@benchmark('env.step[bitboard]')
+def env_step_bitboard():
+    return legal_step(make_env(wall_type='bitboard')), 1
+
+
+@benchmark('env.step[compact]')
+def env_step_compact():
+    return legal_step(make_env(factories_type='compact')), 1
+
+
+@benchmark('env.step[zobrist]')
+def env_step_zobrist():
+    return legal_step(make_env(wall_type='zobrist',
+                               factories_type='zobrist')), 1
+
+
+@benchmark('env.step[greedy]')
+def env_step_greedy():
+    return legal_step(make_env(adversary='greedy')), 1
+
+
+@benchmark('env.reset')
+def env_reset():
+    return make_env().reset, 1
+
+
+@benchmark('factories.reset')
+def factories_reset():
+    return make_env().factories.reset, 1
+
+
+@benchmark('factories.reset[buffer=256]')
+def factories_reset_buffered():
+    return make_env(refill_buffer=256).factories.reset, 1
+
+
+@benchmark('env.observation')
+def env_observation():
+    return make_env(copy_observation=True)._get_observation, 1
+
+
+@benchmark('env.observation[one_hot]')
+def env_observation_one_hot():
+    return make_env(observation_encoding='one_hot')._get_observation, 1
+
+
+@benchmark('env.observation[bit_planes]')
+def env_observation_bit_planes():
+    return make_env(observation_encoding='bit_planes')._get_observation, 1
+
+
+@benchmark('env.get_state')
+def env_get_state():
+    return make_env().get_state, 1
+
+
+@benchmark('env.set_state')
+def env_set_state():
+    env = make_env()
+    state = env.get_state()
+    return lambda: env.set_state(state), 1
+
+
+@benchmark('wall.compute_build_reward')
+def wall_compute_build_reward():
+    wall = make_env().wall
+    wall.state[:] = np.random.RandomState(0).rand(5, 5) < 0.5
+    wall.state[2, 3] = True
+    return lambda: wall.compute_build_reward(2, 3), 1
+
+
+@benchmark('moves.generate_moves')
+def moves_generate_moves():
+    env = make_env()
+    return lambda: generate_moves(env.factories, env.wall), 1
+
+
+@benchmark('board.render')
+def board_render():
+    # Redraws the positions of a game in order, as when recording it
+    env = make_env()
+    board = Board(1024, 1024, env.NUM_COLORS, env.NUM_FACTORIES)
+    step = legal_step(env)
+    states = []
+    while env.num_actions > 0 or not states:
+        states.append(env.get_state())
+        step()
+    positions = iter([])
+
+    def render():
+        nonlocal positions
+        state = next(positions, None)
+        if state is None:
+            positions = iter(states)
+            state = next(positions)
+        env.set_state(state)
+        board.render(env.factories, env.wall)
+    return render, 1
+
+
+@benchmark('board.render[full]')
+def board_render_full():
+    env = make_env()
+    board = Board(1024, 1024, env.NUM_COLORS, env.NUM_FACTORIES)
+
+    def render():
+        board.reset()
+        board.render(env.factories, env.wall)
+    return render, 1
+
+
+def batched_step(num_envs, **kwargs):
+    env = BatchedAzulEnv(num_envs, **kwargs)
+    env.seed(0)
+    env.reset()
+    np_random = np.random.RandomState(0)
+
+    def step():
+        masks = env.action_masks()
+        actions = np.argmax(masks * np_random.rand(*masks.shape), axis=1)
+        env.step(np.column_stack(np.unravel_index(actions, (6, 5, 5))))
+    return step, num_envs
+
+
+@benchmark('batched.step[64]')
+def batched_step_64():
+    return batched_step(64)
+
+
+@benchmark('batched.step[1024]')
+def batched_step_1024():
+    return batched_step(1024)
+
+
+@benchmark('batched.step[1024,one_hot]')
+def batched_step_1024_one_hot():
+    return batched_step(1024, observation_encoding='one_hot')
+
+
+@benchmark('batched.reset[1024]')
+def batched_reset_1024():
+    env = BatchedAzulEnv(1024)
+    env.seed(0)
+    return env.reset, 1024
+
+
+def measure(setup, min_time):
+    function, operations = setup()
+    function()
+    number = 1
+    while True:
+        elapsed = min(timeit.repeat(function, number=number, repeat=3))
+        if elapsed >= min_time:
+            return number * operations / elapsed
+        number *= max(2, int(min_time / max(elapsed, 1e-9)))
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline['benchmarks']:
+            continue
+        ratio = (result['per_second'] /
+                 baseline['benchmarks'][name]['per_second'])
+        flag = 'REGRESSION' if ratio < 1 - tolerance else ''
+        print('%-28s %8.2fx %s' % (name, ratio, flag))
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filter', default='',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='seconds of each timed repeat')
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter in name:
+            per_second = measure(setup, args.min_time)
+            results[name] = {'per_second': per_second}
+            print('%-28s %12.0f /s' % (name, per_second))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'python': sys.version.split()[0],
+                       'numpy': np.__version__,
+                       'machine': platform.machine(),
+                       'benchmarks': results}, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        print()
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Time a fixed-depth search with and without a transposition table.
+
+The search maximizes the reward difference of the player to move over the
+rest of the round, to a given depth. Positions reached by different move
+orders are evaluated once when the table is used.
+"""
+
+import argparse
+import time
+
+from gym_azul.envs import AzulEnv
+from gym_azul.envs.moves import generate_moves
+from gym_azul.envs.transposition_table import TranspositionTable
+from gym_azul.envs.zobrist import position_hash
+
+
+def search(env, depth, player, table, counter):
+    walls = (env.wall, env.adversary.wall)
+    if player:
+        walls = walls[::-1]
+    if table is not None:
+        key = position_hash(env.factories, walls)
+        value = table.get(key, depth)
+        if value is not None:
+            return value
+
+    counter[0] += 1
+    moves, rewards = generate_moves(env.factories, walls[0])
+    if depth == 1:
+        value = int(rewards.max())
+    else:
+        state = env.get_state(include_rng=False)
+        value = None
+        for (factory_idx, color_idx, row_idx), reward in zip(moves,
+                                                             rewards):
+            num_tiles, round_end, first_player_token = \
+                env.factories.pick_tiles(factory_idx, color_idx)
+            walls[0].add_tiles(color_idx, row_idx, num_tiles,
+                               first_player_token)
+            if not round_end:  # the next round depends on the refill
+                reward -= search(env, depth - 1, 1 - player, table,
+                                 counter)
+            env.set_state(state)
+            value = reward if value is None else max(value, reward)
+    if table is not None:
+        table.put(key, value, depth)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1])
+    parser.add_argument('--capacity', type=int, default=1 << 16)
+    args = parser.parse_args()
+
+    env = AzulEnv(wall_type='zobrist', factories_type='zobrist')
+    for seed in args.seeds:
+        for table in (None, TranspositionTable(args.capacity)):
+            env.seed(seed)
+            env.reset()
+            counter = [0]
+            start = time.perf_counter()
+            value = search(env, args.depth, 0, table, counter)
+            elapsed = time.perf_counter() - start
+            print('seed %d %-8s value %4d: %8d nodes %7.2fs%s' %
+                  (seed, 'table' if table else 'no table', value,
+                   counter[0], elapsed,
+                   '  hit rate %.3f' % table.stats()['hit_rate']
+                   if table else ''))
+
+
+if __name__ == '__main__':
+    main()
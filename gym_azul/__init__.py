@@ -11,3 +11,27 @@ register(
     entry_point='gym_azul.envs:AzulEnv',
     kwargs={'reward_type': 'win'}
 )
+
+register(
+    id='azul-batched-v0',
+    entry_point='gym_azul.envs:BatchedAzulEnv',
+    kwargs={'reward_type': 'score'}
+)
+
+register(
+    id='azul-batched-win-v0',
+    entry_point='gym_azul.envs:BatchedAzulEnv',
+    kwargs={'reward_type': 'win'}
+)
+
+register(
+    id='azul-3p-v0',
+    entry_point='gym_azul.envs:MultiplayerAzulEnv',
+    kwargs={'num_players': 3, 'reward_type': 'score'}
+)
+
+register(
+    id='azul-4p-v0',
+    entry_point='gym_azul.envs:MultiplayerAzulEnv',
+    kwargs={'num_players': 4, 'reward_type': 'score'}
+)
@@ -0,0 +1,3 @@
+from gym_azul.cli import main
+
+main()
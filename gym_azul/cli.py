@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+"""Command-line tools for gym-azul."""
+
+import argparse
+
+
+def selfplay(args):
+    # Checked here, not when a worker first loads the model
+    for seat in ('player', 'adversary'):
+        if getattr(args, seat) == 'ppo2' and not getattr(args,
+                                                         seat + '_model'):
+            raise SystemExit('gym_azul selfplay: --%s ppo2 needs '
+                             '--%s-model' % (seat, seat))
+    from gym_azul.selfplay import generate
+    generate(args.output_dir, args.games, shard_size=args.shard_size,
+             num_workers=args.workers, seed=args.seed, player=args.player,
+             player_model=args.player_model, adversary=args.adversary,
+             adversary_model=args.adversary_model)
+
+
+def tournament(args):
+    from gym_azul.tournament import Tournament
+    league = Tournament(args.policies, games_per_round=args.games_per_round,
+                        min_rounds=args.min_rounds, max_rounds=args.max_rounds,
+                        num_workers=args.workers, seed=args.seed, z=args.z)
+    print(league.run().summary())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='gym_azul', description=__doc__)
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    parser_selfplay = subparsers.add_parser(
+        'selfplay', help='generate a dataset of games between adversaries')
+    parser_selfplay.add_argument('output_dir')
+    parser_selfplay.add_argument('--games', type=int, default=10000)
+    parser_selfplay.add_argument('--shard-size', type=int, default=1000)
+    parser_selfplay.add_argument('--workers', type=int, default=None,
+                                 help='number of processes (default: CPUs)')
+    parser_selfplay.add_argument('--seed', type=int, default=0)
+    parser_selfplay.add_argument('--player', default='random',
+                                 help='adversary class of the agent seat')
+    parser_selfplay.add_argument('--player-model')
+    parser_selfplay.add_argument('--adversary', default='random')
+    parser_selfplay.add_argument('--adversary-model')
+    parser_selfplay.set_defaults(function=selfplay)
+
+    parser_tournament = subparsers.add_parser(
+        'tournament', help='rate adversaries in a round-robin league')
+    parser_tournament.add_argument(
+        'policies', nargs='+',
+        help="adversary names, with ':model_path' for model adversaries")
+    parser_tournament.add_argument('--games-per-round', type=int, default=10)
+    parser_tournament.add_argument('--min-rounds', type=int, default=2)
+    parser_tournament.add_argument('--max-rounds', type=int, default=100)
+    parser_tournament.add_argument('--workers', type=int, default=None,
+                                   help='number of processes (default: CPUs)')
+    parser_tournament.add_argument('--seed', type=int, default=0)
+    parser_tournament.add_argument(
+        '--z', type=float, default=1.96,
+        help='standard errors between ratings to stop early')
+    parser_tournament.set_defaults(function=tournament)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.function(args)
+
+
+if __name__ == '__main__':
+    main()
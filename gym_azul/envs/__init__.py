@@ -1 +1,4 @@
 from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.batched_azul_env import BatchedAzulEnv
+from gym_azul.envs.azul_game import AzulGame
+from gym_azul.envs.multiplayer_azul_env import MultiplayerAzulEnv
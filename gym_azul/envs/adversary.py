@@ -3,22 +3,57 @@
 # Copyright (c) 2020 Gabriel Mendonça
 
 from abc import ABC, abstractmethod
+import importlib
+import struct
+
 import numpy as np
-from stable_baselines import PPO2
 
+from gym_azul.envs.model_cache import ModelCache, load_ppo2
 from gym_azul.envs.wall import Wall
 
+PPO2_MODELS = ModelCache(load_ppo2)
+ADVERSARIES = {}
+
+
+def register_adversary(name, entry_point, **kwargs):
+    """Makes an adversary available by name to `AzulEnv(adversary=name)`.
+
+    `entry_point` is an Adversary subclass or a 'module:Class' string. The
+    string form is only imported when such an adversary is created, so
+    adversaries backed by heavy libraries cost nothing until used.
+    """
+    ADVERSARIES[name] = (entry_point, kwargs)
+
+
+def make_adversary(name, factories, np_random, **kwargs):
+    entry_point, default_kwargs = ADVERSARIES[name]
+    if isinstance(entry_point, str):
+        module_name, class_name = entry_point.split(':')
+        entry_point = getattr(importlib.import_module(module_name),
+                              class_name)
+    return entry_point(factories, np_random, **dict(default_kwargs, **kwargs))
+
 
 class Adversary(ABC):
-    def __init__(self, factories, np_random):
+    SCORE = struct.Struct('<i')
+
+    def __init__(self, factories, np_random, wall_class=Wall):
         self.factories = factories
         self.np_random = np_random
-        self.wall = Wall(factories.num_colors)
+        self.wall = wall_class(factories.num_colors)
         self.score = 0
 
     @abstractmethod
+    def act(self):
+        """Chooses a (factory_idx, color_idx, row_idx) move."""
+
     def play(self):
-        pass
+        factory_idx, color_idx, row_idx = self.act()
+        num_tiles, round_end, first_player_token = \
+            self.factories.pick_tiles(factory_idx, color_idx)
+        self.score += self.wall.add_tiles(color_idx, row_idx, num_tiles,
+                                          first_player_token)
+        return round_end
 
     def done(self):
         return self.wall.done()
@@ -30,39 +65,77 @@ class Adversary(ABC):
     def end_round(self):
         self.wall.floor_state = 0
 
+    def get_state(self):
+        return self.wall.get_state() + self.SCORE.pack(self.score)
+
+    def set_state(self, state):
+        self.wall.set_state(state[:-self.SCORE.size])
+        self.score, = self.SCORE.unpack(state[-self.SCORE.size:])
 
-class RandomAdversary(Adversary):
-    def play(self):
-        num_tiles = 0
-        while num_tiles == 0:
-            factory_idx = \
-                self.np_random.randint(self.factories.num_factories + 1)
-            color_idx = self.np_random.randint(self.factories.num_colors)
-            num_tiles, round_end, first_player_token = \
-                self.factories.pick_tiles(factory_idx, color_idx)
 
+class RandomAdversary(Adversary):
+    def act(self):
+        picks = self.factories.legal_picks()
+        factory_idx, color_idx = divmod(
+            int(picks[self.np_random.randint(len(picks))]),
+            self.factories.num_colors)
         row_idx = self.np_random.randint(self.factories.num_colors)
-        self.score += self.wall.add_tiles(
-            color_idx, row_idx, num_tiles, first_player_token)
-        return round_end
+        return factory_idx, color_idx, row_idx
+
 
 class PPO2Adversary(Adversary):
-    def __init__(self, factories, np_random, model_path):
-        super().__init__(factories, np_random)
-        self.model = PPO2.load(model_path)
+    def __init__(self, factories, np_random, model_path, wall_class=Wall,
+                 model_cache=PPO2_MODELS, model=None):
+        super().__init__(factories, np_random, wall_class)
+        self.model_path = model_path
+        self.model_cache = model_cache
+        # Without a model, every play asks the cache, which reloads a
+        # retrained file and can evict models no longer in use
+        self.model = model
 
-    def play(self):
+    def act(self):
+        model = self.model
+        if model is None:
+            model = self.model_cache.get(self.model_path)
         observation = np.concatenate((self.factories.get_observation(),
                                       self.wall.get_observation()))
-        num_tiles = 0
-        round_end = False
-        first_player_token = False
-        while num_tiles == 0:
-            action = self.model.predict(observation, deterministic=False)[0]
-            num_tiles, round_end, first_player_token = \
-                    self.factories.pick_tiles(action[0], action[1])
-
-        reward = self.wall.add_tiles(action[1], action[2], num_tiles,
-                                     first_player_token)
-        self.score += reward
-        return round_end
+        # stable-baselines returns one (batch, n) array per action dimension
+        factory_probs, color_probs, row_probs = (
+            probs[0] for probs in
+            model.action_probability(observation[None]))
+
+        # Policy probabilities of the non-empty picks only
+        picks = self.factories.legal_picks()
+        pick_probs = np.outer(factory_probs, color_probs).ravel()[picks]
+        if pick_probs.sum() > 0:
+            pick_probs = pick_probs / pick_probs.sum()
+        else:
+            pick_probs = None  # uniform
+        factory_idx, color_idx = divmod(
+            int(self.np_random.choice(picks, p=pick_probs)),
+            self.factories.num_colors)
+        row_idx = self.np_random.choice(len(row_probs), p=row_probs)
+        return factory_idx, color_idx, row_idx
+
+
+class GreedyAdversary(Adversary):
+    """Plays the move with the best immediate reward.
+
+    All (factory, color, row) moves are scored at once by
+    `Wall.move_rewards`, from the wall's scoring tables and floor penalties.
+    Ties go to the move that puts the most tiles on pattern lines.
+    """
+
+    def act(self):
+        rewards, placed = self.wall.move_rewards(
+            self.factories.state, self.factories.first_player_tokens())
+        rewards = np.where(self.factories.legal[..., None], rewards, -np.inf)
+        # placed is at most 5 (a full pattern line) and rewards differ by at
+        # least 1, so scaling rewards by 32 leaves placed to break ties
+        move = np.argmax(rewards * 32 + placed)
+        return np.unravel_index(move, rewards.shape)
+
+
+register_adversary('random', RandomAdversary)
+register_adversary('ppo2', PPO2Adversary)
+register_adversary('greedy', GreedyAdversary)
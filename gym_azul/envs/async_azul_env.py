@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import asyncio
+import inspect
+import time
+
+import numpy as np
+
+from .azul_env import AzulEnv
+
+
+class ActionBatcher:
+    """Coalesces the pending decisions of many games into policy batches.
+
+    `policy(observations, action_masks)` takes stacked observations and
+    masks and returns a (N, 3) array of actions, either directly or as an
+    awaitable (e.g. a request to a policy process). Games await `act`.
+    Once `max_batch_size` decisions are pending, or `max_wait` seconds
+    after the first one, they are sent as one batch. With `max_wait` 0 a
+    batch holds every decision requested in the same loop iteration.
+    """
+
+    def __init__(self, policy, max_batch_size=256, max_wait=0.0):
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.pending = []
+        self.flush_handle = None
+        self.num_batches = 0
+        self.num_requests = 0
+
+    async def act(self, observation, action_mask):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((observation, action_mask, future))
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    @property
+    def mean_batch_size(self):
+        return self.num_requests / max(self.num_batches, 1)
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch = self.pending[:self.max_batch_size]
+        del self.pending[:self.max_batch_size]
+        if self.pending:
+            self.flush_handle = asyncio.get_running_loop().call_soon(
+                self._flush)
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        observations, action_masks, futures = zip(*batch)
+        self.num_batches += 1
+        self.num_requests += len(batch)
+        try:
+            actions = self.policy(np.stack(observations),
+                                  np.stack(action_masks))
+            if inspect.isawaitable(actions):
+                actions = await actions
+        except Exception as exception:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+        for future, action in zip(futures, actions):
+            if not future.done():  # the game may have been cancelled
+                future.set_result(action)
+
+
+class AsyncAzulEnv:
+    """AzulEnv whose agent moves are awaited from an `ActionBatcher`.
+
+    The environment itself steps synchronously; a game only yields to
+    the event loop while it waits for its next action.
+    """
+
+    def __init__(self, batcher, **env_kwargs):
+        self.batcher = batcher
+        self.env = AzulEnv(**env_kwargs)
+
+    async def play_episode(self):
+        """Plays a game and returns its scores, number of moves, duration
+        and per-move decision latencies in seconds.
+        """
+        start = time.perf_counter()
+        observation = self.env.reset()
+        action_mask = self.env.action_masks()
+        latencies = []
+        done = False
+        while not done:
+            request_time = time.perf_counter()
+            action = await self.batcher.act(observation, action_mask)
+            latencies.append(time.perf_counter() - request_time)
+            observation, _, done, info = self.env.step(np.asarray(action))
+            action_mask = info['action_mask']
+        return {
+            'score': self.env.score,
+            'adversary_score': self.env.adversary.score,
+            'num_moves': len(latencies),
+            'duration': time.perf_counter() - start,
+            'latencies': latencies,
+        }
+
+
+class GameManager:
+    """Plays many concurrent games against one batched policy.
+
+    `num_envs` games run as coroutines, each playing episodes until
+    `num_games` have been started. Decisions go through an `ActionBatcher`,
+    so a policy call serves up to `max_batch_size` games at once.
+    """
+
+    def __init__(self, policy, num_envs=1000, max_batch_size=256,
+                 max_wait=0.0, env_kwargs=None, seed=0):
+        self.batcher = ActionBatcher(policy, max_batch_size, max_wait)
+        seeds = np.random.SeedSequence(seed).generate_state(num_envs)
+        self.envs = []
+        for env_seed in seeds:
+            env = AsyncAzulEnv(self.batcher, **(env_kwargs or {}))
+            env.env.seed(int(env_seed))
+            self.envs.append(env)
+        self.results = []
+        self.elapsed = 0.0
+
+    def run(self, num_games):
+        """Runs `num_games` games in a new event loop, see `play`."""
+        return asyncio.run(self.play(num_games))
+
+    async def play(self, num_games):
+        """Plays `num_games` games and returns their results."""
+        remaining = iter(range(num_games))
+
+        async def worker(env):
+            for _ in remaining:
+                self.results.append(await env.play_episode())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(env) for env in self.envs))
+        self.elapsed += time.perf_counter() - start
+        return self.results
+
+    def stats(self, quantiles=(0.5, 0.9, 0.99)):
+        """Moves per second, batch size and quantiles of the decision
+        latency and game duration, in seconds.
+        """
+        num_moves = sum(result['num_moves'] for result in self.results)
+        latencies = np.concatenate(
+            [result['latencies'] for result in self.results] or [[np.nan]])
+        durations = [result['duration'] for result in self.results]
+        return {
+            'games': len(self.results),
+            'moves': num_moves,
+            'elapsed': self.elapsed,
+            'moves_per_second': num_moves / max(self.elapsed, 1e-9),
+            'mean_batch_size': self.batcher.mean_batch_size,
+            'latency': dict(zip(quantiles,
+                                np.quantile(latencies, quantiles))),
+            'game_duration': dict(zip(quantiles, np.quantile(
+                durations or [np.nan], quantiles))),
+        }
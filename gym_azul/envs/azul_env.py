@@ -2,44 +2,113 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2020 Gabriel Mendonça
 
+import ctypes
+import struct
+
 import gym
 from gym import error, spaces, utils
 from gym.utils import seeding
 import numpy as np
 
-from .adversary import RandomAdversary, PPO2Adversary
+from .adversary import make_adversary
+from .bitboard_wall import BitboardWall
 from .board import Board
+from .compact_factories import CompactFactories
+from .encodings import ObservationEncoder
 from .factories import Factories
+from .profiler import Profiler
 from .wall import Wall
+from .zobrist import ZobristFactories, ZobristWall, position_hash
 
 
 class AzulEnv(gym.Env):
-    metadata = {'render.modes': ['console', 'human']}
+    """Two-player Azul against an adversary, as a gym environment.
+
+    `reset` and `step` return a new observation array. With
+    `copy_observation=False` they return the env's own buffer instead,
+    which the next step overwrites: copy anything that must outlive it
+    (e.g. the last observation of an episode).
+    """
+    metadata = {'render.modes': ['console', 'human', 'rgb_array']}
     NUM_COLORS = 5
     NUM_FACTORIES = 5
     FACTORY_SIZE = 4
     EMPTY_PICK_REWARD = -10
     MAX_ACTIONS = NUM_COLORS * sum(range(1, NUM_COLORS + 1))
+    WALL_TYPES = {'array': Wall, 'bitboard': BitboardWall,
+                  'zobrist': ZobristWall}
+    FACTORIES_TYPES = {'array': Factories, 'compact': CompactFactories,
+                       'zobrist': ZobristFactories}
+    COUNTERS = struct.Struct('<ii')        # num_actions, score
+    RNG_STATE_SIZE = 624 * 4 + 4           # MT19937 key and position
+    RNG_POSITION = struct.Struct('=i')     # native, as in the C struct
+    RNG_KEY_SIZE = 624
+    PROFILED_PHASES = ('step', 'action_space.contains', 'pick_tiles',
+                       'add_tiles', 'adversary.play', 'end_round',
+                       'observation', 'action_masks', 'empty_pick')
 
-    def __init__(self, adv_model_path=None, reward_type='score'):
+    def __init__(self, adv_model_path=None, reward_type='score',
+                 wall_type='array', observation_dtype=np.uint8,
+                 copy_observation=True, adv_model=None, adversary=None,
+                 adversary_kwargs=None, profile=False, refill_buffer=0,
+                 factories_type='array', observation_encoding='raw'):
         super().__init__()
+        self.init_kwargs = dict(
+            adv_model_path=adv_model_path, reward_type=reward_type,
+            wall_type=wall_type, observation_dtype=observation_dtype,
+            copy_observation=copy_observation, adv_model=adv_model,
+            adversary=adversary, adversary_kwargs=adversary_kwargs,
+            profile=profile, refill_buffer=refill_buffer,
+            factories_type=factories_type,
+            observation_encoding=observation_encoding)
         self.seed()
         self.action_space = spaces.MultiDiscrete([self.NUM_FACTORIES + 1,
                                                   self.NUM_COLORS,
                                                   self.NUM_COLORS])
-        self.factories = Factories(self.NUM_COLORS, self.FACTORY_SIZE,
-                                   self.NUM_FACTORIES, self.np_random)
-        self.wall = Wall(self.NUM_COLORS)
+
+        # Factories and wall keep their state in views of one buffer, which
+        # is returned as the observation (unless `copy_observation`).
+        num_factories_fields = \
+            (self.NUM_FACTORIES + 1) * self.NUM_COLORS + 1
+        num_wall_fields = self.NUM_COLORS * (self.NUM_COLORS + 2) + 1
+        self.observation = np.zeros(num_factories_fields + num_wall_fields,
+                                    dtype=np.uint8)
+        # The game state stays in uint8, other dtypes get a cast of it
+        self.typed_observation = None
+        if np.dtype(observation_dtype) != np.uint8:
+            self.typed_observation = np.zeros(self.observation.shape,
+                                              dtype=observation_dtype)
+        self.copy_observation = copy_observation
+        self.factories = self.FACTORIES_TYPES[factories_type](
+            self.NUM_COLORS, self.FACTORY_SIZE, self.NUM_FACTORIES,
+            self.np_random, self.observation[:num_factories_fields],
+            refill_buffer)
+        wall_class = self.WALL_TYPES[wall_type]
+        self.wall = wall_class(self.NUM_COLORS,
+                               self.observation[num_factories_fields:])
         self.observation_space = spaces.MultiDiscrete(
             self.factories.state_space + self.wall.state_space)
+        # Other encodings are computed from the buffer, see `encodings`
+        self.encoder = None
+        if observation_encoding != 'raw':
+            self.encoder = ObservationEncoder(self.observation_space.nvec,
+                                              observation_encoding)
+            self.observation_space = self.encoder.observation_space
         self.board = None
 
-        if adv_model_path:
-            self.adversary = PPO2Adversary(self.factories, self.np_random,
-                                           adv_model_path)
-        else:
-            self.adversary = RandomAdversary(self.factories, self.np_random)
+        adversary_kwargs = dict(adversary_kwargs or {},
+                                wall_class=wall_class)
+        if adversary is None:
+            adversary = 'ppo2' if adv_model_path or adv_model else 'random'
+        if adversary == 'ppo2':
+            adversary_kwargs.update(model_path=adv_model_path,
+                                    model=adv_model)
+        self.adversary = make_adversary(adversary, self.factories,
+                                        self.np_random, **adversary_kwargs)
         self.reward_type = reward_type
+        self.profiler = None
+        if profile:
+            self.enable_profiling()
         self.reset()
 
     def step(self, action):
@@ -67,11 +136,13 @@ class AzulEnv(gym.Env):
 
         else:
             info['info'] = 'empty pick'
+            if self.profiler:
+                self.profiler.count('empty_pick')
             if self.reward_type == 'score':
                 reward = self.EMPTY_PICK_REWARD
 
-        observation = np.concatenate((self.factories.get_observation(),
-                                      self.wall.get_observation()))
+        observation = self._get_observation()
+        info['action_mask'] = self.action_masks()
         done = (self.wall.done() or self.adversary.done() or
                 self.num_actions >= self.MAX_ACTIONS)
 
@@ -91,9 +162,45 @@ class AzulEnv(gym.Env):
         self.adversary.reset()
         if self.board:
             self.board.reset()
-        observation = np.concatenate((self.factories.get_observation(),
-                                      self.wall.get_observation()))
-        return observation
+        return self._get_observation()
+
+    def action_masks(self):
+        """Flags the actions that pick at least one tile.
+
+        Indexed like the flattened action space, that is
+        `(factory_idx * NUM_COLORS + color_idx) * NUM_COLORS + row_idx`.
+        """
+        return np.repeat(self.factories.legal.ravel(), self.NUM_COLORS)
+
+    def enable_profiling(self, counters=None):
+        """Times the phases of `step` until `disable_profiling`.
+
+        Calls and durations are recorded per phase in `counters`, a
+        `Profiler` array that may be shared with other environments. Only
+        the empty pick counter costs anything while profiling is off.
+        """
+        self.disable_profiling()
+        profiler = Profiler(self.PROFILED_PHASES, counters)
+        profiler.instrument(self, 'step')
+        profiler.instrument(self.action_space, 'contains',
+                            'action_space.contains')
+        profiler.instrument(self.factories, 'pick_tiles')
+        profiler.instrument(self.wall, 'add_tiles')
+        profiler.instrument(self.adversary, 'play', 'adversary.play')
+        profiler.instrument(self, 'end_round')
+        profiler.instrument(self, '_get_observation', 'observation')
+        profiler.instrument(self, 'action_masks')
+        self.profiler = profiler
+        return profiler
+
+    def disable_profiling(self):
+        if self.profiler:
+            self.profiler.remove()
+            self.profiler = None
+
+    def stats(self):
+        """Per-phase profiling statistics, see `profiler.summarize`."""
+        return self.profiler.stats() if self.profiler else {}
 
     def render(self, mode='console', close=False):
         if close:
@@ -116,13 +223,14 @@ class AzulEnv(gym.Env):
             return
 
         if not self.board:
-            self.board = Board(1024, 1024, self.NUM_COLORS)
+            self.board = Board(1024, 1024, self.NUM_COLORS,
+                               self.NUM_FACTORIES)
 
         img = self.board.render(self.factories, self.wall)
         if mode == 'human':
             self.board.show()
 
-        return img
+        return img.copy()  # the board keeps drawing on its canvas
 
     def close(self):
         if self.board:
@@ -130,8 +238,101 @@ class AzulEnv(gym.Env):
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
+        if hasattr(self, 'adversary'):
+            self.factories.np_random = self.np_random
+            self.adversary.np_random = self.np_random
         return [seed]
 
+    def get_state(self, include_rng=True):
+        """Snapshot of the game as a bytes object.
+
+        Holds the factories and their refill buffer, both walls, the scores
+        and the action count, followed by the random generator state if
+        `include_rng`. The adversary's model and the render board are not
+        part of it. The length depends on the configuration: the refill
+        buffer adds its position and 25 bytes per buffered round. See
+        `state_size`.
+        """
+        state = (self.factories.get_state() + self.wall.get_state() +
+                 self.adversary.get_state() +
+                 self.COUNTERS.pack(self.num_actions, self.score))
+        if include_rng:
+            state += ctypes.string_at(self._rng_state_address(),
+                                      self.RNG_STATE_SIZE)
+        return state
+
+    def state_size(self, include_rng=True):
+        """Length of `get_state` snapshots of this configuration."""
+        size = (self.factories.state_size + 2 * len(self.wall.state_space) +
+                self.adversary.SCORE.size + self.COUNTERS.size)
+        return size + self.RNG_STATE_SIZE if include_rng else size
+
+    def set_state(self, state):
+        """Restores a snapshot taken by `get_state`.
+
+        Raises ValueError if the snapshot was taken with another
+        configuration (e.g. another `refill_buffer`) or is corrupt.
+        """
+        state = memoryview(state)
+        if len(state) not in (self.state_size(False), self.state_size()):
+            raise ValueError(
+                'snapshot of %d bytes, expected %d or %d (with the random '
+                'generator) for this configuration' %
+                (len(state), self.state_size(False), self.state_size()))
+        if len(state) == self.state_size():
+            position, = self.RNG_POSITION.unpack(
+                state[-self.RNG_POSITION.size:])
+            if not 0 <= position <= self.RNG_KEY_SIZE:
+                raise ValueError('invalid random generator position %d' %
+                                 position)
+        end = self.factories.state_size
+        self.factories.set_state(state[:end])
+        start, end = end, end + len(self.wall.state_space)
+        self.wall.set_state(state[start:end])
+        start, end = end, end + len(self.wall.state_space) + \
+            self.adversary.SCORE.size
+        self.adversary.set_state(state[start:end])
+        start, end = end, end + self.COUNTERS.size
+        self.num_actions, self.score = self.COUNTERS.unpack(state[start:end])
+
+        if len(state) == self.state_size():
+            ctypes.memmove(self._rng_state_address(), bytes(state[end:]),
+                           self.RNG_STATE_SIZE)
+
+    def position_hash(self):
+        """64-bit hash of the factories and both walls.
+
+        Needs `wall_type='zobrist'` and `factories_type='zobrist'`. Scores,
+        the action count and the random generator are not part of it.
+        """
+        return position_hash(self.factories,
+                             (self.wall, self.adversary.wall))
+
+    def clone(self):
+        """New environment in the same state, random generator included."""
+        env = type(self)(**self.init_kwargs)
+        env.set_state(self.get_state())
+        return env
+
+    def _rng_state_address(self):
+        # RandomState.get_state() builds a tuple and copies the key through
+        # Python, which costs ~60us. Copying the MT19937 struct (uint32
+        # key[624], int pos) directly takes ~1us. The cached Gaussian of the
+        # legacy generator is not saved: the game never draws normals.
+        return self.np_random._bit_generator.ctypes.state_address
+
+    def _get_observation(self):
+        self.wall.get_observation()  # lets bitboard walls fill the buffer
+        observation = self.observation
+        if self.encoder:
+            observation = self.encoder.encode(observation)
+        elif self.typed_observation is not None:
+            self.typed_observation[:] = observation
+            observation = self.typed_observation
+        if self.copy_observation:
+            return observation.copy()
+        return observation
+
     def end_round(self):
         self.factories.reset()
         self.wall.floor_state = 0
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import numpy as np
+
+from .factories import Factories
+from .moves import generate_moves
+from .wall import Wall
+
+
+class AzulGame:
+    """Azul for 2 to 4 players, with every player's state in shared arrays.
+
+    Row p of `players` holds the wall, pattern lines and floor of player p
+    in the observation layout of `Wall`. `wall_states`, `pattern_lines`
+    and `floors` are (P, ...) views of it and `scores` is a (P,) array.
+    `walls[p]` is a `Wall` bound to row p, used to score that player's
+    moves, so a move only touches the arrays of the player who makes it.
+
+    Players move in turn. Whoever takes the first player token starts the
+    next round.
+    """
+    NUM_COLORS = 5
+    FACTORY_SIZE = 4
+    NUM_FACTORIES = {2: 5, 3: 7, 4: 9}
+    MAX_TURNS_PER_PLAYER = 75
+
+    def __init__(self, num_players=2, np_random=None, refill_buffer=0):
+        n = self.NUM_COLORS
+        self.num_players = num_players
+        self.num_factories = self.NUM_FACTORIES[num_players]
+        self.max_turns = self.MAX_TURNS_PER_PLAYER * num_players
+        if np_random is None:
+            np_random = np.random.RandomState()
+        self.factories = Factories(n, self.FACTORY_SIZE, self.num_factories,
+                                   np_random, refill_buffer=refill_buffer)
+
+        num_wall_fields = n * (n + 2) + 1
+        self.players = np.zeros((num_players, num_wall_fields),
+                                dtype=np.uint8)
+        self.walls = [Wall(n, observation) for observation in self.players]
+        self.wall_states = self.players[:, :n * n].view(bool).reshape(
+            num_players, n, n)
+        self.pattern_lines = self.players[:, n * n:-1].reshape(
+            num_players, 2, n)
+        self.floors = self.players[:, -1]
+        self.scores = np.zeros(num_players, dtype=int)
+        self.state_space = (self.factories.state_space +
+                            self.walls[0].state_space * num_players)
+        self.reset()
+
+    @property
+    def np_random(self):
+        return self.factories.np_random
+
+    @np_random.setter
+    def np_random(self, np_random):
+        self.factories.np_random = np_random
+
+    def reset(self):
+        self.factories.reset()
+        self.players[:] = 0
+        self.scores[:] = 0
+        self.current_player = 0
+        self.first_player = 0  # of the next round
+        self.num_turns = 0
+
+    def legal_moves(self):
+        """Moves of the current player and their rewards, see
+        `generate_moves`.
+        """
+        return generate_moves(self.factories,
+                              self.walls[self.current_player])
+
+    def play(self, factory_idx, color_idx, row_idx):
+        """Plays a move of the current player and passes the turn.
+
+        Returns the reward of the move and whether it ended the round.
+        """
+        if not self.factories.legal[factory_idx, color_idx]:
+            raise ValueError('factory %d has no tiles of color %d' %
+                             (factory_idx, color_idx))
+        player = self.current_player
+        num_tiles, round_end, first_player_token = \
+            self.factories.pick_tiles(factory_idx, color_idx)
+        reward = self.walls[player].add_tiles(color_idx, row_idx, num_tiles,
+                                              first_player_token)
+        self.scores[player] += reward
+        if first_player_token:
+            self.first_player = player
+        self.num_turns += 1
+
+        if round_end:
+            self.factories.reset()
+            self.floors[:] = 0
+            self.current_player = self.first_player
+        else:
+            self.current_player = (player + 1) % self.num_players
+        return reward, round_end
+
+    def done(self):
+        return bool(self.wall_states.all(axis=2).any() or
+                    self.num_turns >= self.max_turns)
+
+    def winners(self):
+        return np.flatnonzero(self.scores == self.scores.max())
+
+    def get_observation(self, player=None):
+        """Factories and every player's row, starting with `player`
+        (default: the current player).
+        """
+        if player is None:
+            player = self.current_player
+        order = (np.arange(self.num_players) + player) % self.num_players
+        return np.concatenate((self.factories.get_observation(),
+                               self.players[order].ravel()))
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import gym
+from gym import spaces
+from gym.utils import seeding
+import numpy as np
+
+from .azul_env import AzulEnv
+from .encodings import ObservationEncoder
+from .factories import Factories
+from .vec_env import env_indices, getattr_depth_check
+from .wall import Wall
+
+
+class BatchedAzulEnv(gym.Env):
+    """Plays `num_envs` independent Azul games with array operations.
+
+    Implements the stable-baselines VecEnv interface, see
+    `vec_env.register_vec_envs`: `step` takes one action per game and
+    returns stacked observations, rewards and dones. Finished games are
+    reset automatically and their last observation is kept in
+    `info['terminal_observation']`. Each game draws from its own random
+    stream exactly like an `AzulEnv` seeded with the same seed does. The
+    games share the attributes and methods of the env, which `get_attr`
+    and `env_method` return once per game. As with `AzulEnv`, `step` and
+    `reset` return new observation arrays unless `copy_observation` is
+    False, in which case encoded observations are the encoder's buffer and
+    the next step overwrites them.
+    """
+    NUM_COLORS = AzulEnv.NUM_COLORS
+    NUM_FACTORIES = AzulEnv.NUM_FACTORIES
+    FACTORY_SIZE = AzulEnv.FACTORY_SIZE
+    EMPTY_PICK_REWARD = AzulEnv.EMPTY_PICK_REWARD
+    MAX_ACTIONS = AzulEnv.MAX_ACTIONS
+    PLAYER = 0
+    ADVERSARY = 1
+    RNG_BUFFER_SIZE = 1024
+    SCALAR_CHUNK_SIZE = 64
+    FLOOR_CUMSUM = np.concatenate(([0], np.cumsum(Wall.FLOOR_PENALTY)))
+    # RNG_MASKS[high] is the bit mask randint(high) applies to a raw word
+    RNG_MASKS = np.array(
+        [0] + [(1 << (high - 1).bit_length()) - 1
+               for high in range(1, (NUM_FACTORIES + 1) * NUM_COLORS + 1)])
+
+    def __init__(self, num_envs=16, reward_type='score',
+                 observation_dtype=np.uint8, observation_encoding='raw',
+                 copy_observation=True):
+        super().__init__()
+        self.num_envs = num_envs
+        self.reward_type = reward_type
+        self.observation_dtype = observation_dtype
+        self.copy_observation = copy_observation
+        self.action_space = spaces.MultiDiscrete([self.NUM_FACTORIES + 1,
+                                                  self.NUM_COLORS,
+                                                  self.NUM_COLORS])
+        wall = Wall(self.NUM_COLORS)
+        self.observation_space = spaces.MultiDiscrete(
+            [Factories.TABLE_SIZE + 1] * self.NUM_COLORS +
+            [self.FACTORY_SIZE + 1] * self.NUM_COLORS * self.NUM_FACTORIES +
+            [2] + wall.state_space)
+        self.encoder = None
+        if observation_encoding != 'raw':
+            self.encoder = ObservationEncoder(self.observation_space.nvec,
+                                              observation_encoding, num_envs)
+            self.observation_space = self.encoder.observation_space
+        self.placement_reward = wall.placement_reward
+        self.color_bonus = wall.color_bonus
+        self.line_cells = wall.line_cells
+        self.line_bits = wall.line_bits
+
+        n, c = self.num_envs, self.NUM_COLORS
+        self.factories = np.zeros((n, self.NUM_FACTORIES + 1, c),
+                                  dtype=np.uint8)
+        self.first_player_table = np.ones(n, dtype=bool)
+        self.walls = np.zeros((n, 2, c, c), dtype=bool)
+        self.pattern_lines = np.zeros((n, 2, 2, c), dtype=np.uint8)
+        self.floors = np.zeros((n, 2), dtype=np.int64)
+        self.scores = np.zeros((n, 2), dtype=np.int64)
+        self.num_actions = np.zeros(n, dtype=np.int64)
+        self.actions = None
+        self.seed()
+        self.reset()
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(
+            self.num_envs, 3)
+        assert ((actions >= 0) & (actions < self.action_space.nvec)).all()
+        self.num_actions += 1
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        infos = [{} for _ in range(self.num_envs)]
+
+        games = np.arange(self.num_envs)
+        num_tiles, first_player_token = self._pick_tiles(
+            games, actions[:, 0], actions[:, 1])
+
+        valid = num_tiles > 0
+        for i in np.flatnonzero(~valid):
+            infos[i]['info'] = 'empty pick'
+        if self.reward_type == 'score':
+            rewards[~valid] = self.EMPTY_PICK_REWARD
+
+        games = games[valid]
+        action_score = self._add_tiles(
+            self.PLAYER, games, actions[valid, 1], actions[valid, 2],
+            num_tiles[valid], first_player_token[valid])
+        self.scores[games, self.PLAYER] += action_score
+        if self.reward_type == 'score':
+            rewards[games] = action_score
+
+        self._end_rounds(games)
+        self._play_adversary(games)
+        self._end_rounds(games)
+
+        observations = self._get_observations()
+        dones = (self.walls.all(axis=3).any(axis=(1, 2)) |
+                 (self.num_actions >= self.MAX_ACTIONS))
+
+        if self.reward_type == 'win':
+            won = ((self.scores[:, self.PLAYER] >
+                    self.scores[:, self.ADVERSARY]) &
+                   (self.num_actions < self.MAX_ACTIONS))
+            rewards[dones] = np.where(won[dones], 1, -1)
+
+        finished = np.flatnonzero(dones)
+        if len(finished) > 0:
+            terminal_observations = self._encode(observations[finished])
+            for i, observation in zip(finished, terminal_observations):
+                infos[i]['terminal_observation'] = observation.copy()
+            self._reset_games(finished)
+            observations[finished] = self._get_observations(finished)
+        observations = self._encode(observations)
+
+        action_masks = self.action_masks()
+        for info, action_mask in zip(infos, action_masks):
+            info['action_mask'] = action_mask
+        return observations, rewards, dones, infos
+
+    def step_async(self, actions):
+        self.actions = actions
+
+    def step_wait(self):
+        actions, self.actions = self.actions, None
+        return self.step(actions)
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)
+                for _ in env_indices(self.num_envs, indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        if len(env_indices(self.num_envs, indices)) != self.num_envs:
+            raise ValueError('attributes are shared by all %d games'
+                             % self.num_envs)
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None,
+                   **method_kwargs):
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in env_indices(self.num_envs, indices)]
+
+    def getattr_depth_check(self, name, already_found):
+        return getattr_depth_check(self, name, already_found)
+
+    def action_masks(self):
+        """Per game version of `AzulEnv.action_masks`."""
+        return np.repeat(self.factories.reshape(self.num_envs, -1) > 0,
+                         self.NUM_COLORS, axis=1)
+
+    def reset(self):
+        self._reset_games(np.arange(self.num_envs))
+        return self._encode(self._get_observations())
+
+    def seed(self, seed=None):
+        if seed is None or np.isscalar(seed):
+            seeds = [None if seed is None else seed + i
+                     for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+        assert len(seeds) == self.num_envs
+
+        self.np_random = []
+        for i, game_seed in enumerate(seeds):
+            np_random, seeds[i] = seeding.np_random(game_seed)
+            self.np_random.append(np_random)
+        self.rng_buffer = np.zeros((self.num_envs, self.RNG_BUFFER_SIZE),
+                                   dtype=np.uint32)
+        self.rng_position = np.full(self.num_envs, self.RNG_BUFFER_SIZE)
+        return seeds
+
+    def _reset_games(self, games):
+        self._refill_factories(games)
+        self.walls[games] = False
+        self.pattern_lines[games] = 0
+        self.floors[games] = 0
+        self.scores[games] = 0
+        self.num_actions[games] = 0
+
+    def _end_rounds(self, games):
+        ended = games[self.factories[games].sum(axis=(1, 2)) == 0]
+        self._refill_factories(ended)
+        self.floors[ended] = 0
+
+    def _get_observations(self, games=slice(None)):
+        factories = self.factories[games]
+        num_games = len(factories)
+        return np.concatenate((
+            factories.reshape(num_games, -1),
+            self.first_player_table[games, None],
+            self.walls[games, self.PLAYER].reshape(num_games, -1),
+            self.pattern_lines[games, self.PLAYER].reshape(num_games, -1),
+            self.floors[games, self.PLAYER, None]), axis=1).astype(
+            self.observation_dtype)
+
+    def _encode(self, observations):
+        # Encoded observations share the encoder's buffer, raw ones are
+        # built anew by _get_observations
+        if self.encoder:
+            observations = self.encoder.encode(observations)
+            if self.copy_observation:
+                return observations.copy()
+        return observations
+
+    def _reserve_rng(self, games, num_words):
+        short = games[self.rng_position[games] + num_words >
+                      self.RNG_BUFFER_SIZE]
+        for i in short:
+            position = self.rng_position[i]
+            remaining = self.RNG_BUFFER_SIZE - position
+            self.rng_buffer[i, :remaining] = self.rng_buffer[i, position:]
+            self.rng_buffer[i, remaining:] = self.np_random[i].randint(
+                2 ** 32, size=position, dtype=np.uint32)
+            self.rng_position[i] = 0
+
+    def _draw(self, games, high, count=1):
+        # Same masked rejection sampling as RandomState.randint(high), fed
+        # from each game's buffered stream of raw 32-bit words. `high` may
+        # differ between games and, like randint(1), a high of 1 draws
+        # nothing from the stream.
+        high = np.broadcast_to(high, games.shape)
+        values = np.zeros((len(games), count), dtype=np.int64)
+        drawn = np.flatnonzero(high > 1)
+        games, high = games[drawn], high[drawn, None]
+
+        window = 2 * count + 16
+        self._reserve_rng(games, window)
+        offsets = self.rng_position[games, None] + np.arange(window)
+        words = (self.rng_buffer[games[:, None], offsets] &
+                 self.RNG_MASKS[high]).astype(np.int64)
+        accepted = words < high
+        num_drawn = np.cumsum(accepted, axis=1)
+        complete = num_drawn[:, -1] >= count
+
+        values[drawn[complete]] = words[complete][
+            (accepted & (num_drawn <= count))[complete]].reshape(-1, count)
+        self.rng_position[games[complete]] += \
+            np.argmax(num_drawn[complete] >= count, axis=1) + 1
+        for row in np.flatnonzero(~complete):  # unlucky streak of rejects
+            stream = self._stream(games[row])
+            for j in range(count):
+                values[drawn[row], j] = self._randint(stream, high[row, 0])
+        return values
+
+    def _stream(self, game):
+        # Raw words of one game's stream as Python ints, for scalar draws.
+        games = np.array([game])
+        while True:
+            self._reserve_rng(games, self.SCALAR_CHUNK_SIZE)
+            position = self.rng_position[game]
+            for word in self.rng_buffer[
+                    game, position:position + self.SCALAR_CHUNK_SIZE].tolist():
+                self.rng_position[game] += 1
+                yield word
+
+    def _randint(self, stream, high):
+        for word in stream:
+            if word & self.RNG_MASKS[high] < high:
+                return word & self.RNG_MASKS[high]
+
+    def _refill_factories(self, games):
+        tiles = self._draw(games, self.NUM_COLORS,
+                           self.NUM_FACTORIES * self.FACTORY_SIZE)
+        tiles = tiles.reshape(len(games), self.NUM_FACTORIES,
+                              self.FACTORY_SIZE, 1)
+        self.factories[games, 0] = 0
+        self.factories[games, 1:] = (
+            tiles == np.arange(self.NUM_COLORS)).sum(axis=2)
+        self.first_player_table[games] = True
+
+    def _pick_tiles(self, games, factory_idx, color_idx):
+        num_tiles = self.factories[games, factory_idx, color_idx].astype(
+            np.int64)
+        first_player_token = np.zeros(len(games), dtype=bool)
+
+        picked = np.flatnonzero(num_tiles > 0)
+        envs, factory_idx = games[picked], factory_idx[picked]
+        self.factories[envs, factory_idx, color_idx[picked]] = 0
+
+        from_table = factory_idx == 0
+        table_envs = envs[from_table]
+        first_player_token[picked[from_table]] = \
+            self.first_player_table[table_envs]
+        self.first_player_table[table_envs] = False
+
+        envs, factory_idx = envs[~from_table], factory_idx[~from_table]
+        self.factories[envs, 0] += self.factories[envs, factory_idx]
+        self.factories[envs, factory_idx] = 0
+        return num_tiles, first_player_token
+
+    def _add_tiles(self, player, games, color_idx, row_idx, num_tiles,
+                   first_player_token):
+        wall = self.walls[:, player]
+        pattern_line = self.pattern_lines[:, player]
+        column_idx = (row_idx + color_idx) % self.NUM_COLORS
+        line_tiles = pattern_line[games, 0, row_idx].astype(np.int64)
+        line_color = pattern_line[games, 1, row_idx]
+
+        placed = ~(wall[games, row_idx, column_idx] |
+                   ((line_tiles > 0) & (line_color != color_idx)))
+        available_space = row_idx + 1 - line_tiles
+        built = placed & (num_tiles >= available_space)
+        filled = placed & ~built
+        broken = np.where(placed, 0, num_tiles) + first_player_token
+        broken[built] += num_tiles[built] - available_space[built]
+
+        pattern_line[games[placed], 1, row_idx[placed]] = color_idx[placed]
+        pattern_line[games[filled], 0, row_idx[filled]] += \
+            num_tiles[filled].astype(np.uint8)
+
+        envs, rows, columns = games[built], row_idx[built], column_idx[built]
+        wall[envs, rows, columns] = True
+        pattern_line[envs, 0, rows] = 0
+
+        reward = self._break_tiles(player, games, broken)
+        reward[built] += self._build_reward(wall, envs, rows, columns)
+        return reward
+
+    def _build_reward(self, wall, games, row_idx, column_idx):
+        cells = self.line_cells[row_idx, column_idx]
+        masks = wall.reshape(self.num_envs, -1)[games[:, None, None],
+                                                cells] @ self.line_bits
+        return (self.placement_reward[masks[:, 0], masks[:, 1],
+                                      row_idx, column_idx] +
+                self.color_bonus[masks[:, 2]])
+
+    def _break_tiles(self, player, games, num_tiles):
+        previous = self.floors[games, player]
+        floor = np.minimum(previous + num_tiles, len(Wall.FLOOR_PENALTY))
+        self.floors[games, player] = floor
+        return self.FLOOR_CUMSUM[floor] - self.FLOOR_CUMSUM[previous]
+
+    def _play_adversary(self, games):
+        # Same single draw among the legal picks as RandomAdversary.play
+        legal = self.factories[games].reshape(
+            len(games), (self.NUM_FACTORIES + 1) * self.NUM_COLORS) > 0
+        num_legal = legal.sum(axis=1)
+        choice = self._draw(games, num_legal)
+        picks = np.argmax(np.cumsum(legal, axis=1) > choice, axis=1)
+        factory_idx, color_idx = np.divmod(picks, self.NUM_COLORS)
+
+        row_idx = self._draw(games, self.NUM_COLORS)[:, 0]
+        num_tiles, first_player_token = self._pick_tiles(
+            games, factory_idx, color_idx)
+        self.scores[games, self.ADVERSARY] += self._add_tiles(
+            self.ADVERSARY, games, color_idx, row_idx, num_tiles,
+            first_player_token)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import numpy as np
+
+from .wall import Wall
+
+
+def _read_only(array):
+    # A copy of the bits, so writing to it would be silently lost
+    array.flags.writeable = False
+    return array
+
+
+class BitboardWall(Wall):
+    """Wall backend that packs the wall and the pattern lines into ints.
+
+    Tile (row_idx, column_idx) is bit `row_idx * num_colors + column_idx` of
+    `bits`. Each pattern line takes two fields of `pattern_line_bits`: the
+    number of tiles and the color. `state` and `pattern_line_state` are
+    still available as arrays, built on every access and read-only: they
+    can be read and assigned as a whole as on `Wall`, but item writes raise
+    ValueError. `observation` is only written by `get_observation`.
+    """
+    floor_state = 0  # a plain attribute, not a view of the observation
+
+    def __init__(self, num_colors, observation=None):
+        n = num_colors
+        self.field_size = n.bit_length()
+        self.field_mask = (1 << self.field_size) - 1
+        self.line_field_mask = (1 << (2 * self.field_size)) - 1
+        self.line_mask = (1 << n) - 1
+        self.num_bytes = (n * n + 7) // 8
+        self.observation_shifts = [
+            (row_idx * 2 + field) * self.field_size
+            for field in range(2) for row_idx in range(n)]
+        self.row_masks = [self.line_mask << (row_idx * n)
+                          for row_idx in range(n)]
+        self.color_masks = [sum(1 << (i * n + (i + color_idx) % n)
+                                for i in range(n))
+                            for color_idx in range(n)]
+        # A column is gathered into a line mask by keeping every n-th bit and
+        # multiplying by a constant that moves bit i * n to bit shift + i.
+        # The other partial products never overlap, so there are no carries.
+        self.column_shift = (n - 1) ** 2
+        self.column_bits = sum(1 << (i * n) for i in range(n))
+        self.column_magic = sum(1 << (self.column_shift - (n - 1) * i)
+                                for i in range(n))
+        self.floor_cumsum = [0] + np.cumsum(self.FLOOR_PENALTY).tolist()
+        super().__init__(num_colors, observation)
+        self.placement_reward = self.placement_reward.ravel().tolist()
+        self.color_bonus = self.color_bonus.tolist()
+
+    @property
+    def state(self):
+        n = self.num_colors
+        return _read_only(np.array(
+            [(self.bits >> i) & 1 for i in range(n * n)],
+            dtype=bool).reshape(n, n))
+
+    @state.setter
+    def state(self, state):
+        self.bits = sum(1 << int(i) for i in np.flatnonzero(state))
+
+    @property
+    def pattern_line_state(self):
+        return _read_only(np.array(
+            list(zip(*[self._pattern_line(row_idx)
+                       for row_idx in range(self.num_colors)])),
+            dtype=np.uint8))
+
+    @pattern_line_state.setter
+    def pattern_line_state(self, pattern_line_state):
+        self.pattern_line_bits = 0
+        for row_idx, (num_tiles, color_idx) in enumerate(
+                np.transpose(pattern_line_state)):
+            self._set_pattern_line(row_idx, int(num_tiles), int(color_idx))
+
+    def reset(self):
+        self.bits = 0
+        self.pattern_line_bits = 0
+        self.floor_state = 0
+
+    def add_tiles(self, color_idx, row_idx, num_tiles, first_player_token):
+        assert(num_tiles > 0)
+        color_idx, row_idx, num_tiles = \
+            int(color_idx), int(row_idx), int(num_tiles)
+        reward = 0
+        line_tiles, line_color = self._pattern_line(row_idx)
+
+        if self.is_complete(color_idx, row_idx):  # already on the wall
+            reward += self.break_tiles(num_tiles)
+
+        elif line_tiles > 0 and line_color != color_idx:  # pattern line in use
+            reward += self.break_tiles(num_tiles)
+
+        else:  # empty or correct pattern line
+            available_space = row_idx + 1 - line_tiles
+            if num_tiles >= available_space:  # enough to build
+                self._set_pattern_line(row_idx, line_tiles, color_idx)
+                reward += self.build_tile(color_idx, row_idx)
+                excess = num_tiles - available_space
+                if excess > 0:
+                    reward += self.break_tiles(excess)
+            else:
+                self._set_pattern_line(row_idx, line_tiles + num_tiles,
+                                       color_idx)
+
+        if first_player_token:
+            reward += self.break_tiles(1)
+
+        return reward
+
+    def is_complete(self, color_idx, row_idx):
+        column_idx = (row_idx + color_idx) % self.num_colors
+        return bool((self.bits >> (row_idx * self.num_colors + column_idx))
+                    & 1)
+
+    def build_tile(self, color_idx, row_idx):
+        column_idx = (row_idx + color_idx) % self.num_colors
+        self.bits |= 1 << int(row_idx * self.num_colors + column_idx)
+        self._set_pattern_line(row_idx, 0, self._pattern_line(row_idx)[1])
+        return self.compute_build_reward(row_idx, column_idx)
+
+    def compute_build_reward(self, row_idx, column_idx):
+        n = self.num_colors
+        row_mask = (self.bits >> (row_idx * n)) & self.line_mask
+        column_mask = ((((self.bits >> column_idx) & self.column_bits) *
+                        self.column_magic) >> self.column_shift) & \
+            self.line_mask
+        reward = self.placement_reward[
+            ((row_mask << n | column_mask) * n + row_idx) * n + column_idx]
+
+        color_mask = self.color_masks[(column_idx - row_idx) % n]
+        if self.bits & color_mask == color_mask:
+            reward += self.color_bonus[self.line_mask]
+        return reward
+
+    def break_tiles(self, num_tiles):
+        previous = self.floor_state
+        self.floor_state = min(self.floor_state + num_tiles,
+                               len(self.FLOOR_PENALTY))
+        return (self.floor_cumsum[self.floor_state] -
+                self.floor_cumsum[previous])
+
+    def done(self):
+        return any(self.bits & mask == mask for mask in self.row_masks)
+
+    def get_observation(self):
+        n = self.num_colors
+        self.observation[:n * n] = np.unpackbits(
+            np.frombuffer(self.bits.to_bytes(self.num_bytes, 'little'),
+                          dtype=np.uint8), count=n * n, bitorder='little')
+        self.observation[n * n:-1] = [
+            (self.pattern_line_bits >> shift) & self.field_mask
+            for shift in self.observation_shifts]
+        self.observation[-1] = self.floor_state
+        return self.observation
+
+    def set_state(self, state):
+        n = self.num_colors
+        state = np.frombuffer(state, dtype=np.uint8)
+        self.state = state[:n * n]
+        self.pattern_line_state = state[n * n:-1].reshape(2, n)
+        self.floor_state = int(state[-1])
+
+    def _bind(self, observation):
+        self.observation = observation
+
+    def _pattern_line(self, row_idx):
+        line = self.pattern_line_bits >> (row_idx * 2 * self.field_size)
+        return line & self.field_mask, (line >> self.field_size) & \
+            self.field_mask
+
+    def _set_pattern_line(self, row_idx, num_tiles, color_idx):
+        shift = row_idx * 2 * self.field_size
+        line = num_tiles | color_idx << self.field_size
+        self.pattern_line_bits = (
+            (self.pattern_line_bits & ~(self.line_field_mask << shift)) |
+            line << shift)
@@ -2,33 +2,63 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2020 Gabriel Mendonça
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 
 class Board:
+    """Draws the factories and the wall on a persistent RGBA canvas.
+
+    The grid lines and the faded wall colors are drawn once into
+    `background`. Every tile slot is a cell of the layout, and `render` only
+    repaints the cells whose color changed since the previous frame. The
+    returned canvas is reused between frames. matplotlib is only needed by
+    `show`, so `render` also works headless.
+    """
     COLOR_MAP = np.array([[60, 140, 180, 16],
                           [240, 180, 50, 32],
                           [240, 40, 65, 16],
                           [40, 50, 55, 16],
-                          [200, 235, 230, 32]])
+                          [200, 235, 230, 32]], dtype=np.uint8)
+    LINE_COLOR = (0, 0, 0, 255)
 
-    def __init__(self, height, width, num_colors):
+    def __init__(self, height, width, num_colors, num_factories=5):
         self.height = height
         self.width = width
         self.num_colors = num_colors
+        self.num_factories = num_factories
         self.factory_tile_size = round(self.height / 20)
-        self.figure = plt.figure(figsize=(5, 5))
-        cid = self.figure.canvas.mpl_connect('button_press_event', self.onclick)
+        self.tile_colors = self.COLOR_MAP.copy()
+        self.tile_colors[:, 3] = 255
+        self.figure = None
+
+        self.cells = []
+        self.factory_slots = self._layout_factories()
+        self.wall_colors = self._layout_wall()
+        self.pattern_line_slots = self._layout_pattern_lines()
+        self.cells = np.array(self.cells)
+        self.background = self._render_background()
+        self.reset()
 
     def render(self, factories, wall):
-        self.img = np.ones((self.height, self.width, 4)).astype(int) * 255
-        self._render_factories(factories)
-        self._render_wall(wall)
-        self._render_pattern_line(wall)
+        colors = self._cell_colors(factories, wall)
+        for cell_idx in np.flatnonzero(colors != self.drawn_colors):
+            y, x, size = self.cells[cell_idx]
+            interior = (slice(y + 1, y + size), slice(x + 1, x + size))
+            color_idx = colors[cell_idx]
+            if color_idx == self.num_colors:
+                self.img[interior] = self.background[interior]
+            else:
+                self.img[interior] = self.tile_colors[color_idx]
+        self.drawn_colors = colors
         return self.img
 
     def show(self):
+        import matplotlib.pyplot as plt
+        if self.figure is None:
+            self.figure = plt.figure(figsize=(5, 5))
+            self.figure.canvas.mpl_connect('button_press_event',
+                                           self.onclick)
+        plt.figure(self.figure.number)
         plt.clf()
         plt.imshow(self.img)
         plt.xticks([])
@@ -37,119 +67,99 @@ class Board:
         plt.pause(2)
 
     def close(self):
-        plt.close()
+        if self.figure is not None:
+            import matplotlib.pyplot as plt
+            plt.close(self.figure)
+            self.figure = None
 
     def reset(self):
-        self.img = np.ones((self.width, self.height, 4)).astype(int) * 255
+        self.img = self.background.copy()
+        self.drawn_colors = np.full(len(self.cells), self.num_colors)
 
     def onclick(self, event):
         print('%s click: button=%d, x=%d, y=%d, xdata=%f, ydata=%f' %
                   ('double' if event.dblclick else 'single', event.button,
                    event.x, event.y, event.xdata, event.ydata))
 
-    def _render_factories(self, factories):
+    def _layout_factories(self):
+        # Factory displays sit on a circle and the center is on their right.
+        # Returns the slot index of every factory cell, in cell order.
         center_x = round(self.height / 4)
         center_y = round(self.width / 4)
         radius = round(self.width / 8)
-        for i in range(1, len(factories.state)):
-            factory_state = factories.state[i]
-            angle = 2 * np.pi / factories.num_factories * (i - 1)
-            factory_center_x = round(np.sin(angle) * radius).astype(int)
-            factory_center_x += center_x
-            factory_center_y = round(np.cos(angle) * radius).astype(int)
-            factory_center_y += center_y
-            self._render_factory(factory_center_x, factory_center_y,
-                factory_state)
-
-        factory_state = factories.state[0]
-        factory_center_y = round(self.width / 4) * 3
-        self._render_factory(center_x, factory_center_y, factory_state, 4)
-
-    def _render_factory(self, center_x, center_y, state, factory_dim=2):
-        factory_size = self.factory_tile_size * factory_dim
-        x_start = center_x - round(factory_size / 2)
-        x_end = x_start + factory_size
-        y_start = center_y - round(factory_size / 2)
-        y_end = y_start + factory_size
-        canvas = self.img[x_start:x_end, y_start:y_end]
-
-        num_tiles = np.sum(state)
-        tile_idx = 0
-        for color_idx in range(self.num_colors):
-            color = self.COLOR_MAP[color_idx].copy()
-            color[3] = 255
-            for i in range(state[color_idx]):
-                tile_xs = (tile_idx // factory_dim) * self.factory_tile_size
-                tile_ys = (tile_idx % factory_dim) * self.factory_tile_size
-                tile_xe = tile_xs + self.factory_tile_size
-                tile_ye = tile_ys + self.factory_tile_size
-                self._fill(canvas, tile_xs, tile_ys, tile_xe, tile_ye, color)
-                tile_idx += 1
-
-        for i in range(factory_dim + 1):
-            pos = min(i * self.factory_tile_size, factory_size - 1)
-            self._draw_vline(canvas, pos)
-            self._draw_hline(canvas, pos)
-
-    def _render_wall(self, wall):
-        x_start = round(self.width / 2)
-        y_start = round(self.height / 2)
-        canvas = self.img[x_start:, y_start:]
-
-        for color_idx in range(self.num_colors):
-            for row_idx in range(self.num_colors):
-                size = round(self.width / 2 / self.num_colors)
-                pos = size * row_idx
-                next_pos = pos + size
-
-                is_complete = wall.is_complete(color_idx, row_idx)
-                color = self.COLOR_MAP[color_idx].copy()
-                if is_complete:
-                    color[3] = 255
-                self._fill(canvas, pos, pos + size * color_idx,
-                           next_pos, next_pos + size * color_idx, color)
-
-        for i in range(0, self.num_colors):
-            pos = round(self.width / 2 / self.num_colors * i)
-            self._draw_vline(canvas, pos)
-            self._draw_hline(canvas, pos)
-
-    def _render_pattern_line(self, wall):
+        factories = [(center_x, round(self.width / 4) * 3, 4)]
+        for i in range(self.num_factories):
+            angle = 2 * np.pi / self.num_factories * i
+            factories.append((center_x + int(round(np.sin(angle) * radius)),
+                              center_y + int(round(np.cos(angle) * radius)),
+                              2))
+
+        size = self.factory_tile_size
+        slots = []
+        for factory_idx, (center_x, center_y, dim) in enumerate(factories):
+            x_start = center_x - round(size * dim / 2)
+            y_start = center_y - round(size * dim / 2)
+            for tile_idx in range(dim * dim):
+                self.cells.append((x_start + tile_idx // dim * size,
+                                   y_start + tile_idx % dim * size, size))
+                slots.append((factory_idx, tile_idx))
+        return tuple(np.transpose(slots))
+
+    def _layout_wall(self):
+        # Returns the color of every wall cell, in cell order
+        n = self.num_colors
+        size = (min(self.height, self.width) // 2 - 1) // n
         x_start = round(self.height / 2)
-        y_end = round(self.width / 2)
-        canvas = self.img[x_start:, :y_end]
-
-        tile_size = round(self.width / 2 / self.num_colors)
-        for i in range(self.num_colors):
-            xs = tile_size * i
-            xe = xs + tile_size
-
-            color_idx = wall.pattern_line_state[1, i]
-            color = self.COLOR_MAP[color_idx].copy()
-            color[3] = 255
-
-            num_tiles = wall.pattern_line_state[0, i]
-            for j in range(num_tiles):
-                ys = -tile_size * (j + 1)
-                ye = ys + tile_size - 1
-                self._fill(canvas, xs, ys, xe, ye, color)
-
-        for i in range(self.num_colors):
-            pos = tile_size * i
-            offset = pos + tile_size
-            self._draw_vline(canvas[-offset:], pos)
-            self._draw_hline(canvas[:, -offset:], pos)
-
-    def _draw_vline(self, canvas, pos):
-        canvas[:, pos] = [0, 0, 0, 255]
-
-    def _draw_hline(self, canvas, pos):
-        canvas[pos] = [0, 0, 0, 255]
-
-    def _fill(self, canvas, xs, ys, xe, ye, color):
-        if ys >= canvas.shape[1]:
-            ys -= canvas.shape[1]
-        if ye > canvas.shape[1]:
-            ye -= canvas.shape[1]
-
-        canvas[xs:xe, ys:ye] = color
+        y_start = round(self.width / 2)
+        for row_idx in range(n):
+            for column_idx in range(n):
+                self.cells.append((x_start + row_idx * size,
+                                   y_start + column_idx * size, size))
+        return (np.arange(n) - np.arange(n)[:, None]) % n
+
+    def _layout_pattern_lines(self):
+        # Pattern lines fill from the wall towards the left. Returns the
+        # (row_idx, tile_idx) of every pattern line cell, in cell order.
+        n = self.num_colors
+        size = (min(self.height, self.width) // 2 - 1) // n
+        x_start = round(self.height / 2)
+        y_end = n * size
+        slots = []
+        for row_idx in range(n):
+            for tile_idx in range(row_idx + 1):
+                self.cells.append((x_start + row_idx * size,
+                                   y_end - (tile_idx + 1) * size, size))
+                slots.append((row_idx, tile_idx))
+        return tuple(np.transpose(slots))
+
+    def _render_background(self):
+        background = np.full((self.height, self.width, 4), 255,
+                             dtype=np.uint8)
+        num_factory_cells = len(self.factory_slots[0])
+        wall_cells = self.cells[num_factory_cells:
+                                num_factory_cells + self.num_colors ** 2]
+        for (y, x, size), color_idx in zip(wall_cells,
+                                           self.wall_colors.ravel()):
+            background[y:y + size, x:x + size] = self.COLOR_MAP[color_idx]
+
+        for y, x, size in self.cells:
+            background[y:y + size + 1, [x, x + size]] = self.LINE_COLOR
+            background[[y, y + size], x:x + size + 1] = self.LINE_COLOR
+        return background
+
+    def _cell_colors(self, factories, wall):
+        # Color index of every cell, or num_colors for an empty one
+        n = self.num_colors
+        tile_counts = np.cumsum(factories.state, axis=1)
+        factory_idx, tile_idx = self.factory_slots
+        factory_colors = np.sum(
+            tile_idx[:, None] >= tile_counts[factory_idx], axis=1)
+
+        wall_colors = np.where(wall.state, self.wall_colors, n).ravel()
+
+        num_tiles, line_colors = wall.pattern_line_state
+        row_idx, tile_idx = self.pattern_line_slots
+        pattern_line_colors = np.where(tile_idx < num_tiles[row_idx],
+                                       line_colors[row_idx], n)
+        return np.concatenate([factory_colors, wall_colors,
+                               pattern_line_colors])
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+from .factories import Factories
+
+
+class CompactFactories(Factories):
+    """Factories that keep running tile counts in plain ints.
+
+    `counts[factory_idx][color_idx]` mirrors `state`, `totals` holds the
+    number of tiles of every factory (the table first) and `num_tiles` the
+    number left in the round. A pick updates them with a few integer
+    operations, so round end, emptiness and legality are integer tests
+    instead of array reductions. `state` and `legal` are written through,
+    so this is a drop-in replacement for `Factories`. Code that writes to
+    `state` directly must call `set_state` or `recount` afterwards.
+    """
+
+    def reset(self):
+        super().reset()
+        self.recount()
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.recount()
+
+    def recount(self):
+        """Rebuilds the counters from `state`."""
+        self.counts = self.state.astype(int).tolist()
+        self.totals = [sum(counts) for counts in self.counts]
+        self.num_tiles = sum(self.totals)
+
+    def is_legal(self, factory_idx, color_idx):
+        return self.counts[factory_idx][color_idx] > 0
+
+    def is_empty(self, factory_idx):
+        return self.totals[factory_idx] == 0
+
+    def pick_tiles(self, factory_idx, color_idx):
+        counts = self.counts[factory_idx]
+        num_tiles = counts[color_idx]
+        if not num_tiles:
+            return 0, self.num_tiles == 0, False
+
+        first_player_token = False
+        if factory_idx != 0:
+            # The other tiles of the factory move to the table
+            table = self.counts[0]
+            for other_idx, count in enumerate(counts):
+                if count and other_idx != color_idx:
+                    table[other_idx] += count
+                    self.state[0, other_idx] = table[other_idx]
+                    self.legal[0, other_idx] = True
+            self.counts[factory_idx] = [0] * self.num_colors
+            self.state[factory_idx] = 0
+            self.legal[factory_idx] = False
+            self.totals[0] += self.totals[factory_idx] - num_tiles
+            self.totals[factory_idx] = 0
+        else:
+            counts[color_idx] = 0
+            self.state[0, color_idx] = 0
+            self.legal[0, color_idx] = False
+            self.totals[0] -= num_tiles
+            first_player_token = self.first_player_table
+            if first_player_token:
+                self.first_player_table = False
+
+        self.num_tiles -= num_tiles
+        return num_tiles, self.num_tiles == 0, first_player_token
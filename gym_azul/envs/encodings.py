@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+from gym import spaces
+import numpy as np
+
+ENCODINGS = ('raw', 'one_hot', 'bit_planes')
+
+
+class ObservationEncoder:
+    """Encodes `MultiDiscrete` observations for policy networks.
+
+    'one_hot' sets one float32 flag per field value. 'bit_planes' writes
+    the binary digits of every field, packed 8 per byte into uint8 (as
+    `np.packbits`). Both are built from per-field tables computed once from
+    `state_space`: the offset of every field's flags, and the field and
+    shift of every bit. `encode` takes one observation or a (N, fields)
+    batch and writes into preallocated buffers, which are reused by the
+    next call. Copy results that must outlive it.
+    """
+
+    def __init__(self, state_space, encoding='one_hot', max_batch_size=1):
+        assert encoding in ENCODINGS[1:], \
+            'unknown encoding %r' % (encoding,)
+        self.encoding = encoding
+        state_space = np.asarray(state_space)
+        # one_hot: field i takes flags offsets[i] ... offsets[i + 1] - 1
+        self.offsets = np.concatenate(([0], np.cumsum(state_space)[:-1]))
+        # bit_planes: bit j is (observation[bit_fields[j]] >> bit_shifts[j])
+        # & 1, most significant first
+        widths = [max(int(size - 1).bit_length(), 1) for size in state_space]
+        self.bit_fields = np.repeat(np.arange(len(widths)), widths)
+        self.bit_shifts = np.concatenate(
+            [np.arange(width)[::-1] for width in widths]).astype(np.uint8)
+        self.num_bits = len(self.bit_fields)
+
+        if encoding == 'one_hot':
+            self.size = int(state_space.sum())
+            self.dtype = np.float32
+        else:
+            self.size = (self.num_bits + 7) // 8
+            self.dtype = np.uint8
+        self._allocate(max_batch_size)
+
+    @property
+    def observation_space(self):
+        high = 1 if self.encoding == 'one_hot' else 255
+        return spaces.Box(0, high, (self.size,), dtype=self.dtype)
+
+    def encode(self, observations):
+        observations = np.asarray(observations)
+        single = observations.ndim == 1
+        observations = observations.reshape(-1, len(self.offsets))
+        if len(observations) > self.max_batch_size:
+            self._allocate(len(observations))
+        if self.encoding == 'one_hot':
+            encoded = self._one_hot(observations)
+        else:
+            encoded = self._bit_planes(observations)
+        return encoded[0] if single else encoded
+
+    def _one_hot(self, observations):
+        batch_size = len(observations)
+        positions = self.positions[:batch_size]
+        np.add(self.offsets, observations, out=positions, casting='unsafe')
+        positions += self.row_offsets[:batch_size]
+        self.flat[:batch_size * self.size] = 0
+        self.flat[positions.ravel()] = 1
+        return self.buffer[:batch_size]
+
+    def _bit_planes(self, observations):
+        batch_size = len(observations)
+        bits = self.bits[:batch_size]
+        bits[:] = observations[:, self.bit_fields]
+        np.right_shift(bits, self.bit_shifts, out=bits)
+        np.bitwise_and(bits, 1, out=bits)
+        encoded = self.buffer[:batch_size]
+        encoded[:] = np.packbits(bits, axis=1)
+        return encoded
+
+    def _allocate(self, max_batch_size):
+        self.max_batch_size = max_batch_size
+        self.buffer = np.zeros((max_batch_size, self.size), dtype=self.dtype)
+        if self.encoding == 'one_hot':
+            self.flat = self.buffer.reshape(-1)
+            self.positions = np.zeros((max_batch_size, len(self.offsets)),
+                                      dtype=np.intp)
+            self.row_offsets = np.arange(max_batch_size)[:, None] * self.size
+        else:
+            self.bits = np.zeros((max_batch_size, self.num_bits),
+                                 dtype=np.uint8)
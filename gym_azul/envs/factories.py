@@ -2,30 +2,82 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2020 Gabriel Mendonça
 
+import struct
+
 import numpy as np
 
 
 class Factories:
+    """Factory displays and the center of the table.
+
+    With `refill_buffer` > 0, the tiles of that many rounds are drawn with
+    one random call and counted with one bincount, and every reset takes
+    the next round from the buffer. The draws then differ from those of
+    the default mode, but they are still determined by the seed.
+    """
     TABLE_SIZE = 20
+    REFILL_POSITION = struct.Struct('<i')
 
-    def __init__(self, num_colors, size, num_factories, np_random):
+    def __init__(self, num_colors, size, num_factories, np_random,
+                 observation=None, refill_buffer=0):
         self.num_colors = num_colors
         self.size = size
         self.num_factories = num_factories
+        self.refill_buffer = refill_buffer
+        self.refills = np.zeros((refill_buffer, num_factories, num_colors),
+                                dtype=np.uint8)
         self.np_random = np_random
-        self.state = np.zeros([self.num_factories + 1, self.num_colors],
-                               dtype=np.uint8)
-        self.state_space = [self.TABLE_SIZE + 1] * self.num_colors + \
+        # At most size - 1 tiles of every factory go to the table
+        table_size = max(self.TABLE_SIZE, (size - 1) * num_factories)
+        self.state_space = [table_size + 1] * self.num_colors + \
             [self.size + 1] * self.num_colors * self.num_factories + [2]
+        self.state_size = len(self.state_space)
+        if refill_buffer:
+            self.state_size += self.REFILL_POSITION.size + \
+                self.refills.nbytes
+        if observation is None:
+            observation = np.zeros(len(self.state_space), dtype=np.uint8)
+        # The factories state is a view of `observation`
+        self.observation = observation
+        self.state = observation[:-1].reshape(self.num_factories + 1,
+                                              self.num_colors)
+        self.legal = np.zeros(self.state.shape, dtype=bool)  # state > 0
         self.reset()
 
+    @property
+    def np_random(self):
+        return self._np_random
+
+    @np_random.setter
+    def np_random(self, np_random):
+        # Buffered refills of the previous generator are dropped
+        self._np_random = np_random
+        self.refill_idx = self.refill_buffer
+
+    @property
+    def first_player_table(self):
+        return bool(self.observation[-1])
+
+    @first_player_table.setter
+    def first_player_table(self, first_player_table):
+        self.observation[-1] = first_player_table
+
     def reset(self):
         self.state[0] = 0
         self.first_player_table = True
-        for i in range(1, self.num_factories + 1):
-            tiles = self.np_random.randint(self.num_colors, size=self.size)
-            self.state[i] = np.bincount(tiles, minlength=self.num_colors)
-            assert(np.sum(self.state[i]) == self.size)
+        if self.refill_buffer:
+            if self.refill_idx == self.refill_buffer:
+                self._draw_refills()
+            self.state[1:] = self.refills[self.refill_idx]
+            self.refill_idx += 1
+        else:
+            for i in range(1, self.num_factories + 1):
+                tiles = self.np_random.randint(self.num_colors,
+                                               size=self.size)
+                self.state[i] = np.bincount(tiles, minlength=self.num_colors)
+                assert(np.sum(self.state[i]) == self.size)
+        self.legal[0] = False
+        np.greater(self.state[1:], 0, out=self.legal[1:])
 
     def pick_tiles(self, factory_idx, color_idx):
         num_tiles = self.state[factory_idx, color_idx]
@@ -33,9 +85,12 @@ class Factories:
         first_player_token = False
         if num_tiles > 0:
             self.state[factory_idx, color_idx] = 0
+            self.legal[factory_idx, color_idx] = False
             if factory_idx != 0:
                 self.state[0] += self.state[factory_idx]  # move to table
                 self.state[factory_idx] = 0
+                self.legal[0] |= self.legal[factory_idx]
+                self.legal[factory_idx] = False
             else:
                 first_player_token = self.first_player_table
                 self.first_player_table = False
@@ -45,8 +100,48 @@ class Factories:
         
         return num_tiles, round_end, first_player_token
 
+    def first_player_tokens(self):
+        """Flags the factories whose picks take the first player token."""
+        tokens = np.zeros(self.num_factories + 1, dtype=bool)
+        tokens[0] = self.first_player_table
+        return tokens
+
+    def legal_picks(self):
+        """Flat `factory_idx * num_colors + color_idx` of non-empty picks."""
+        return np.flatnonzero(self.legal)
+
     def get_observation(self):
-        observation = np.ndarray.flatten(self.state)
-        observation = np.concatenate((observation,
-            [int(self.first_player_table)]))
-        return observation
+        return self.observation
+
+    def get_state(self):
+        """Factories and first player marker as `state_size` bytes,
+        followed by the refill buffer if there is one.
+        """
+        state = self.observation.astype(np.uint8, copy=False).tobytes()
+        if self.refill_buffer:
+            state += self.REFILL_POSITION.pack(self.refill_idx) + \
+                self.refills.tobytes()
+        return state
+
+    def set_state(self, state):
+        size = len(self.state_space)
+        if self.refill_buffer:
+            start = size + self.REFILL_POSITION.size
+            refill_idx, = self.REFILL_POSITION.unpack(state[size:start])
+            if not 0 <= refill_idx <= self.refill_buffer:
+                raise ValueError('invalid refill position %d' % refill_idx)
+            self.refill_idx = refill_idx
+            self.refills.ravel()[:] = np.frombuffer(state[start:],
+                                                    dtype=np.uint8)
+        self.observation[:] = np.frombuffer(state[:size], dtype=np.uint8)
+        np.greater(self.state, 0, out=self.legal)
+
+    def _draw_refills(self):
+        num_factories = self.refill_buffer * self.num_factories
+        tiles = self.np_random.randint(self.num_colors,
+                                       size=(num_factories, self.size))
+        # Offsetting every factory by num_colors counts them all at once
+        tiles += np.arange(num_factories)[:, None] * self.num_colors
+        self.refills.ravel()[:] = np.bincount(
+            tiles.ravel(), minlength=num_factories * self.num_colors)
+        self.refill_idx = 0
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import os
+import shutil
+import struct
+import subprocess
+import zlib
+
+from gym import error
+import numpy as np
+
+from .azul_env import AzulEnv
+from .board import Board
+
+
+def iter_frames(states, height=256, width=256, env=None, env_kwargs=None):
+    """Yields the frame of every `AzulEnv.get_state()` snapshot.
+
+    Snapshots are restored into `env`, or into an `AzulEnv(**env_kwargs)`,
+    which must have the configuration (e.g. `refill_buffer`) they were
+    taken with. The frames are drawn by a `Board` of the given resolution,
+    without any matplotlib figure. The same canvas is yielded every time,
+    so copy a frame to keep it.
+    """
+    if env is None:
+        env = AzulEnv(**(env_kwargs or {}))
+    board = Board(height, width, env.NUM_COLORS, env.NUM_FACTORIES)
+    for state in states:
+        env.set_state(state)
+        yield board.render(env.factories, env.wall)
+
+
+def render_episode(states, height=256, width=256, env=None,
+                   env_kwargs=None):
+    """Frames of a sequence of snapshots, as a (T, height, width, 4) array.
+
+    See `iter_frames` for `env` and `env_kwargs`.
+    """
+    states = list(states)
+    frames = np.empty((len(states), height, width, 4), dtype=np.uint8)
+    for frame, image in zip(frames, iter_frames(states, height, width, env,
+                                                env_kwargs)):
+        frame[:] = image
+    return frames
+
+
+def iter_observation_frames(observations, height=256, width=256):
+    """Yields the frame of every raw agent observation, such as the
+    `observation` field of trajectory and selfplay records.
+
+    Observations hold the factories and the agent's wall only, so the
+    adversary's board is not drawn. The same canvas is yielded every time.
+    """
+    env = AzulEnv()
+    board = Board(height, width, env.NUM_COLORS, env.NUM_FACTORIES)
+    factories_size = env.factories.state_size
+    for observation in observations:
+        observation = np.asarray(observation, dtype=np.uint8)
+        if observation.shape != env.observation.shape:
+            raise ValueError('observation of shape %s, expected %s' %
+                             (observation.shape, env.observation.shape))
+        env.factories.set_state(observation[:factories_size].tobytes())
+        env.wall.set_state(observation[factories_size:].tobytes())
+        yield board.render(env.factories, env.wall)
+
+
+def render_records(records, height=256, width=256):
+    """Frames of trajectory or selfplay records, e.g.
+    `TrajectoryReader.episode(i)`, as a (T, height, width, 4) array.
+    """
+    observations = records['observation']
+    frames = np.empty((len(observations), height, width, 4), dtype=np.uint8)
+    for frame, image in zip(frames, iter_observation_frames(
+            observations, height, width)):
+        frame[:] = image
+    return frames
+
+
+def save_npz(path, frames):
+    np.savez_compressed(path, frames=frames)
+
+
+def save_pngs(directory, frames, prefix='frame', compression=1):
+    """Writes every frame to `directory` as `<prefix>_<index>.png`."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i, frame in enumerate(frames):
+        path = os.path.join(directory, '%s_%05d.png' % (prefix, i))
+        with open(path, 'wb') as png_file:
+            png_file.write(encode_png(frame, compression))
+        paths.append(path)
+    return paths
+
+
+def encode_png(frame, compression=1):
+    """PNG bytes of an RGBA uint8 frame, without any imaging library."""
+    height, width, _ = frame.shape
+    rows = np.empty((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 0] = 0  # no filter
+    rows[:, 1:] = frame.reshape(height, -1)
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) +
+            _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), compression)) +
+            _png_chunk(b'IEND', b''))
+
+
+def save_video(path, frames, fps=4, ffmpeg='ffmpeg'):
+    """Pipes the frames to a local ffmpeg, which picks the codec from
+    `path`'s extension.
+    """
+    executable = shutil.which(ffmpeg)
+    if executable is None:
+        raise error.DependencyNotInstalled(
+            '%s was not found, use save_npz or save_pngs instead' % ffmpeg)
+
+    frames = iter(frames)
+    frame = next(frames)
+    height, width, _ = frame.shape
+    command = [executable, '-loglevel', 'error', '-y',
+               '-f', 'rawvideo', '-pix_fmt', 'rgba',
+               '-s', '%dx%d' % (width, height), '-r', str(fps), '-i', '-',
+               '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+               '-pix_fmt', 'yuv420p', path]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        while frame is not None:
+            process.stdin.write(np.ascontiguousarray(frame).data)
+            frame = next(frames, None)
+    finally:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise error.Error('ffmpeg exited with code %d' %
+                              process.returncode)
+
+
+def _png_chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data +
+            struct.pack('>I', zlib.crc32(kind + data)))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from gym_azul.envs.model_cache import load_ppo2
+
+
+class InferenceClient:
+    """Model stand-in that forwards `action_probability` to a server.
+
+    Pass it as `AzulEnv(adv_model=...)` so that the adversary of that
+    environment is played by the server's model. Like the model, it also
+    takes a (N, fields) batch of observations, which the server answers in
+    one go. Errors raised by the server while loading or running the model
+    are raised here.
+    """
+
+    def __init__(self, client_id, requests, responses):
+        self.client_id = client_id
+        self.requests = requests
+        self.responses = responses
+
+    def action_probability(self, observations):
+        # Batched like the model: (N, fields) observations in, one (N, n)
+        # array per action dimension out
+        observations = np.asarray(observations)
+        self.requests.put((self.client_id, observations.reshape(
+            -1, observations.shape[-1])))
+        response = self.responses.recv()
+        if isinstance(response, Exception):
+            raise response
+        return list(response)
+
+
+class InferenceServer:
+    """Plays the adversary policy of many environments in batches.
+
+    The model is loaded in a separate process. Clients send observations
+    through a shared queue. The server gathers up to `max_batch_size` of
+    them, waiting at most `max_wait` seconds after the first request, or
+    until every client has a request pending. It then runs one batched
+    `action_probability` call and sends every client its own
+    probabilities. A larger `max_wait` gives larger batches at the cost of
+    latency per move. If the model fails to load or a batch fails, every
+    client of the batch gets the exception instead.
+
+    Batches only form when clients run concurrently. Environments stepped
+    in turn from one process (e.g. by a `DummyVecEnv`) send one request at
+    a time, and each one waits `max_wait` for nothing: use `max_wait=0`
+    there, or send all the observations at once from a single client.
+    `benchmarks/inference.py` compares these cases.
+
+    Create all clients with `client()` before calling `start()`, and create
+    the environments in worker processes that inherit them.
+    """
+
+    def __init__(self, model_path, max_batch_size=128, max_wait=0.001,
+                 loader=load_ppo2):
+        self.model_path = model_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.loader = loader
+        self.requests = mp.Queue()
+        self.connections = []
+        self.num_batches = mp.Value('L', 0)
+        self.num_requests = mp.Value('L', 0)
+        self.process = None
+
+    def client(self):
+        assert self.process is None, 'clients must be created before start'
+        responses, connection = mp.Pipe(duplex=False)
+        self.connections.append(connection)
+        return InferenceClient(len(self.connections) - 1, self.requests,
+                               responses)
+
+    def start(self):
+        self.process = mp.Process(
+            target=_serve,
+            args=(self.model_path, self.loader, self.requests,
+                  self.connections, self.max_batch_size, self.max_wait,
+                  self.num_batches, self.num_requests),
+            daemon=True)
+        self.process.start()
+
+    def close(self):
+        if self.process is not None:
+            self.requests.put(None)
+            self.process.join()
+            self.process = None
+
+    @property
+    def mean_batch_size(self):
+        return self.num_requests.value / max(self.num_batches.value, 1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _serve(model_path, loader, requests, connections, max_batch_size,
+           max_wait, num_batches, num_requests):
+    try:
+        model = loader(model_path)
+    except Exception as exception:
+        model, error = None, exception  # answered to every request
+    running = True
+    while running:
+        request = requests.get()
+        if request is None:
+            break
+
+        batch = [request]
+        batch_size = len(request[1])
+        deadline = time.perf_counter() + max_wait
+        # A client waits for its answer, so it has at most one request
+        while batch_size < max_batch_size and len(batch) < len(connections):
+            timeout = deadline - time.perf_counter()
+            try:
+                request = requests.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                break
+            if request is None:
+                running = False
+                break
+            batch.append(request)
+            batch_size += len(request[1])
+
+        client_ids, observations = zip(*batch)
+        try:
+            if model is None:
+                raise error
+            probabilities = model.action_probability(
+                np.concatenate(observations))
+        except Exception as exception:
+            for client_id in client_ids:
+                _send_error(connections[client_id], exception)
+        else:
+            start = 0
+            for client_id, client_observations in batch:
+                end = start + len(client_observations)
+                connections[client_id].send(
+                    tuple(action_probs[start:end]
+                          for action_probs in probabilities))
+                start = end
+
+        with num_batches.get_lock():
+            num_batches.value += 1
+        with num_requests.get_lock():
+            num_requests.value += batch_size
+
+
+def _send_error(connection, exception):
+    try:
+        connection.send(exception)
+    except Exception:  # not picklable
+        connection.send(RuntimeError('inference server: %r' % (exception,)))
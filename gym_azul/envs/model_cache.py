@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+from collections import OrderedDict
+import os
+import threading
+
+
+def load_ppo2(model_path):
+    # stable_baselines pulls in TensorFlow, so only import it when needed
+    from stable_baselines import PPO2
+    return PPO2.load(model_path)
+
+
+class ModelCache:
+    """Process-wide cache of loaded adversary models.
+
+    Models are keyed by file path and modification time, so an overwritten
+    checkpoint is loaded again. Once more than `max_size` models are loaded,
+    the least recently used ones are dropped.
+    """
+
+    def __init__(self, loader, max_size=8):
+        self.loader = loader
+        self.max_size = max_size
+        self.models = OrderedDict()
+        self.num_loads = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        path = self._model_file(path)
+        key = (path, os.path.getmtime(path))
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key]
+
+            model = self.loader(path)
+            self.num_loads += 1
+            self.models[key] = model
+            while len(self.models) > self.max_size:
+                self.models.popitem(last=False)
+            return model
+
+    def clear(self):
+        with self.lock:
+            self.models.clear()
+
+    def __len__(self):
+        return len(self.models)
+
+    def _model_file(self, path):
+        # stable_baselines appends '.zip' to paths saved without extension
+        path = os.path.abspath(path)
+        if not os.path.exists(path) and os.path.exists(path + '.zip'):
+            path += '.zip'
+        return path
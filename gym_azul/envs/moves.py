@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import numpy as np
+
+
+def generate_moves(factories, wall):
+    """Legal moves of a player and their immediate rewards.
+
+    Returns a (K, 3) array of (factory_idx, color_idx, row_idx) moves, every
+    non-empty pick on every row, and the reward each would score on `wall`.
+    Neither the factories nor the wall are changed.
+    """
+    rewards, _ = wall.move_rewards(factories.state,
+                                   factories.first_player_tokens())
+    actions = np.flatnonzero(np.repeat(factories.legal.ravel(),
+                                       factories.num_colors))
+    moves = np.column_stack(np.unravel_index(actions, rewards.shape))
+    return moves, rewards.ravel()[actions]
+
+
+def perft(env, depth, player=0):
+    """Number of move sequences of `depth` plies from the env's position.
+
+    Players alternate, starting with the agent (`player` 0) and followed by
+    the adversary. Sequences that end the game early are counted once.
+    Factories refilled at the end of a round come from the env's random
+    generator, whose state is restored with the rest of the position, so
+    the count only depends on the starting snapshot.
+    """
+    walls = (env.wall, env.adversary.wall)
+    if depth == 0 or walls[0].done() or walls[1].done():
+        return 1
+
+    moves, _ = generate_moves(env.factories, walls[player])
+    if depth == 1:
+        return len(moves)
+
+    state = env.get_state()
+    count = 0
+    for factory_idx, color_idx, row_idx in moves:
+        num_tiles, round_end, first_player_token = \
+            env.factories.pick_tiles(factory_idx, color_idx)
+        walls[player].add_tiles(color_idx, row_idx, num_tiles,
+                                first_player_token)
+        if round_end:
+            env.end_round()
+        count += perft(env, depth - 1, 1 - player)
+        env.set_state(state)
+    return count
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import gym
+from gym import spaces
+from gym.utils import seeding
+import numpy as np
+
+from .adversary import make_adversary
+from .azul_env import AzulEnv
+from .azul_game import AzulGame
+
+
+class MultiplayerAzulEnv(gym.Env):
+    """Azul for 2 to 4 players, where the agent is player 0.
+
+    The other seats are played by adversaries (registered names) that read
+    and move on the arrays of an `AzulGame`. An observation holds the
+    factories, then the agent's wall and the other players' walls in turn
+    order.
+    """
+    metadata = {'render.modes': []}
+    EMPTY_PICK_REWARD = AzulEnv.EMPTY_PICK_REWARD
+
+    def __init__(self, num_players=2, reward_type='score', adversary='random',
+                 adversary_kwargs=None, refill_buffer=0):
+        super().__init__()
+        self.reward_type = reward_type
+        self.game = AzulGame(num_players, refill_buffer=refill_buffer)
+        self.seed()
+        n = self.game.NUM_COLORS
+        self.action_space = spaces.MultiDiscrete(
+            [self.game.num_factories + 1, n, n])
+        self.observation_space = spaces.MultiDiscrete(self.game.state_space)
+
+        self.adversaries = [None]
+        for player in range(1, num_players):
+            opponent = make_adversary(adversary, self.game.factories,
+                                      self.np_random,
+                                      **(adversary_kwargs or {}))
+            opponent.wall = self.game.walls[player]
+            self.adversaries.append(opponent)
+        self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        self.game.np_random = self.np_random
+        for opponent in getattr(self, 'adversaries', [None])[1:]:
+            opponent.np_random = self.np_random
+        return [seed]
+
+    def reset(self):
+        self.game.reset()
+        self._play_adversaries()
+        return self.game.get_observation(0)
+
+    def step(self, action):
+        assert self.action_space.contains(action)
+        game = self.game
+        info = {}
+        if game.factories.legal[action[0], action[1]]:
+            reward, _ = game.play(*action)
+            self._play_adversaries()
+        else:
+            info['info'] = 'empty pick'
+            reward = self.EMPTY_PICK_REWARD
+            game.num_turns += 1  # empty picks also count towards the limit
+        if self.reward_type != 'score':
+            reward = 0
+
+        done = game.done()
+        if done and self.reward_type == 'win':
+            winners = game.winners()
+            reward = 1 if list(winners) == [0] else -1
+        info['action_mask'] = self.action_masks()
+        return game.get_observation(0), reward, done, info
+
+    def action_masks(self):
+        """Flags the actions that pick at least one tile, as in
+        `AzulEnv.action_masks`.
+        """
+        return np.repeat(self.game.factories.legal.ravel(),
+                         self.game.NUM_COLORS)
+
+    def _play_adversaries(self):
+        # Other players move until it is the agent's turn again
+        game = self.game
+        while game.current_player != 0 and not game.done():
+            game.play(*self.adversaries[game.current_player].act())
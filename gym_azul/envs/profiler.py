@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import time
+
+import numpy as np
+
+NUM_BUCKETS = 40
+CALLS = 0
+TOTAL_NS = 1
+HISTOGRAM = 2
+
+
+class Profiler:
+    """Counts calls and times of the phases of an environment.
+
+    `instrument` replaces a method of an object with a timed wrapper, so
+    objects that are not instrumented run at full speed. Every phase has a
+    row of `counters`: the number of calls, the total nanoseconds and a
+    histogram of durations, where bucket b counts the calls that took
+    between 2 ** (b - 1) and 2 ** b nanoseconds. Rows can live in an
+    external buffer, e.g. shared memory, and be summed across environments.
+    """
+
+    def __init__(self, phases, counters=None):
+        self.phases = list(phases)
+        if counters is None:
+            counters = np.zeros((len(self.phases), HISTOGRAM + NUM_BUCKETS),
+                                dtype=np.int64)
+        self.counters = counters
+        self.instrumented = []
+
+    def instrument(self, owner, name, phase=None):
+        method = getattr(owner, name)
+        row = self.counters[self.phases.index(phase or name)]
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                row[CALLS] += 1
+                row[TOTAL_NS] += elapsed
+                row[HISTOGRAM + min(elapsed.bit_length(),
+                                    NUM_BUCKETS - 1)] += 1
+
+        self.instrumented.append((owner, name, vars(owner).get(name)))
+        setattr(owner, name, timed)
+
+    def count(self, phase):
+        self.counters[self.phases.index(phase), CALLS] += 1
+
+    def remove(self):
+        """Restores the instrumented methods."""
+        for owner, name, original in reversed(self.instrumented):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self.instrumented = []
+
+    def reset(self):
+        self.counters[:] = 0
+
+    def stats(self):
+        return summarize(self.phases, self.counters)
+
+
+def summarize(phases, counters):
+    """Per-phase calls, total and mean nanoseconds and duration histogram.
+
+    `counters` may be the sum of the counters of many environments.
+    """
+    stats = {}
+    for phase, row in zip(phases, counters):
+        calls = int(row[CALLS])
+        stats[phase] = {
+            'calls': calls,
+            'total_ns': int(row[TOTAL_NS]),
+            'mean_ns': row[TOTAL_NS] / calls if calls else 0.0,
+            'histogram': row[HISTOGRAM:].tolist(),
+        }
+    return stats
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import multiprocessing as mp
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from .azul_env import AzulEnv
+from .profiler import HISTOGRAM, NUM_BUCKETS, summarize
+from .vec_env import env_indices, getattr_depth_check
+
+STEP = 0
+RESET = 1
+CLOSE = 2
+CALL = 3
+
+
+def _shared_views(buffers, specs):
+    return {name: np.frombuffer(buffers[name], dtype=dtype).reshape(shape)
+            for name, (dtype, shape) in specs.items()}
+
+
+class SharedMemoryVecEnv:
+    """Steps blocks of `AzulEnv` games in worker processes.
+
+    Each worker owns a contiguous block of games. Actions, observations,
+    rewards, dones and action masks are exchanged through shared memory
+    arrays, and the parent and the workers synchronise with two barriers
+    per step. No observation is pickled. Implements the stable-baselines
+    VecEnv interface, see `vec_env.register_vec_envs`. Finished games are
+    reset automatically and their last observation is kept in
+    `info['terminal_observation']`. `seed`, `get_attr`, `set_attr` and
+    `env_method` reach the games through a pipe per worker.
+
+    With `env_kwargs={'profile': True}`, the workers record their profiling
+    counters in shared memory and `stats()` sums them over all games.
+    """
+
+    def __init__(self, num_envs, num_workers=None, env_kwargs=None,
+                 seed=None, start_method=None):
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        # Observations are copied into shared memory by the workers, in
+        # the dtype the games return them
+        env_kwargs = dict(env_kwargs or {}, copy_observation=False)
+        self.profile = env_kwargs.pop('profile', False)
+        env = AzulEnv(**env_kwargs)
+        self.observation_space = env.observation_space
+        self.action_space = env.action_space
+        self.reward_type = env.reward_type
+
+        observation = env.reset()  # raw or encoded, see `encodings`
+        observation_spec = (observation.dtype,
+                            (num_envs,) + observation.shape)
+        num_actions = len(env.action_masks())
+        self.specs = {
+            'actions': (np.int16, (num_envs, len(self.action_space.nvec))),
+            'observations': observation_spec,
+            'terminal_observations': observation_spec,
+            'rewards': (np.int16, (num_envs,)),
+            'dones': (np.bool_, (num_envs,)),
+            'empty_picks': (np.bool_, (num_envs,)),
+            'action_masks': (np.bool_, (num_envs, num_actions)),
+        }
+        if self.profile:
+            self.phases = env.PROFILED_PHASES
+            self.specs['profile'] = (
+                np.int64, (num_envs, len(self.phases),
+                           HISTOGRAM + NUM_BUCKETS))
+        context = mp.get_context(start_method)
+        self.buffers = {
+            name: context.RawArray('b', int(np.prod(shape)) *
+                                   np.dtype(dtype).itemsize)
+            for name, (dtype, shape) in self.specs.items()}
+        self.arrays = _shared_views(self.buffers, self.specs)
+        self.command = context.RawValue('i', STEP)
+        self.start = context.Barrier(self.num_workers + 1)
+        self.finished = context.Barrier(self.num_workers + 1)
+
+        if seed is None:
+            seed = self._random_seed()
+        blocks = np.array_split(np.arange(num_envs), self.num_workers)
+        self.workers = []
+        self.connections = []
+        for block in blocks:
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(
+                target=_work,
+                args=(env_kwargs, block, seed, self.buffers, self.specs,
+                      self.command, self.start, self.finished,
+                      worker_connection),
+                daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            self.connections.append(connection)
+        self.closed = False
+
+    def reset(self):
+        self._run(RESET)
+        return self.arrays['observations'].copy()
+
+    def step_async(self, actions):
+        self.arrays['actions'][:] = np.reshape(actions,
+                                               self.arrays['actions'].shape)
+        self.command.value = STEP
+        self.start.wait()
+
+    def step_wait(self):
+        self.finished.wait()
+        observations = self.arrays['observations'].copy()
+        rewards = self.arrays['rewards'].copy()
+        dones = self.arrays['dones'].copy()
+        action_masks = self.arrays['action_masks'].copy()
+        infos = [{'action_mask': action_mask} for action_mask in action_masks]
+        for i in np.flatnonzero(self.arrays['empty_picks']):
+            infos[i]['info'] = 'empty pick'
+        for i in np.flatnonzero(dones):
+            infos[i]['terminal_observation'] = \
+                self.arrays['terminal_observations'][i].copy()
+        return observations, rewards, dones, infos
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def seed(self, seed=None):
+        """Seeds game `i` with `seed + i`, as the constructor does."""
+        if seed is None:
+            seed = self._random_seed()
+        return self._call('seed', seed, (), {}, None)
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call('get', attr_name, (), {}, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call('set', attr_name, (value,), {}, indices)
+
+    def env_method(self, method_name, *method_args, indices=None,
+                   **method_kwargs):
+        return self._call('call', method_name, method_args, method_kwargs,
+                          indices)
+
+    def getattr_depth_check(self, name, already_found):
+        return getattr_depth_check(self, name, already_found)
+
+    def action_masks(self):
+        return self.arrays['action_masks'].copy()
+
+    def stats(self):
+        """Profiling statistics of all games, see `AzulEnv.stats`."""
+        if not self.profile:
+            return {}
+        return summarize(self.phases, self.arrays['profile'].sum(axis=0))
+
+    def close(self):
+        if self.closed:
+            return
+        self.command.value = CLOSE
+        try:
+            self.start.wait()
+        except BrokenBarrierError:
+            pass
+        for worker in self.workers:
+            worker.join()
+        self.closed = True
+
+    def _run(self, command):
+        self.command.value = command
+        self.start.wait()
+        self.finished.wait()
+
+    def _random_seed(self):
+        return np.random.randint(2 ** 31 - self.num_envs)
+
+    def _call(self, kind, name, args, kwargs, indices):
+        indices = [int(i) for i in env_indices(self.num_envs, indices)]
+        self.command.value = CALL
+        self.start.wait()
+        for connection in self.connections:
+            connection.send((kind, name, args, kwargs, indices))
+        results = {}
+        errors = []
+        for connection in self.connections:
+            worker_results, error = connection.recv()
+            results.update(worker_results)
+            if error is not None:
+                errors.append(error)
+        self.finished.wait()
+        if errors:
+            raise errors[0]
+        return [results[i] for i in indices]
+
+
+def _call(envs, block, kind, name, args, kwargs, indices):
+    results = {}
+    for i, env in zip(block.tolist(), envs):
+        if kind == 'seed':
+            results[i] = env.seed(int(name) + i)[0]
+        elif i not in indices:
+            continue
+        elif kind == 'get':
+            results[i] = getattr(env, name)
+        elif kind == 'set':
+            results[i] = setattr(env, name, *args)
+        else:
+            results[i] = getattr(env, name)(*args, **kwargs)
+    return results
+
+
+def _work(env_kwargs, block, seed, buffers, specs, command, start,
+          finished, connection):
+    arrays = _shared_views(buffers, specs)
+    envs = [AzulEnv(**env_kwargs) for _ in block]
+    for i, env in zip(block, envs):
+        env.seed(int(seed) + int(i))
+        if 'profile' in arrays:
+            env.enable_profiling(arrays['profile'][i])
+
+    try:
+        while True:
+            start.wait()
+            if command.value == CLOSE:
+                break
+            if command.value == CALL:
+                try:
+                    connection.send((_call(envs, block, *connection.recv()),
+                                     None))
+                except Exception as exception:
+                    connection.send(({}, exception))
+                finished.wait()
+                continue
+
+            for i, env in zip(block, envs):
+                if command.value == RESET:
+                    observation = env.reset()
+                else:
+                    observation, reward, done, info = \
+                        env.step(arrays['actions'][i])
+                    arrays['rewards'][i] = reward
+                    arrays['dones'][i] = done
+                    arrays['empty_picks'][i] = 'info' in info
+                    if done:
+                        arrays['terminal_observations'][i] = observation
+                        observation = env.reset()
+                arrays['observations'][i] = observation
+                arrays['action_masks'][i] = env.action_masks()
+            finished.wait()
+    except BrokenBarrierError:
+        pass
+    except BaseException:
+        start.abort()  # wake the parent up instead of hanging it
+        finished.abort()
+        raise
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import os
+import struct
+
+import gym
+import numpy as np
+
+MAGIC = b'AZULTRJ1'
+HEADER = struct.Struct('<8sHH4x')   # magic, observation size, action size
+
+
+def record_dtype(observation_size, action_size=3):
+    """Packed record of one step: the observation the action was taken on,
+    the action, its reward and whether it ended the episode.
+    """
+    return np.dtype([('observation', np.uint8, (observation_size,)),
+                     ('action', np.uint8, (action_size,)),
+                     ('reward', np.int16),
+                     ('done', np.bool_)])
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """Appends every step of an `AzulEnv` to a binary trajectory file.
+
+    Each step is one fixed-width record of `record_dtype` (73 bytes for the
+    standard game). The observation holds the factories, the wall, the
+    pattern lines and the floor as raw uint8 values, whatever the
+    env's `observation_encoding` or `observation_dtype`, so records can be
+    rendered with `frame_export.render_records`. Records are buffered and
+    appended `buffer_size` at a time, so the file can be read while it
+    grows. Use the recorder as a context manager (or call `close`) so that
+    the last records are written even if an exception is raised. A
+    recorder that is garbage collected also writes them.
+    """
+
+    def __init__(self, env, path, buffer_size=4096):
+        super().__init__(env)
+        observation_size = env.unwrapped.observation.size
+        action_size = len(env.action_space.nvec)
+        self.buffer = np.zeros(buffer_size,
+                               dtype=record_dtype(observation_size,
+                                                  action_size))
+        self.num_buffered = 0
+        header = HEADER.pack(MAGIC, observation_size, action_size)
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(header)
+            self.file.flush()
+        elif _read_header(path) != header:
+            self.file.close()
+            raise ValueError('%s holds records of another format' % path)
+
+    def step(self, action):
+        record = self.buffer[self.num_buffered]
+        # The raw state the action is taken on, not the encoded observation
+        record['observation'] = self.env.unwrapped.observation
+        record['action'] = action
+        observation, reward, done, info = self.env.step(action)
+        record['reward'] = reward
+        record['done'] = done
+        self.num_buffered += 1
+        if self.num_buffered == len(self.buffer):
+            self.flush()
+        return observation, reward, done, info
+
+    def flush(self):
+        self.file.write(self.buffer[:self.num_buffered].tobytes())
+        self.file.flush()
+        self.num_buffered = 0
+
+    def close(self):
+        self._close_file()
+        return self.env.close()
+
+    def __del__(self):
+        self._close_file()
+
+    def _close_file(self):
+        # The file is missing if the constructor failed
+        file = getattr(self, 'file', None)
+        if file is not None and not file.closed:
+            self.flush()
+            file.close()
+
+
+class TrajectoryReader:
+    """Memory-mapped view of a trajectory file.
+
+    `observations`, `actions`, `rewards` and `dones` are zero-copy views of
+    every recorded step. `episode(i)` and `episodes()` return slices of the
+    records, so nothing is loaded until it is accessed. Steps after the
+    last `done` belong to an unfinished episode and are not listed.
+    """
+
+    def __init__(self, path):
+        magic, observation_size, action_size = HEADER.unpack(
+            _read_header(path))
+        if magic != MAGIC:
+            raise ValueError('%s is not a trajectory file' % path)
+
+        dtype = record_dtype(observation_size, action_size)
+        # a record cut short by an interrupted write is ignored
+        num_records = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        if num_records > 0:
+            self.records = np.memmap(path, dtype=dtype, mode='r',
+                                     offset=HEADER.size,
+                                     shape=(num_records,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+        self.observations = self.records['observation']
+        self.actions = self.records['action']
+        self.rewards = self.records['reward']
+        self.dones = self.records['done']
+        self.episode_ends = np.flatnonzero(self.dones) + 1
+        self.episode_starts = np.concatenate([[0], self.episode_ends[:-1]])
+
+    def episode(self, episode_idx):
+        return self.records[self.episode_starts[episode_idx]:
+                            self.episode_ends[episode_idx]]
+
+    def episodes(self):
+        for start, end in zip(self.episode_starts, self.episode_ends):
+            yield self.records[start:end]
+
+    @property
+    def num_episodes(self):
+        return len(self.episode_ends)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _read_header(path):
+    with open(path, 'rb') as trajectory_file:
+        return trajectory_file.read(HEADER.size)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+
+class TranspositionTable:
+    """Bounded map from 64-bit position hashes to evaluations.
+
+    The table has `capacity` entries in buckets of two, indexed by the low
+    bits of the hash. The first entry of a bucket keeps the deepest
+    evaluation stored there. The second entry always takes the latest
+    one, so new positions are not locked out by old deep ones. Evaluations
+    stored with a `depth` only answer lookups of that depth or less.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        assert capacity >= 2 and capacity & (capacity - 1) == 0, \
+            'capacity must be a power of two'
+        self.capacity = capacity
+        self.mask = capacity // 2 - 1
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+        self.depths = [0] * capacity
+        self.reset_stats()
+
+    def __len__(self):
+        return self.capacity - self.keys.count(None)
+
+    def get(self, key, depth=0, default=None):
+        """Evaluation of `key` searched to at least `depth`, else
+        `default`.
+        """
+        self.probes += 1
+        slot = (key & self.mask) << 1
+        for slot in (slot, slot + 1):
+            if self.keys[slot] == key and self.depths[slot] >= depth:
+                self.hits += 1
+                return self.values[slot]
+        return default
+
+    def put(self, key, value, depth=0):
+        self.stores += 1
+        slot = (key & self.mask) << 1
+        first_key = self.keys[slot]
+        if first_key is not None and depth < self.depths[slot]:
+            if first_key != key:
+                self._write(slot + 1, key, value, depth)
+            return  # a deeper evaluation of the key is kept
+        if self.keys[slot + 1] == key:
+            self.keys[slot + 1] = None  # moves to the first entry
+        if first_key not in (None, key):
+            # The replaced entry takes the always-replace slot
+            self._write(slot + 1, first_key, self.values[slot],
+                        self.depths[slot])
+            self.keys[slot] = None
+        self._write(slot, key, value, depth)
+
+    def clear(self):
+        self.keys = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.depths = [0] * self.capacity
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def stats(self):
+        """Lookups, hits, hit rate, stores, replaced entries and load."""
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'load': len(self) / self.capacity,
+        }
+
+    def _write(self, slot, key, value, depth):
+        if self.keys[slot] not in (None, key):
+            self.replacements += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+
+def register_vec_envs():
+    """Makes the batched envs instances of the stable-baselines `VecEnv`.
+
+    They implement its whole interface, but do not subclass it so that
+    gym_azul does not import stable-baselines (and TensorFlow). PPO2 wraps
+    every env that is not a `VecEnv` in a `DummyVecEnv`, so call this once
+    before passing them to a model.
+    """
+    from stable_baselines.common.vec_env import VecEnv
+    from .batched_azul_env import BatchedAzulEnv
+    from .shared_memory_vec_env import SharedMemoryVecEnv
+    VecEnv.register(BatchedAzulEnv)
+    VecEnv.register(SharedMemoryVecEnv)
+
+
+def env_indices(num_envs, indices):
+    """Indices of the envs a `VecEnv` method call applies to."""
+    if indices is None:
+        return range(num_envs)
+    if isinstance(indices, int):
+        return [indices]
+    return indices
+
+
+def getattr_depth_check(env, name, already_found):
+    # As VecEnv.getattr_depth_check, used by VecEnvWrapper.__getattr__
+    if hasattr(env, name) and already_found:
+        return '%s.%s' % (type(env).__module__, type(env).__name__)
+    return None
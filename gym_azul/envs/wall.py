@@ -2,25 +2,91 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2020 Gabriel Mendonça
 
+import functools
+
 import numpy as np
 
 
+def _count_adjacent(line, idx):
+    # Length of the run of equal values of `line` that contains `idx`.
+    start = idx
+    while start > 0 and line[start - 1] == line[idx]:
+        start -= 1
+    end = idx
+    while end < len(line) - 1 and line[end + 1] == line[idx]:
+        end += 1
+    return end - start + 1
+
+
+@functools.lru_cache(maxsize=None)
+def _scoring_tables(num_colors):
+    masks = range(1 << num_colors)
+    adjacent = np.array([[_count_adjacent([(mask >> i) & 1
+                                           for i in range(num_colors)], idx)
+                          for idx in range(num_colors)] for mask in masks])
+
+    # placement[row_mask, column_mask, row_idx, column_idx]
+    row_adj = adjacent[:, None, None, :]
+    col_adj = adjacent[None, :, :, None]
+    placement = np.where(col_adj == 1, row_adj,
+                         np.where(row_adj == 1, col_adj, row_adj + col_adj))
+    placement += 2 * (row_adj == num_colors)  # Full row
+    placement += 7 * (col_adj == num_colors)  # Full column
+
+    color_bonus = np.zeros(1 << num_colors, dtype=int)
+    color_bonus[-1] = 10  # Full color
+
+    # line_cells[row_idx, column_idx] holds the flat indices of the row,
+    # the column and the color cells that a tile at that position belongs to
+    cells = np.arange(num_colors)
+    rows, columns = np.meshgrid(cells, cells, indexing='ij')
+    colors = (columns - rows) % num_colors
+    line_cells = np.stack((
+        rows[..., None] * num_colors + cells,
+        cells * num_colors + columns[..., None],
+        cells * num_colors + (cells + colors[..., None]) % num_colors),
+        axis=2)
+    return placement, color_bonus, line_cells
+
+
+@functools.lru_cache(maxsize=None)
+def _move_tables(num_colors):
+    # columns[color_idx, row_idx] is where a tile of that color goes on that
+    # row, and cells[color_idx, row_idx] its flat index on the wall
+    rows = np.arange(num_colors)
+    columns = (rows + rows[:, None]) % num_colors
+    return columns, rows * num_colors + columns
+
+
 class Wall:
     FLOOR_PENALTY = np.array([-1] * 2 + [-2] * 3 + [-3] * 2)
+    FLOOR_CUMSUM = np.concatenate(([0], np.cumsum(FLOOR_PENALTY)))
 
-    def __init__(self, num_colors):
+    def __init__(self, num_colors, observation=None):
         self.num_colors = num_colors
-        self.reset()
+        self.placement_reward, self.color_bonus, self.line_cells = \
+            _scoring_tables(num_colors)
+        self.line_bits = 1 << np.arange(num_colors)
         self.state_space = ([2] * self.num_colors * self.num_colors +  # wall
                             list(range(2, self.num_colors + 2)) +      # pattern lines num
                             [self.num_colors] * self.num_colors +      # pattern lines color
                             [len(self.FLOOR_PENALTY) + 1])             # floor
+        if observation is None:
+            observation = np.zeros(len(self.state_space), dtype=np.uint8)
+        self._bind(observation)
+        self.reset()
+
+    @property
+    def floor_state(self):
+        return self.observation[-1]
+
+    @floor_state.setter
+    def floor_state(self, floor_state):
+        self.observation[-1] = floor_state
 
     def reset(self):
-        self.state = np.zeros([self.num_colors, self.num_colors], dtype=bool)
-        self.pattern_line_state = np.zeros([2, self.num_colors], dtype=np.uint8)
-        self.floor_state = 0
-        
+        self.observation[:] = 0
+
     def add_tiles(self, color_idx, row_idx, num_tiles, first_player_token):
         assert(num_tiles > 0)
         reward = 0
@@ -59,28 +125,11 @@ class Wall:
         return self.compute_build_reward(row_idx, column_idx)
 
     def compute_build_reward(self, row_idx, column_idx):
-        reward = 0
-        row_adj = self._count_adjacent(self.state[row_idx], column_idx)
-        col_adj = self._count_adjacent(self.state[:, column_idx], row_idx)
-
-        if col_adj == 1:
-            reward = row_adj
-        elif row_adj == 1:
-            reward = col_adj
-        else:
-            reward = row_adj + col_adj
-
-        if row_adj == self.num_colors:  # Full row
-            reward += 2
-        if col_adj == self.num_colors:  # Full column
-            reward += 7
-
-        color_idx = (column_idx - row_idx) % self.num_colors
-        num_same_color = np.sum(
-            [self.is_complete(color_idx, i) for i in range(self.num_colors)])
-        if num_same_color == 5:
-            reward += 10
-        return reward
+        row_mask, column_mask, color_mask = self.state.take(
+            self.line_cells[row_idx, column_idx]) @ self.line_bits
+        return (self.placement_reward[row_mask, column_mask,
+                                      row_idx, column_idx] +
+                self.color_bonus[color_mask])
 
     def break_tiles(self, num_tiles):
         previous = self.floor_state
@@ -91,15 +140,69 @@ class Wall:
     def done(self):
         return bool(self.state.all(axis=1).any())
 
+    def move_rewards(self, num_tiles, first_player_tokens=False):
+        """Rewards of adding tiles to every row, without changing the wall.
+
+        `num_tiles[..., color_idx]` are pick sizes and `first_player_tokens`
+        flags the picks that take the token. Returns what `add_tiles` would
+        return for each pick and row, shaped `num_tiles.shape +
+        (num_colors,)`, and how many tiles would go on the pattern line.
+        """
+        n = self.num_colors
+        placement_reward, color_bonus, _ = _scoring_tables(n)
+        columns, cells = _move_tables(n)
+        rows = np.arange(n)
+        colors = rows[:, None]
+        row_bits = 1 << rows
+
+        # [color_idx, row_idx] of the reward of building a pattern line
+        state = self.state
+        line_tiles, line_colors = self.pattern_line_state.astype(int)
+        on_wall = state.ravel()[cells]
+        row_masks = state @ row_bits
+        column_masks = row_bits @ state
+        color_masks = on_wall @ row_bits
+        build_reward = (
+            placement_reward[row_masks | 1 << columns,
+                             column_masks[columns] | row_bits,
+                             rows, columns] +
+            color_bonus[color_masks[:, None] | row_bits])
+
+        num_tiles = np.asarray(num_tiles, dtype=int)[..., None]
+        available = rows + 1 - line_tiles
+        rejected = on_wall | (line_tiles > 0) & (line_colors != colors)
+        builds = ~rejected & (num_tiles >= available)
+        placed = np.where(rejected, 0, np.minimum(num_tiles, available))
+        broken = num_tiles - placed + \
+            np.asarray(first_player_tokens, dtype=int)[..., None, None]
+
+        floor = int(self.floor_state)
+        floor_cumsum = self.FLOOR_CUMSUM
+        rewards = (np.where(builds, build_reward, 0) +
+                   floor_cumsum[np.minimum(floor + broken,
+                                           len(floor_cumsum) - 1)] -
+                   floor_cumsum[floor])
+        return rewards, placed
+
     def get_observation(self):
-        observation = np.concatenate((np.ndarray.flatten(self.state),
-            np.ndarray.flatten(self.pattern_line_state), [self.floor_state]))
-        return observation
-
-    def _count_adjacent(self, line, idx):
-        change_points = np.where(np.diff(line) != 0)[0] + 1
-        tile_sequences = np.split(np.arange(len(line)), change_points)
-        for seq in tile_sequences:
-            if idx in seq:
-                return len(seq)
-        raise ValueError
+        return self.observation
+
+    def get_state(self):
+        """Wall, pattern lines and floor as `len(state_space)` bytes.
+
+        The layout is the observation's, so states can be moved between
+        wall backends.
+        """
+        return self.get_observation().astype(np.uint8, copy=False).tobytes()
+
+    def set_state(self, state):
+        self.observation[:] = np.frombuffer(state, dtype=np.uint8)
+
+    def _bind(self, observation):
+        # The wall state and the pattern lines are views of `observation`,
+        # which is always uint8 (see `AzulEnv.typed_observation`)
+        assert observation.dtype == np.uint8, 'observation must be uint8'
+        n = self.num_colors
+        self.observation = observation
+        self.state = observation[:n * n].view(bool).reshape(n, n)
+        self.pattern_line_state = observation[n * n:-1].reshape(2, n)
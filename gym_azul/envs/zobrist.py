@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import functools
+
+import numpy as np
+
+from .compact_factories import CompactFactories
+from .wall import Wall
+
+ZOBRIST_SEED = 0x5A0B
+HASH_MASK = (1 << 64) - 1
+
+
+@functools.lru_cache(maxsize=None)
+def zobrist_keys(name, shape):
+    """Random 64-bit keys as nested lists of Python ints.
+
+    Keys are drawn from a fixed seed and `name`, so hashes are the same in
+    every process. Keys for a count of 0 are set to 0 by the callers.
+    """
+    seed = [ZOBRIST_SEED] + list(name.encode())
+    keys = np.random.default_rng(seed).integers(
+        0, 1 << 64, size=shape, dtype=np.uint64)
+    return keys.tolist()
+
+
+def _zero_counts(keys):
+    # Count 0 must not change the hash, so empty positions hash to 0
+    return [[[0] + counts[1:] for counts in row] for row in keys]
+
+
+class ZobristWall(Wall):
+    """Wall that keeps a 64-bit Zobrist hash of its position in `hash`.
+
+    Every tile on the wall, pattern line (row, number of tiles, color) and
+    floor size has a random key, and `hash` is the XOR of the keys of the
+    current position. It is updated by `add_tiles`, `build_tile` and every
+    change of `floor_state` (`break_tiles`, end of round), and recomputed
+    by `reset` and `set_state`.
+    """
+
+    def __init__(self, num_colors, observation=None):
+        n = num_colors
+        self.tile_keys = zobrist_keys('wall', (n, n))
+        # line_keys[row_idx][num_tiles][color_idx]
+        self.line_keys = [[[0] * n] + counts for counts in
+                          zobrist_keys('pattern_lines', (n, n, n))]
+        self.floor_keys = [0] + zobrist_keys(
+            'floor', (len(self.FLOOR_PENALTY),))
+        super().__init__(num_colors, observation)
+
+    @property
+    def floor_state(self):
+        return self.observation[-1]
+
+    @floor_state.setter
+    def floor_state(self, floor_state):
+        self.hash ^= (self.floor_keys[int(self.observation[-1])] ^
+                      self.floor_keys[int(floor_state)])
+        self.observation[-1] = floor_state
+
+    def reset(self):
+        super().reset()
+        self.hash = 0
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.hash = self.compute_hash()
+
+    def compute_hash(self):
+        """Hash of the position computed from scratch."""
+        hash_ = self.floor_keys[int(self.floor_state)]
+        for row_idx, column_idx in zip(*np.nonzero(self.state)):
+            hash_ ^= self.tile_keys[row_idx][column_idx]
+        for row_idx in range(self.num_colors):
+            hash_ ^= self._line_key(row_idx)
+        return hash_
+
+    def add_tiles(self, color_idx, row_idx, num_tiles, first_player_token):
+        line_key = self._line_key(row_idx)
+        was_complete = self.is_complete(color_idx, row_idx)
+        reward = super().add_tiles(color_idx, row_idx, num_tiles,
+                                   first_player_token)
+        # A built line was already hashed by build_tile
+        if was_complete or not self.is_complete(color_idx, row_idx):
+            self.hash ^= line_key ^ self._line_key(row_idx)
+        return reward
+
+    def build_tile(self, color_idx, row_idx):
+        column_idx = (row_idx + color_idx) % self.num_colors
+        self.hash ^= (self._line_key(row_idx) ^
+                      self.tile_keys[row_idx][column_idx])
+        return super().build_tile(color_idx, row_idx)
+
+    def _line_key(self, row_idx):
+        num_tiles, color_idx = self.pattern_line_state[:, row_idx]
+        return self.line_keys[row_idx][num_tiles][color_idx]
+
+
+class ZobristFactories(CompactFactories):
+    """Factories that keep a 64-bit Zobrist hash of their tiles in `hash`.
+
+    Every (factory, color, number of tiles) has a random key, and so does
+    the first player token on the table. `pick_tiles` updates the hash from
+    the running counts of `CompactFactories`. `reset` and `set_state`
+    recompute it.
+    """
+
+    def __init__(self, num_colors, size, num_factories, np_random,
+                 observation=None, refill_buffer=0):
+        table_size = max(self.TABLE_SIZE, (size - 1) * num_factories)
+        self.count_keys = _zero_counts(
+            [zobrist_keys('table', (num_colors, table_size + 1))] +
+            zobrist_keys('factories',
+                         (num_factories, num_colors, size + 1)))
+        self.token_key, = zobrist_keys('first_player_token', (1,))
+        super().__init__(num_colors, size, num_factories, np_random,
+                         observation, refill_buffer)
+
+    def recount(self):
+        super().recount()
+        self.hash = self.compute_hash()
+
+    def compute_hash(self):
+        """Hash of the tiles computed from scratch."""
+        hash_ = self.token_key if self.first_player_table else 0
+        for keys, counts in zip(self.count_keys, self.counts):
+            for color_keys, count in zip(keys, counts):
+                hash_ ^= color_keys[count]
+        return hash_
+
+    def pick_tiles(self, factory_idx, color_idx):
+        counts = self.counts[factory_idx]
+        if counts[color_idx]:
+            keys = self.count_keys
+            hash_ = self.hash
+            if factory_idx != 0:
+                table = self.counts[0]
+                for other_idx, count in enumerate(counts):
+                    if count:
+                        hash_ ^= keys[factory_idx][other_idx][count]
+                        if other_idx != color_idx:
+                            table_keys = keys[0][other_idx]
+                            hash_ ^= (table_keys[table[other_idx]] ^
+                                      table_keys[table[other_idx] + count])
+            else:
+                hash_ ^= keys[0][color_idx][counts[color_idx]]
+                if self.first_player_table:
+                    hash_ ^= self.token_key
+            self.hash = hash_
+        return super().pick_tiles(factory_idx, color_idx)
+
+
+@functools.lru_cache(maxsize=None)
+def _player_multipliers(num_players):
+    # Odd multipliers keep the wall hashes of different seats apart
+    return [key | 1 for key in zobrist_keys('players', (num_players,))]
+
+
+def position_hash(factories, walls):
+    """Hash of a game position from its Zobrist factories and walls.
+
+    `walls` are in seat order, starting with the player to move. Scores
+    are not part of the position.
+    """
+    hash_ = factories.hash
+    for multiplier, wall in zip(_player_multipliers(len(walls)), walls):
+        hash_ ^= (wall.hash * multiplier) & HASH_MASK
+    return hash_
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import json
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from gym_azul.envs.adversary import make_adversary
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.trajectory import record_dtype
+
+SHARD_NAME = 'shard-%05d.npz'
+MANIFEST_NAME = 'manifest.json'
+
+
+def shard_seed(seed, shard_idx):
+    """Seed of an independent random stream for every shard."""
+    return int(np.random.SeedSequence([seed, shard_idx]).generate_state(1)[0])
+
+
+def make_player(env, player, player_model=None):
+    """Adversary that plays the agent seat of `env` on its wall."""
+    kwargs = {'model_path': player_model} if player_model else {}
+    agent = make_adversary(player, env.factories, env.np_random, **kwargs)
+    agent.wall = env.wall
+    return agent
+
+
+def play_shard(shard_idx, num_games, seed=0, player='random',
+               player_model=None, adversary='random', adversary_model=None):
+    """Plays `num_games` games and returns their records and final scores.
+
+    Each record holds the agent's observation, its move, the reward and the
+    done flag, as in `gym_azul.envs.trajectory`.
+    """
+    env = AzulEnv(adversary=adversary, adv_model_path=adversary_model)
+    env.seed(shard_seed(seed, shard_idx))
+    agent = make_player(env, player, player_model)
+
+    records = np.zeros(num_games * env.MAX_ACTIONS,
+                       dtype=record_dtype(env.observation_space.shape[0]))
+    scores = np.zeros((num_games, 2), dtype=np.int16)
+    num_records = 0
+    for game_idx in range(num_games):
+        observation = env.reset()
+        done = False
+        while not done:
+            record = records[num_records]
+            record['observation'] = observation
+            record['action'] = agent.act()
+            observation, reward, done, _ = env.step(record['action'])
+            record['reward'] = reward
+            record['done'] = done
+            num_records += 1
+        scores[game_idx] = env.score, env.adversary.score
+    return records[:num_records], scores
+
+
+def generate(output_dir, num_games, shard_size=1000, num_workers=None,
+             seed=0, log=print, **players):
+    """Plays `num_games` games in a process pool, one shard per task.
+
+    Every shard is written to `output_dir` as a compressed npz file once all
+    its games are played. Shards that already exist are skipped, so an
+    interrupted run resumes where it stopped. The run parameters are kept
+    in a manifest, and resuming with other parameters raises ValueError
+    instead of mixing incompatible shards. Returns the number of games
+    played.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    _check_manifest(output_dir, dict(num_games=num_games,
+                                     shard_size=shard_size, seed=seed,
+                                     **players))
+    num_shards = -(-num_games // shard_size)
+    pending = [shard_idx for shard_idx in range(num_shards)
+               if not os.path.exists(os.path.join(output_dir,
+                                                  SHARD_NAME % shard_idx))]
+    if len(pending) < num_shards:
+        log('resuming: %d of %d shards already written' %
+            (num_shards - len(pending), num_shards))
+
+    tasks = [(output_dir, shard_idx,
+              min(shard_size, num_games - shard_idx * shard_size), seed,
+              players) for shard_idx in pending]
+    start = time.perf_counter()
+    games_played = 0
+    with mp.Pool(num_workers) as pool:
+        for shard_idx, shard_games in pool.imap_unordered(_write_shard,
+                                                          tasks):
+            games_played += shard_games
+            log('shard %d done: %d games, %.1f games/s' %
+                (shard_idx, games_played,
+                 games_played / (time.perf_counter() - start)))
+    return games_played
+
+
+def _check_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as manifest_file:
+            written = json.load(manifest_file)
+        changed = sorted(key for key in set(written) | set(manifest)
+                         if written.get(key) != manifest.get(key))
+        if changed:
+            raise ValueError('%s was generated with other parameters: %s' %
+                             (output_dir, ', '.join(
+                                 '%s=%r (now %r)' % (key, written.get(key),
+                                                     manifest.get(key))
+                                 for key in changed)))
+    elif any(name.startswith('shard-') for name in os.listdir(output_dir)):
+        raise ValueError('%s holds shards without a manifest' % output_dir)
+    else:
+        with open(path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def _write_shard(task):
+    output_dir, shard_idx, num_games, seed, players = task
+    records, scores = play_shard(shard_idx, num_games, seed, **players)
+    path = os.path.join(output_dir, SHARD_NAME % shard_idx)
+    partial_path = path + '.partial'
+    with open(partial_path, 'wb') as shard_file:
+        np.savez_compressed(shard_file, records=records, scores=scores)
+    os.replace(partial_path, path)  # a shard file is always complete
+    return shard_idx, num_games
@@ -2,16 +2,40 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2020 Gabriel Mendonça
 
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock
 
+import numpy as np
+
 from gym_azul.envs.azul_env import AzulEnv
 from gym_azul.envs.factories import Factories
+from gym_azul.envs.model_cache import ModelCache
 from gym_azul.envs.wall import Wall
 
 from gym_azul.envs.adversary import *
 
 
+class MultiDiscreteModel:
+    """Returns probabilities like a stable-baselines 2 MultiDiscrete
+    policy: one (batch, n) array per dimension for a batch, but only the
+    first one (`ret[0]`) for a single observation.
+    """
+
+    def __init__(self):
+        self.observation_shapes = set()
+
+    def action_probability(self, observation):
+        observation = np.asarray(observation)
+        self.observation_shapes.add(observation.shape)
+        batch_size = len(observation) if observation.ndim == 2 else 1
+        probabilities = [np.full((batch_size, n), 1 / n) for n in (6, 5, 5)]
+        if observation.ndim == 1:
+            return probabilities[0]
+        return probabilities
+
+
 class TestAdversary(unittest.TestCase):
     def test_random_first_play(self):
         np_random = Mock()
@@ -19,6 +43,7 @@ class TestAdversary(unittest.TestCase):
         factories = Mock()
         factories.num_colors = 5
         factories.num_factories = 5
+        factories.legal_picks.return_value = np.array([0, 7, 12])
         factories.pick_tiles.return_value = 2, False, True
         adversary = RandomAdversary(factories, np_random)
         adversary.wall = Mock()
@@ -32,6 +57,94 @@ class TestAdversary(unittest.TestCase):
         factories.pick_tiles.assert_called_once_with(0, 0)
         adversary.wall.add_tiles.assert_called_once_with(0, 0, 2, True)
 
+    def test_ppo2_lazy_model(self):
+        factories = Mock()
+        factories.num_colors = 5
+        factories.legal_picks.return_value = np.array([7])
+        factories.get_observation.return_value = np.zeros(31)
+        factories.pick_tiles.return_value = 1, False, False
+        model = Mock()
+        model.action_probability.return_value = [
+            np.full((1, 6), 1 / 6), np.full((1, 5), 0.2),
+            np.array([[0, 0, 1, 0, 0]])]
+        model_cache = Mock()
+        model_cache.get.return_value = model
+
+        adversary = PPO2Adversary(factories, np.random.RandomState(0),
+                                  'model.zip', model_cache=model_cache)
+        model_cache.get.assert_not_called()
+        adversary.wall = Mock()
+        adversary.wall.get_observation.return_value = np.zeros(36)
+        adversary.wall.add_tiles.return_value = 1
+        adversary.play()
+        adversary.play()
+        model_cache.get.assert_called_with('model.zip')
+        self.assertEqual(model_cache.get.call_count, 2)
+        self.assertIsNone(adversary.model)
+        factories.pick_tiles.assert_called_with(1, 2)
+        adversary.wall.add_tiles.assert_called_with(2, 2, 1, False)
+
+    def test_ppo2_multidiscrete_probabilities(self):
+        env = AzulEnv(adv_model=MultiDiscreteModel())
+        env.seed(0)
+        env.reset()
+        for _ in range(20):
+            _, _, done, _ = env.step(np.array(env.adversary.act()))
+            if done:
+                env.reset()
+        self.assertEqual(env.adversary.model.observation_shapes,
+                         {(1, 67)})
+
+    def test_ppo2_reloads_retrained_model(self):
+        models = []
+
+        def load(path):
+            with open(path) as model_file:
+                models.append((model_file.read(), MultiDiscreteModel()))
+            return models[-1][1]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.zip')
+            with open(path, 'w') as model_file:
+                model_file.write('first')
+            env = AzulEnv(adv_model_path=path, adversary_kwargs=dict(
+                model_cache=ModelCache(load)))
+            env.seed(0)
+            env.reset()
+            env.adversary.act()
+            env.adversary.act()
+            with open(path, 'w') as model_file:
+                model_file.write('second')
+            mtime = os.path.getmtime(path)
+            os.utime(path, (mtime + 10, mtime + 10))
+            env.adversary.act()
+
+        self.assertEqual([text for text, _ in models], ['first', 'second'])
+        self.assertEqual(models[0][1].observation_shapes, {(1, 67)})
+        self.assertEqual(models[1][1].observation_shapes, {(1, 67)})
+
+    def test_greedy_act(self):
+        env = AzulEnv(adversary='greedy')
+        env.seed(0)
+        env.reset()
+        self.assertIsInstance(env.adversary, GreedyAdversary)
+        env.factories.state[:] = 0
+        env.factories.state[1, 2] = 2
+        env.factories.state[3, 4] = 3
+        env.factories.set_state(env.factories.get_state())
+        # both picks complete a pattern line, the tie goes to more tiles
+        self.assertEqual(tuple(env.adversary.act()), (3, 4, 2))
+
+    def test_registry(self):
+        register_adversary('test-random',
+                           'gym_azul.envs.adversary:RandomAdversary')
+        env = AzulEnv(adversary='test-random')
+        self.assertIsInstance(env.adversary, RandomAdversary)
+        self.assertIsInstance(AzulEnv().adversary, RandomAdversary)
+        self.assertIsInstance(AzulEnv(adv_model_path='model.zip').adversary,
+                              PPO2Adversary)
+        del ADVERSARIES['test-random']
+
     def test_done(self):
         factories = Mock()
         factories.num_colors = 5
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import asyncio
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.async_azul_env import ActionBatcher, GameManager
+
+
+class RandomPolicy:
+    """Local stand-in for a policy process, answering after `delay`."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.np_random = np.random.RandomState(0)
+        self.batch_sizes = []
+
+    async def __call__(self, observations, action_masks):
+        self.batch_sizes.append(len(observations))
+        await asyncio.sleep(self.delay)
+        actions = np.argmax(
+            action_masks * self.np_random.rand(*action_masks.shape), axis=1)
+        return np.column_stack(np.unravel_index(actions, (6, 5, 5)))
+
+
+class TestAsyncAzulEnv(unittest.TestCase):
+    def test_game_manager(self):
+        policy = RandomPolicy(delay=0.001)
+        manager = GameManager(policy, num_envs=50, max_batch_size=32)
+        results = manager.run(80)
+        self.assertEqual(len(results), 80)
+
+        stats = manager.stats()
+        self.assertEqual(stats['games'], 80)
+        self.assertEqual(stats['moves'],
+                         sum(result['num_moves'] for result in results))
+        self.assertGreater(stats['moves_per_second'], 0)
+        self.assertLessEqual(max(policy.batch_sizes), 32)
+        self.assertGreater(stats['mean_batch_size'], 1)
+        self.assertEqual(sum(policy.batch_sizes), stats['moves'])
+        for result in results:
+            self.assertEqual(len(result['latencies']), result['num_moves'])
+            self.assertGreater(result['duration'], 0)
+
+    def test_sync_policy(self):
+        def first_legal(observations, action_masks):
+            actions = np.argmax(action_masks, axis=1)
+            return np.column_stack(np.unravel_index(actions, (6, 5, 5)))
+
+        manager = GameManager(first_legal, num_envs=4)
+        manager.run(4)
+        self.assertEqual(manager.stats()['games'], 4)
+        self.assertGreater(manager.batcher.mean_batch_size, 1)
+
+    def test_max_wait(self):
+        async def request(batcher, num_requests):
+            masks = np.zeros((num_requests, 150), dtype=bool)
+            masks[:, 30] = True
+            return await asyncio.gather(*(
+                batcher.act(np.zeros(67, dtype=np.uint8), mask)
+                for mask in masks))
+
+        policy = RandomPolicy()
+        batcher = ActionBatcher(policy, max_batch_size=8, max_wait=0.01)
+        actions = asyncio.run(request(batcher, 20))
+        self.assertEqual(policy.batch_sizes, [8, 8, 4])
+        np.testing.assert_array_equal(actions, [[1, 1, 0]] * 20)
+
+    def test_policy_error(self):
+        def failing_policy(observations, action_masks):
+            raise RuntimeError('policy unavailable')
+
+        manager = GameManager(failing_policy, num_envs=2)
+        with self.assertRaises(RuntimeError):
+            manager.run(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
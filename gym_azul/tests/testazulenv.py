@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+
+
+class TestAzulEnv(unittest.TestCase):
+    def _play(self, env, num_steps=100):
+        np_random = np.random.RandomState(0)
+        observations = [env.reset().copy()]
+        for _ in range(num_steps):
+            observation, _, done, _ = env.step(
+                np_random.randint(env.action_space.nvec))
+            if done:
+                observation = env.reset()
+            observations.append(observation.copy())
+        return np.array(observations)
+
+    def test_observation_buffer(self):
+        env = AzulEnv(copy_observation=False)
+        observation = env.reset()
+        self.assertIs(env.step(env.action_space.sample())[0], observation)
+        np.testing.assert_array_equal(
+            observation[:env.factories.state.size],
+            env.factories.state.ravel())
+        self.assertTrue(np.shares_memory(observation, env.wall.state))
+
+    def test_copy_observation(self):
+        env = AzulEnv()
+        observation = env.reset()
+        self.assertIsNot(env.step(env.action_space.sample())[0],
+                         observation)
+        self.assertFalse(np.shares_memory(observation, env.observation))
+
+    def test_observation_dtype(self):
+        observations = {}
+        for observation_dtype in (np.uint8, np.int16, np.int64,
+                                  np.float32):
+            env = AzulEnv(observation_dtype=observation_dtype)
+            env.seed(0)
+            observations[observation_dtype] = self._play(env)
+            self.assertEqual(env.reset().dtype, observation_dtype)
+        np.testing.assert_array_equal(observations[np.int16],
+                                      observations[np.uint8])
+        np.testing.assert_array_equal(observations[np.int64],
+                                      observations[np.uint8])
+        np.testing.assert_array_equal(observations[np.float32],
+                                      observations[np.uint8])
+
+    def test_observation_space(self):
+        env = AzulEnv()
+        env.seed(0)
+        for observation in self._play(env):
+            self.assertTrue(env.observation_space.contains(observation))
+
+    def test_action_masks(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        np_random = np.random.RandomState(0)
+        for _ in range(100):
+            action_masks = env.action_masks()
+            self.assertEqual(action_masks.shape,
+                             (np.prod(env.action_space.nvec),))
+            action = np_random.randint(env.action_space.nvec)
+            legal = action_masks[np.ravel_multi_index(
+                action, env.action_space.nvec)]
+            self.assertEqual(
+                legal, env.factories.state[action[0], action[1]] > 0)
+            _, _, done, info = env.step(action)
+            self.assertEqual('info' not in info, legal)
+            np.testing.assert_array_equal(info['action_mask'],
+                                          env.action_masks())
+            if done:
+                env.reset()
+
+    def _trajectory(self, env, num_steps=60):
+        np_random = np.random.RandomState(1)
+        trajectory = []
+        for _ in range(num_steps):
+            observation, reward, done, _ = env.step(
+                np_random.randint(env.action_space.nvec))
+            trajectory.append((observation.copy(), reward, done))
+            if done:
+                break
+        return trajectory
+
+    def _assert_same_trajectory(self, trajectory, other):
+        self.assertEqual(len(trajectory), len(other))
+        for (observation, reward, done), (other_observation, other_reward,
+                                          other_done) in zip(trajectory,
+                                                             other):
+            np.testing.assert_array_equal(observation, other_observation)
+            self.assertEqual(reward, other_reward)
+            self.assertEqual(done, other_done)
+
+    def test_get_set_state(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        self._trajectory(env, 20)
+        state = env.get_state()
+        trajectory = self._trajectory(env)
+        env.set_state(state)
+        self.assertEqual(env.get_state(), state)
+        self._assert_same_trajectory(self._trajectory(env), trajectory)
+
+    def test_state_size(self):
+        env = AzulEnv()
+        sizes = set()
+        for _ in range(5):
+            env.reset()
+            self._trajectory(env, 20)
+            sizes.add(len(env.get_state()))
+            sizes.add(len(env.get_state(include_rng=False)) + 2500)
+        self.assertEqual(sizes, {env.state_size()})
+
+    def test_invalid_state(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        state = env.get_state()
+        with self.assertRaises(ValueError):
+            env.set_state(AzulEnv(refill_buffer=4).get_state())
+        with self.assertRaises(ValueError):
+            env.set_state(env.get_state(include_rng=False) + bytes(8))
+        with self.assertRaises(ValueError):  # random generator position
+            env.set_state(state[:-4] + AzulEnv.RNG_POSITION.pack(-1528))
+        self.assertEqual(env.get_state(), state)
+        env.reset()
+
+    def test_clone(self):
+        env = AzulEnv(wall_type='bitboard')
+        env.seed(0)
+        env.reset()
+        self._trajectory(env, 20)
+        clone = env.clone()
+        self.assertIsNot(clone.factories, env.factories)
+        self._assert_same_trajectory(self._trajectory(clone),
+                                     self._trajectory(env))
+
+    def test_state_across_wall_types(self):
+        env = AzulEnv(wall_type='array')
+        env.seed(0)
+        env.reset()
+        self._trajectory(env, 20)
+        bitboard_env = AzulEnv(wall_type='bitboard')
+        bitboard_env.set_state(env.get_state())
+        self._assert_same_trajectory(self._trajectory(bitboard_env),
+                                     self._trajectory(env))
+
+    def test_state_across_factories_types(self):
+        env = AzulEnv(factories_type='array')
+        env.seed(0)
+        env.reset()
+        self._trajectory(env, 20)
+        compact_env = AzulEnv(factories_type='compact')
+        compact_env.set_state(env.get_state())
+        self._assert_same_trajectory(self._trajectory(compact_env),
+                                     self._trajectory(env))
+
+    def test_refill_buffer(self):
+        env = AzulEnv(refill_buffer=4)
+        env.seed(0)
+        observations = self._play(env, 300)
+        env.seed(0)
+        np.testing.assert_array_equal(self._play(env, 300), observations)
+
+        # legal moves go through several refills of the buffer
+        env.seed(1)
+        env.reset()
+        for _ in range(15):
+            env.step(np.array(env.adversary.act()))
+        clone = env.clone()
+        for _ in range(60):
+            action = np.array(env.adversary.act())
+            clone.adversary.act()
+            observation, _, done, _ = env.step(action)
+            np.testing.assert_array_equal(clone.step(action)[0], observation)
+            if done:
+                break
+
+    def test_profiling(self):
+        env = AzulEnv(profile=True)
+        env.seed(0)
+        observations = self._play(env)
+        stats = env.stats()
+        self.assertEqual(stats['step']['calls'], 100)
+        self.assertEqual(stats['action_space.contains']['calls'], 100)
+        self.assertEqual(stats['step']['calls'],
+                         stats['adversary.play']['calls'] +
+                         stats['empty_pick']['calls'])
+        self.assertEqual(sum(stats['step']['histogram']), 100)
+        self.assertGreater(stats['step']['mean_ns'],
+                           stats['pick_tiles']['mean_ns'])
+
+        env.disable_profiling()
+        self.assertNotIn('step', vars(env))
+        self.assertEqual(env.stats(), {})
+        env.seed(0)
+        np.testing.assert_array_equal(self._play(env), observations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_game import AzulGame
+from gym_azul.envs.multiplayer_azul_env import MultiplayerAzulEnv
+from gym_azul.envs.wall import Wall
+
+
+def random_move(game):
+    moves, _ = game.legal_moves()
+    return moves[game.np_random.randint(len(moves))]
+
+
+class TestAzulGame(unittest.TestCase):
+    def test_init(self):
+        for num_players, num_factories in AzulGame.NUM_FACTORIES.items():
+            game = AzulGame(num_players, np.random.RandomState(0))
+            self.assertEqual(game.factories.num_factories, num_factories)
+            self.assertEqual(game.factories.state[1:].sum(),
+                             num_factories * game.FACTORY_SIZE)
+            self.assertEqual(len(game.get_observation()),
+                             len(game.state_space))
+            self.assertTrue(np.all(game.get_observation() <
+                                   game.state_space))
+
+    def test_walls_share_players_array(self):
+        game = AzulGame(3)
+        game.walls[1].state[2, 3] = True
+        game.walls[2].floor_state = 4
+        self.assertTrue(game.wall_states[1, 2, 3])
+        self.assertEqual(game.floors[2], 4)
+        self.assertEqual(game.players.sum(), 5)
+
+    def test_play(self):
+        for num_players in AzulGame.NUM_FACTORIES:
+            game = AzulGame(num_players, np.random.RandomState(num_players))
+            walls = [Wall(game.NUM_COLORS) for _ in range(num_players)]
+            scores = np.zeros(num_players, dtype=int)
+            while not game.done():
+                player = game.current_player
+                factory_idx, color_idx, row_idx = random_move(game)
+                num_tiles = game.factories.state[factory_idx, color_idx]
+                token = factory_idx == 0 and game.factories.first_player_table
+                scores[player] += walls[player].add_tiles(
+                    color_idx, row_idx, num_tiles, token)
+
+                reward, round_end = game.play(factory_idx, color_idx, row_idx)
+                self.assertEqual(reward, scores[player] -
+                                 (game.scores[player] - reward))
+                np.testing.assert_array_equal(game.scores, scores)
+                for wall, player_wall in zip(walls, game.walls):
+                    np.testing.assert_array_equal(wall.state,
+                                                  player_wall.state)
+
+                if token:
+                    self.assertEqual(game.first_player, player)
+                if round_end:
+                    self.assertEqual(game.current_player, game.first_player)
+                    self.assertFalse(game.floors.any())
+                    for wall in walls:
+                        wall.floor_state = 0
+                else:
+                    self.assertEqual(game.current_player,
+                                     (player + 1) % num_players)
+            self.assertIn(game.scores.argmax(), game.winners())
+
+    def test_illegal_play(self):
+        game = AzulGame(2)
+        with self.assertRaises(ValueError):
+            game.play(0, 0, 0)  # the table starts empty
+
+    def test_observation(self):
+        game = AzulGame(4, np.random.RandomState(0))
+        for _ in range(3):
+            game.play(*random_move(game))
+        num_fields = game.players.shape[1]
+        observation = game.get_observation(2)[-4 * num_fields:]
+        np.testing.assert_array_equal(
+            observation.reshape(4, num_fields), game.players[[2, 3, 0, 1]])
+        np.testing.assert_array_equal(game.get_observation(),
+                                      game.get_observation(3))
+
+
+class TestMultiplayerAzulEnv(unittest.TestCase):
+    def test_episode(self):
+        for num_players in (3, 4):
+            env = MultiplayerAzulEnv(num_players, adversary='greedy')
+            env.seed(0)
+            observation = env.reset()
+            self.assertTrue(env.observation_space.contains(observation))
+            action_mask = env.action_masks()
+            done = False
+            while not done:
+                self.assertEqual(env.game.current_player, 0)
+                action = random_move(env.game)
+                self.assertTrue(action_mask[np.ravel_multi_index(
+                    action, env.action_space.nvec)])
+                observation, reward, done, info = env.step(action)
+                action_mask = info['action_mask']
+                self.assertTrue(env.observation_space.contains(observation))
+            self.assertTrue(env.game.done())
+
+    def test_empty_pick(self):
+        env = MultiplayerAzulEnv(3)
+        env.reset()
+        num_turns = env.game.num_turns
+        _, reward, _, info = env.step(np.array([0, 0, 0]))
+        self.assertEqual(reward, env.EMPTY_PICK_REWARD)
+        self.assertEqual(info['info'], 'empty pick')
+        self.assertEqual(env.game.num_turns, num_turns + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
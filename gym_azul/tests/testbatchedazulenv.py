@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import importlib.util
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.batched_azul_env import BatchedAzulEnv
+from gym_azul.envs.vec_env import register_vec_envs
+
+
+class TestBatchedAzulEnv(unittest.TestCase):
+    NUM_ENVS = 8
+    NUM_STEPS = 300
+
+    def _compare(self, reward_type):
+        seeds = list(range(self.NUM_ENVS))
+        batched = BatchedAzulEnv(self.NUM_ENVS, reward_type)
+        batched.seed(seeds)
+        envs = [AzulEnv(reward_type=reward_type) for _ in seeds]
+        for env, seed in zip(envs, seeds):
+            env.seed(seed)
+
+        observations = batched.reset()
+        for i, env in enumerate(envs):
+            np.testing.assert_array_equal(observations[i], env.reset())
+
+        action_random = np.random.RandomState(0)
+        for _ in range(self.NUM_STEPS):
+            actions = action_random.randint(
+                batched.action_space.nvec, size=(self.NUM_ENVS, 3))
+            observations, rewards, dones, infos = batched.step(actions)
+            for i, env in enumerate(envs):
+                observation, reward, done, info = env.step(actions[i])
+                self.assertEqual(rewards[i], reward)
+                self.assertEqual(dones[i], done)
+                self.assertEqual(infos[i].get('info'), info.get('info'))
+                if done:
+                    np.testing.assert_array_equal(
+                        infos[i]['terminal_observation'], observation)
+                    observation = env.reset()
+                np.testing.assert_array_equal(observations[i], observation)
+                np.testing.assert_array_equal(infos[i]['action_mask'],
+                                              env.action_masks())
+
+    def test_same_games_as_azul_env_score(self):
+        self._compare('score')
+
+    def test_same_games_as_azul_env_win(self):
+        self._compare('win')
+
+    def test_observation_space(self):
+        batched = BatchedAzulEnv(2)
+        observations = batched.reset()
+        self.assertEqual(observations.shape,
+                         (2,) + batched.observation_space.shape)
+        for observation in observations:
+            self.assertTrue(batched.observation_space.contains(observation))
+
+    def test_vec_env_methods(self):
+        batched = BatchedAzulEnv(3)
+        batched.seed(0)
+        batched.reset()
+        stepped = BatchedAzulEnv(3)
+        stepped.seed(0)
+        stepped.reset()
+        actions = np.array([[1, 0, 0], [2, 1, 1], [0, 0, 0]])
+        batched.step_async(actions)
+        for result, expected in zip(batched.step_wait(),
+                                    stepped.step(actions)[:3]):
+            np.testing.assert_array_equal(result, expected)
+
+        self.assertEqual(batched.get_attr('reward_type'), ['score'] * 3)
+        self.assertEqual(batched.get_attr('num_envs', indices=[0, 2]),
+                         [3, 3])
+        batched.set_attr('reward_type', 'win')
+        self.assertEqual(batched.reward_type, 'win')
+        with self.assertRaises(ValueError):
+            batched.set_attr('reward_type', 'score', indices=1)
+        action_masks = batched.env_method('action_masks', indices=[1])
+        self.assertEqual(len(action_masks), 1)
+        np.testing.assert_array_equal(action_masks[0],
+                                      batched.action_masks())
+        self.assertIsNone(batched.getattr_depth_check('num_envs', False))
+        self.assertIsNotNone(batched.getattr_depth_check('num_envs', True))
+        self.assertEqual(len(batched.seed(1)), 3)
+        batched.close()
+
+    @unittest.skipUnless(importlib.util.find_spec('stable_baselines'),
+                         'stable-baselines is not installed')
+    def test_registered_vec_env(self):
+        from stable_baselines.common.vec_env import VecEnv
+        register_vec_envs()
+        self.assertIsInstance(BatchedAzulEnv(2), VecEnv)
+
+
+if __name__ == '__main__':
+    unittest.main()
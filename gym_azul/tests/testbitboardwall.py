@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.bitboard_wall import BitboardWall
+from gym_azul.envs.wall import Wall
+
+
+class TestBitboardWall(unittest.TestCase):
+    def test_build_reward(self):
+        np_random = np.random.RandomState(0)
+        wall = Wall(AzulEnv.NUM_COLORS)
+        bitboard_wall = BitboardWall(AzulEnv.NUM_COLORS)
+        for _ in range(1000):
+            state = np_random.rand(AzulEnv.NUM_COLORS,
+                                   AzulEnv.NUM_COLORS) < np_random.rand()
+            row_idx, column_idx = np_random.randint(AzulEnv.NUM_COLORS,
+                                                    size=2)
+            state[row_idx, column_idx] = True
+            wall.state = state
+            bitboard_wall.state = state
+            np.testing.assert_array_equal(bitboard_wall.state, state)
+            self.assertEqual(
+                bitboard_wall.compute_build_reward(row_idx, column_idx),
+                wall.compute_build_reward(row_idx, column_idx))
+
+    def test_add_tiles(self):
+        np_random = np.random.RandomState(0)
+        wall = Wall(AzulEnv.NUM_COLORS)
+        bitboard_wall = BitboardWall(AzulEnv.NUM_COLORS)
+        for _ in range(20):
+            wall.reset()
+            bitboard_wall.reset()
+            while not wall.done():
+                color_idx, row_idx = np_random.randint(AzulEnv.NUM_COLORS,
+                                                       size=2)
+                num_tiles = np_random.randint(1, 5)
+                first_player_token = np_random.rand() < 0.1
+                self.assertEqual(
+                    bitboard_wall.add_tiles(color_idx, row_idx, num_tiles,
+                                            first_player_token),
+                    wall.add_tiles(color_idx, row_idx, num_tiles,
+                                   first_player_token))
+                self.assertEqual(bitboard_wall.done(), wall.done())
+                np.testing.assert_array_equal(
+                    bitboard_wall.pattern_line_state,
+                    wall.pattern_line_state)
+                np.testing.assert_array_equal(bitboard_wall.get_observation(),
+                                              wall.get_observation())
+                if np_random.rand() < 0.2:
+                    wall.floor_state = bitboard_wall.floor_state = 0
+
+    def test_state_arrays(self):
+        wall = BitboardWall(AzulEnv.NUM_COLORS)
+        with self.assertRaises(ValueError):
+            wall.state[0, 1] = True
+        with self.assertRaises(ValueError):
+            wall.pattern_line_state[0, 2] = 1
+
+        state = np.eye(AzulEnv.NUM_COLORS, dtype=bool)
+        pattern_line_state = np.zeros((2, AzulEnv.NUM_COLORS), np.uint8)
+        pattern_line_state[:, 2] = 1, 3
+        wall.state = state
+        wall.pattern_line_state = pattern_line_state
+        np.testing.assert_array_equal(wall.state, state)
+        np.testing.assert_array_equal(wall.pattern_line_state,
+                                      pattern_line_state)
+
+    def test_azul_env_wall_type(self):
+        env = AzulEnv(wall_type='array')
+        bitboard_env = AzulEnv(wall_type='bitboard')
+        env.seed(0)
+        bitboard_env.seed(0)
+        np.testing.assert_array_equal(bitboard_env.reset(), env.reset())
+        np_random = np.random.RandomState(0)
+        for _ in range(200):
+            action = np_random.randint(env.action_space.nvec)
+            observation, reward, done, _ = env.step(action)
+            bitboard_observation, bitboard_reward, bitboard_done, _ = \
+                bitboard_env.step(action)
+            np.testing.assert_array_equal(bitboard_observation, observation)
+            self.assertEqual(bitboard_reward, reward)
+            self.assertEqual(bitboard_done, done)
+            if done:
+                np.testing.assert_array_equal(bitboard_env.reset(),
+                                              env.reset())
+
+
+if __name__ == '__main__':
+    unittest.main()
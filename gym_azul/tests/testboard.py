@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.board import Board
+
+
+class TestBoard(unittest.TestCase):
+    def test_dirty_render(self):
+        for wall_type in AzulEnv.WALL_TYPES:
+            env = AzulEnv(wall_type=wall_type)
+            env.seed(0)
+            board = Board(256, 256, env.NUM_COLORS, env.NUM_FACTORIES)
+            canvas = board.img
+            for _ in range(3):
+                env.reset()
+                done = False
+                while not done:
+                    _, _, done, _ = env.step(env.action_space.sample())
+                    image = board.render(env.factories, env.wall)
+                    fresh = Board(256, 256, env.NUM_COLORS,
+                                  env.NUM_FACTORIES)
+                    np.testing.assert_array_equal(
+                        image, fresh.render(env.factories, env.wall))
+            self.assertIs(image, canvas)
+            self.assertEqual(image.dtype, np.uint8)
+
+    def test_reset(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        board = Board(256, 256, env.NUM_COLORS, env.NUM_FACTORIES)
+        board.render(env.factories, env.wall)
+        self.assertFalse(np.array_equal(board.img, board.background))
+        board.reset()
+        np.testing.assert_array_equal(board.img, board.background)
+
+    def test_env_render(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        image = env.render(mode='rgb_array')
+        factory_idx, color_idx = divmod(env.factories.legal_picks()[0],
+                                        env.NUM_COLORS)
+        env.step(np.array([factory_idx, color_idx, 0]))
+        self.assertFalse(np.array_equal(image,
+                                        env.render(mode='rgb_array')))
+        self.assertEqual(image.shape, (1024, 1024, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
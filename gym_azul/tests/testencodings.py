@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.batched_azul_env import BatchedAzulEnv
+from gym_azul.envs.encodings import ObservationEncoder
+from gym_azul.envs.shared_memory_vec_env import SharedMemoryVecEnv
+
+
+def one_hot(observation, state_space):
+    return np.concatenate([np.eye(size)[value]
+                           for size, value in zip(state_space, observation)])
+
+
+def binary_digits(observation, state_space):
+    return np.concatenate([
+        [(value >> shift) & 1
+         for shift in reversed(range(max(int(size - 1).bit_length(), 1)))]
+        for size, value in zip(state_space, observation)])
+
+
+class TestEncodings(unittest.TestCase):
+    NUM_STEPS = 200
+
+    def _observations(self):
+        env = AzulEnv()
+        env.seed(0)
+        observations = [env.reset().copy()]
+        np_random = np.random.RandomState(0)
+        for _ in range(self.NUM_STEPS):
+            observation, _, done, _ = env.step(
+                np_random.randint(env.action_space.nvec))
+            observations.append(env.reset() if done else observation.copy())
+        return env.observation_space.nvec, np.array(observations)
+
+    def test_one_hot(self):
+        state_space, observations = self._observations()
+        encoder = ObservationEncoder(state_space, 'one_hot')
+        for observation in observations:
+            encoded = encoder.encode(observation)
+            self.assertEqual(encoded.dtype, np.float32)
+            self.assertTrue(encoder.observation_space.contains(encoded))
+            np.testing.assert_array_equal(
+                encoded, one_hot(observation, state_space))
+
+    def test_bit_planes(self):
+        state_space, observations = self._observations()
+        encoder = ObservationEncoder(state_space, 'bit_planes')
+        for observation in observations:
+            encoded = encoder.encode(observation)
+            self.assertEqual(encoded.dtype, np.uint8)
+            self.assertTrue(encoder.observation_space.contains(encoded))
+            np.testing.assert_array_equal(
+                np.unpackbits(encoded)[:encoder.num_bits],
+                binary_digits(observation, state_space))
+
+    def test_batch(self):
+        state_space, observations = self._observations()
+        for encoding in ('one_hot', 'bit_planes'):
+            encoder = ObservationEncoder(state_space, encoding, 4)
+            encoded = encoder.encode(observations).copy()  # grows buffers
+            self.assertEqual(encoded.shape,
+                             (len(observations), encoder.size))
+            for observation, expected in zip(observations[:10], encoded):
+                np.testing.assert_array_equal(encoder.encode(observation),
+                                              expected)
+            np.testing.assert_array_equal(
+                encoder.encode(observations[3:5]), encoded[3:5])
+
+    def test_azul_env(self):
+        for encoding in ('one_hot', 'bit_planes'):
+            env = AzulEnv()
+            encoded_env = AzulEnv(observation_encoding=encoding)
+            encoder = ObservationEncoder(env.observation_space.nvec,
+                                         encoding)
+            env.seed(0)
+            encoded_env.seed(0)
+            np.testing.assert_array_equal(encoded_env.reset(),
+                                          encoder.encode(env.reset()))
+            np_random = np.random.RandomState(0)
+            for _ in range(self.NUM_STEPS):
+                action = np_random.randint(env.action_space.nvec)
+                observation, _, done, _ = env.step(action)
+                encoded, _, _, _ = encoded_env.step(action)
+                self.assertTrue(encoded_env.observation_space.contains(
+                    encoded))
+                np.testing.assert_array_equal(encoded,
+                                              encoder.encode(observation))
+                if done:
+                    env.reset()
+                    encoded_env.reset()
+
+    def test_batched_azul_env(self):
+        num_envs = 8
+        batched = BatchedAzulEnv(num_envs)
+        encoded_batched = BatchedAzulEnv(num_envs,
+                                         observation_encoding='one_hot')
+        encoder = ObservationEncoder(batched.observation_space.nvec,
+                                     'one_hot')
+        batched.seed(0)
+        encoded_batched.seed(0)
+        np.testing.assert_array_equal(encoded_batched.reset(),
+                                      encoder.encode(batched.reset()))
+        np_random = np.random.RandomState(0)
+        for _ in range(self.NUM_STEPS):
+            actions = np_random.randint(batched.action_space.nvec,
+                                        size=(num_envs, 3))
+            observations, _, dones, infos = batched.step(actions)
+            encoded, _, _, encoded_infos = encoded_batched.step(actions)
+            self.assertEqual(encoded.shape,
+                             (num_envs,) +
+                             encoded_batched.observation_space.shape)
+            np.testing.assert_array_equal(encoded,
+                                          encoder.encode(observations))
+            for i in np.flatnonzero(dones):
+                np.testing.assert_array_equal(
+                    encoded_infos[i]['terminal_observation'],
+                    encoder.encode(infos[i]['terminal_observation']))
+
+    def test_kept_observations(self):
+        for encoding in ('raw', 'one_hot', 'bit_planes'):
+            batched = BatchedAzulEnv(4, observation_encoding=encoding)
+            env = AzulEnv(observation_encoding=encoding)
+            for vec_env, actions in ((batched, np.ones((4, 3), int)),
+                                     (env, np.ones(3, int))):
+                first = vec_env.reset()
+                expected = first.copy()
+                second = vec_env.step(actions)[0]
+                np.testing.assert_array_equal(first, expected)
+                self.assertFalse(np.shares_memory(first, second))
+
+    def test_shared_memory_vec_env(self):
+        vec_env = SharedMemoryVecEnv(
+            2, num_workers=1, seed=0,
+            env_kwargs={'observation_encoding': 'bit_planes'})
+        try:
+            observations = vec_env.reset()
+            env = AzulEnv(observation_encoding='bit_planes')
+            env.seed(0)
+            np.testing.assert_array_equal(observations[0], env.reset())
+            self.assertEqual(observations.dtype, np.uint8)
+        finally:
+            vec_env.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
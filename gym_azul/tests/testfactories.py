@@ -7,26 +7,32 @@ import unittest
 import numpy as np
 
 from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.compact_factories import CompactFactories
 from gym_azul.envs.factories import Factories
 
 
 class TestFactories(unittest.TestCase):
+    factories_class = Factories
+
     def _pick_first(self, factories):
         factory_idx, color_idx = np.unravel_index(
             (factories.state > 0).argmax(), factories.state.shape)
         return factories.pick_tiles(factory_idx, color_idx)
 
     def test_round_end(self):
-        factories = Factories(AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE,
-            AzulEnv.NUM_FACTORIES, np.random.RandomState())
+        factories = self.factories_class(
+            AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE, AzulEnv.NUM_FACTORIES,
+            np.random.RandomState())
         while factories.state.sum() > 0:
             num_tiles, round_end, _ = self._pick_first(factories)
             self.assertGreater(num_tiles, 0)
         self.assertTrue(round_end)
 
     def test_pick_tiles_first_player(self):
-        factories = Factories(AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE,
-            AzulEnv.NUM_FACTORIES, np.random.RandomState())
+        # Factory 1 holds three colors, so its pick leaves tiles on the table
+        factories = self.factories_class(
+            AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE, AzulEnv.NUM_FACTORIES,
+            np.random.RandomState(0))
 
         num_tiles, round_end, first_player_token = self._pick_first(factories)
         self.assertGreater(num_tiles, 0)
@@ -43,6 +49,92 @@ class TestFactories(unittest.TestCase):
         self.assertFalse(round_end)
         self.assertFalse(first_player_token)
 
+    def test_legal_picks(self):
+        factories = self.factories_class(
+            AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE, AzulEnv.NUM_FACTORIES,
+            np.random.RandomState(0))
+        np_random = np.random.RandomState(0)
+        for _ in range(200):
+            np.testing.assert_array_equal(factories.legal, factories.state > 0)
+            np.testing.assert_array_equal(
+                factories.legal_picks(), np.flatnonzero(factories.state))
+            factory_idx = np_random.randint(AzulEnv.NUM_FACTORIES + 1)
+            color_idx = np_random.randint(AzulEnv.NUM_COLORS)
+            _, round_end, _ = factories.pick_tiles(factory_idx, color_idx)
+            if round_end:
+                factories.reset()
+
+    def test_refill_buffer(self):
+        factories = self.factories_class(
+            AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE, AzulEnv.NUM_FACTORIES,
+            np.random.RandomState(0), refill_buffer=8)
+        rounds = []
+        for _ in range(20):
+            factories.reset()
+            rounds.append(factories.state.copy())
+        rounds = np.array(rounds)
+        np.testing.assert_array_equal(rounds[:, 0], 0)
+        np.testing.assert_array_equal(rounds[:, 1:].sum(axis=2),
+                                      AzulEnv.FACTORY_SIZE)
+        self.assertGreater(len(np.unique(rounds.reshape(20, -1), axis=0)),
+                           1)
+        # the tiles of 8 rounds are drawn at once, the first one when the
+        # factories are created
+        tiles = np.random.RandomState(0).randint(
+            AzulEnv.NUM_COLORS, size=(8, AzulEnv.NUM_FACTORIES,
+                                      AzulEnv.FACTORY_SIZE))
+        counts = (tiles[..., None] == np.arange(AzulEnv.NUM_COLORS)).sum(
+            axis=2)
+        np.testing.assert_array_equal(rounds[:7, 1:], counts[1:])
+
+        factories.np_random = np.random.RandomState(0)
+        factories.reset()
+        np.testing.assert_array_equal(factories.state[1:], counts[0])
+
+
+class TestCompactFactories(TestFactories):
+    factories_class = CompactFactories
+
+    def test_same_as_factories(self):
+        factories = Factories(AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE,
+            AzulEnv.NUM_FACTORIES, np.random.RandomState(0))
+        compact = CompactFactories(AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE,
+            AzulEnv.NUM_FACTORIES, np.random.RandomState(0))
+        np_random = np.random.RandomState(0)
+        for _ in range(500):
+            np.testing.assert_array_equal(compact.observation,
+                                          factories.observation)
+            np.testing.assert_array_equal(compact.legal, factories.legal)
+            self.assertEqual(compact.counts, factories.state.tolist())
+            self.assertEqual(compact.totals,
+                             factories.state.sum(axis=1).tolist())
+            self.assertEqual(compact.num_tiles, factories.state.sum())
+
+            factory_idx = np_random.randint(AzulEnv.NUM_FACTORIES + 1)
+            color_idx = np_random.randint(AzulEnv.NUM_COLORS)
+            self.assertEqual(compact.is_legal(factory_idx, color_idx),
+                             factories.legal[factory_idx, color_idx])
+            self.assertEqual(compact.is_empty(factory_idx),
+                             not factories.state[factory_idx].any())
+            result = compact.pick_tiles(factory_idx, color_idx)
+            self.assertEqual(result,
+                             factories.pick_tiles(factory_idx, color_idx))
+            if result[1]:
+                compact.reset()
+                factories.reset()
+
+    def test_set_state(self):
+        factories = CompactFactories(AzulEnv.NUM_COLORS,
+            AzulEnv.FACTORY_SIZE, AzulEnv.NUM_FACTORIES,
+            np.random.RandomState(0))
+        state = factories.get_state()
+        factories.pick_tiles(*np.unravel_index(factories.legal_picks()[0],
+                                               factories.state.shape))
+        factories.set_state(state)
+        self.assertEqual(factories.counts, factories.state.tolist())
+        self.assertEqual(factories.num_tiles,
+                         AzulEnv.NUM_FACTORIES * AzulEnv.FACTORY_SIZE)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+
+from gym import error
+import numpy as np
+
+from gym_azul.envs import frame_export
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.trajectory import TrajectoryReader, TrajectoryRecorder
+from gym_azul.selfplay import play_shard
+
+
+def play_episode(seed=0, **env_kwargs):
+    env = AzulEnv(**env_kwargs)
+    env.seed(seed)
+    env.reset()
+    states, images = [env.get_state()], [env.render(mode='rgb_array')]
+    done = False
+    while not done:
+        _, _, done, _ = env.step(env.action_space.sample())
+        states.append(env.get_state())
+        images.append(env.render(mode='rgb_array'))
+    return states, images
+
+
+class TestFrameExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_render_episode(self):
+        states, images = play_episode()
+        frames = frame_export.render_episode(states, 1024, 1024)
+        np.testing.assert_array_equal(frames, images)
+
+        thumbnails = frame_export.render_episode(states, 64, 96)
+        self.assertEqual(thumbnails.shape, (len(states), 64, 96, 4))
+
+    def test_env_configuration(self):
+        states, images = play_episode(refill_buffer=4)
+        frames = frame_export.render_episode(
+            states, 1024, 1024, env_kwargs={'refill_buffer': 4})
+        np.testing.assert_array_equal(frames, images)
+        with self.assertRaises(ValueError):
+            frame_export.render_episode(states)
+
+    def test_rgb_array_mode(self):
+        self.assertIn('rgb_array', AzulEnv.metadata['render.modes'])
+
+    def test_render_records(self):
+        path = os.path.join(self.directory, 'games.trj')
+        env = AzulEnv()
+        env.seed(0)
+        with TrajectoryRecorder(env, path) as recorder:
+            recorder.reset()
+            images = []
+            done = False
+            while not done:
+                images.append(env.render(mode='rgb_array'))
+                _, _, done, _ = recorder.step(env.action_space.sample())
+
+        frames = frame_export.render_records(
+            TrajectoryReader(path).episode(0), 1024, 1024)
+        np.testing.assert_array_equal(frames, images)
+
+        records, _ = play_shard(0, 1)
+        frames = frame_export.render_records(records, 32, 32)
+        self.assertEqual(frames.shape, (len(records), 32, 32, 4))
+
+    def test_save_npz(self):
+        frames = frame_export.render_episode(play_episode()[0], 32, 32)
+        path = os.path.join(self.directory, 'episode.npz')
+        frame_export.save_npz(path, frames)
+        np.testing.assert_array_equal(np.load(path)['frames'], frames)
+
+    def test_save_pngs(self):
+        frames = frame_export.render_episode(play_episode()[0][:3], 32, 48)
+        paths = frame_export.save_pngs(self.directory, frames)
+        self.assertEqual(len(paths), 3)
+        with open(paths[-1], 'rb') as png_file:
+            data = png_file.read()
+        self.assertEqual(data[:8], b'\x89PNG\r\n\x1a\n')
+        width, height = struct.unpack('>II', data[16:24])
+        self.assertEqual((height, width), (32, 48))
+        idat = data.index(b'IDAT')
+        size, = struct.unpack('>I', data[idat - 4:idat])
+        rows = np.frombuffer(zlib.decompress(data[idat + 4:idat + 4 + size]),
+                             dtype=np.uint8).reshape(height, -1)
+        np.testing.assert_array_equal(rows[:, 1:].reshape(frames[-1].shape),
+                                      frames[-1])
+
+    @unittest.skipUnless(shutil.which('ffmpeg'), 'ffmpeg is not installed')
+    def test_save_video(self):
+        frames = frame_export.render_episode(play_episode()[0], 63, 63)
+        path = os.path.join(self.directory, 'episode.mp4')
+        frame_export.save_video(path, frames)
+        self.assertGreater(os.path.getsize(path), 0)
+
+    def test_save_video_without_ffmpeg(self):
+        with self.assertRaises(error.DependencyNotInstalled):
+            frame_export.save_video('episode.mp4', [], ffmpeg='no-ffmpeg')
+
+
+if __name__ == '__main__':
+    unittest.main()
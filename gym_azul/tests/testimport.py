@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ('stable_baselines', 'tensorflow', 'matplotlib')
+
+
+class TestImport(unittest.TestCase):
+    def test_make_env_skips_heavy_modules(self):
+        code = ("import sys, gym, gym_azul\n"
+                "env = gym.make('azul-v0')\n"
+                "env.step(env.action_space.sample())\n"
+                "print(' '.join(m for m in %r if m in sys.modules))"
+                % (HEAVY_MODULES,))
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        self.assertEqual(output.strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.inference_server import InferenceServer
+
+
+class EchoModel:
+    def action_probability(self, observations):
+        # One-hot on the first field of each observation
+        factory_probs = np.eye(6)[observations[:, 0] % 6]
+        return (factory_probs, np.full((len(observations), 5), 0.2),
+                np.full((len(observations), 5), 0.2))
+
+
+class FailingModel:
+    def action_probability(self, observations):
+        raise ValueError('bad batch of %d' % len(observations))
+
+
+def load_echo_model(model_path):
+    return EchoModel()
+
+
+def load_failing_model(model_path):
+    return FailingModel()
+
+
+def load_missing_model(model_path):
+    raise FileNotFoundError(model_path)
+
+
+class TestInferenceServer(unittest.TestCase):
+    NUM_CLIENTS = 8
+
+    def test_responses_reach_their_client(self):
+        server = InferenceServer('echo', max_batch_size=4, max_wait=0.01,
+                                 loader=load_echo_model)
+        clients = [server.client() for _ in range(self.NUM_CLIENTS)]
+        results = {}
+
+        def run(client):
+            for i in range(20):
+                observation = np.array([client.client_id + i, 0])
+                probabilities = client.action_probability(observation)
+                results[client.client_id, i] = np.argmax(probabilities[0])
+
+        with server:
+            threads = [threading.Thread(target=run, args=(client,))
+                       for client in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(server.num_requests.value, self.NUM_CLIENTS * 20)
+        self.assertLessEqual(server.mean_batch_size, 4)
+        for (client_id, i), factory_idx in results.items():
+            self.assertEqual(factory_idx, (client_id + i) % 6)
+
+    def test_batch_from_one_client(self):
+        server = InferenceServer('echo', max_batch_size=4, max_wait=10,
+                                 loader=load_echo_model)
+        clients = [server.client(), server.client()]
+        observations = np.array([[i, 0] for i in range(7)])
+        with server:
+            start = time.perf_counter()
+            probabilities = clients[1].action_probability(observations)
+        # The only batch holds more than max_batch_size observations, so
+        # it does not wait for the other client
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(probabilities[0].shape, (7, 6))
+        np.testing.assert_array_equal(probabilities[0].argmax(axis=1),
+                                      np.arange(7) % 6)
+        self.assertEqual(server.num_batches.value, 1)
+        self.assertEqual(server.num_requests.value, 7)
+
+    def test_single_client_does_not_wait(self):
+        server = InferenceServer('echo', max_wait=10, loader=load_echo_model)
+        client = server.client()
+        with server:
+            start = time.perf_counter()
+            for i in range(3):
+                client.action_probability(np.array([[i, 0]]))
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_azul_env_adversary(self):
+        server = InferenceServer('echo', loader=load_echo_model)
+        envs = [AzulEnv(adv_model=server.client()) for _ in range(4)]
+        with server:
+            for env in envs:
+                env.reset()
+                for _ in range(20):
+                    picks = np.flatnonzero(env.action_masks())
+                    action = np.array(np.unravel_index(
+                        picks[0], env.action_space.nvec))
+                    _, _, done, _ = env.step(action)
+                    if done:
+                        env.reset()
+        self.assertEqual(server.num_requests.value, 4 * 20)
+
+    def test_errors_reach_clients(self):
+        for loader, error in ((load_failing_model, ValueError),
+                              (load_missing_model, FileNotFoundError)):
+            server = InferenceServer('missing.pkl', loader=loader)
+            client = server.client()
+            with server:
+                for _ in range(2):  # the server keeps running
+                    with self.assertRaises(error):
+                        client.action_probability(np.zeros((1, 2), int))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from gym_azul.envs.model_cache import ModelCache
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.directory.name, 'model%d.zip' % i)
+            open(path, 'w').close()
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_once(self):
+        loader = Mock(side_effect=lambda path: object())
+        cache = ModelCache(loader)
+        model = cache.get(self.paths[0])
+        self.assertIs(cache.get(self.paths[0]), model)
+        self.assertIs(cache.get(self.paths[0][:-len('.zip')]), model)
+        loader.assert_called_once_with(self.paths[0])
+
+    def test_reload_modified(self):
+        loader = Mock(side_effect=lambda path: object())
+        cache = ModelCache(loader)
+        model = cache.get(self.paths[0])
+        mtime = os.path.getmtime(self.paths[0])
+        os.utime(self.paths[0], (mtime + 10, mtime + 10))
+        self.assertIsNot(cache.get(self.paths[0]), model)
+        self.assertEqual(cache.num_loads, 2)
+
+    def test_evict_least_recently_used(self):
+        loader = Mock(side_effect=lambda path: object())
+        cache = ModelCache(loader, max_size=2)
+        first = cache.get(self.paths[0])
+        cache.get(self.paths[1])
+        cache.get(self.paths[0])
+        cache.get(self.paths[2])  # evicts paths[1]
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get(self.paths[0]), first)
+        self.assertEqual(cache.num_loads, 3)
+        cache.get(self.paths[1])
+        self.assertEqual(cache.num_loads, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
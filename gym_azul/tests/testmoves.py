@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.moves import generate_moves, perft
+from gym_azul.envs.wall import Wall
+
+
+class TestMoves(unittest.TestCase):
+    def test_generate_moves(self):
+        for wall_type in AzulEnv.WALL_TYPES:
+            env = AzulEnv(adversary='greedy', wall_type=wall_type)
+            env.seed(0)
+            for _ in range(3):
+                env.reset()
+                done = False
+                while not done:
+                    state = env.get_state()
+                    moves, rewards = generate_moves(env.factories, env.wall)
+                    self.assertEqual(env.get_state(), state)
+                    np.testing.assert_array_equal(
+                        np.ravel_multi_index(moves.T, (6, 5, 5)),
+                        np.flatnonzero(env.action_masks()))
+
+                    wall_state = env.wall.get_state()
+                    for (factory_idx, color_idx, row_idx), reward in zip(
+                            moves, rewards):
+                        wall = Wall(env.NUM_COLORS)
+                        wall.set_state(wall_state)
+                        self.assertEqual(reward, wall.add_tiles(
+                            color_idx, row_idx,
+                            env.factories.state[factory_idx, color_idx],
+                            factory_idx == 0 and
+                            env.factories.first_player_table))
+                    move = moves[env.np_random.randint(len(moves))]
+                    _, _, done, _ = env.step(move)
+
+    def test_perft(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        state = env.get_state()
+        moves, _ = generate_moves(env.factories, env.wall)
+        self.assertEqual(perft(env, 1), len(moves))
+
+        count = 0
+        for factory_idx, color_idx, row_idx in moves:
+            child = env.clone()
+            num_tiles, _, first_player_token = \
+                child.factories.pick_tiles(factory_idx, color_idx)
+            child.wall.add_tiles(color_idx, row_idx, num_tiles,
+                                 first_player_token)
+            count += len(generate_moves(child.factories,
+                                        child.adversary.wall)[0])
+        self.assertEqual(perft(env, 2), count)
+        self.assertEqual(env.get_state(), state)
+
+        bitboard_env = AzulEnv(wall_type='bitboard')
+        bitboard_env.set_state(state)
+        self.assertEqual(perft(bitboard_env, 3), perft(env, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_azul import cli
+from gym_azul.selfplay import MANIFEST_NAME, SHARD_NAME, generate, \
+    play_shard
+
+
+class TestSelfPlay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_play_shard(self):
+        records, scores = play_shard(3, 4, seed=1)
+        self.assertEqual(records['done'].sum(), 4)
+        self.assertTrue(records['done'][-1])
+        self.assertEqual(scores.shape, (4, 2))
+        # every recorded move picks tiles
+        factories = records['observation'][:, :30].reshape(-1, 6, 5)
+        factory_idx, color_idx, _ = records['action'].T
+        self.assertTrue(np.all(factories[np.arange(len(records)),
+                                         factory_idx, color_idx] > 0))
+
+        same_records, same_scores = play_shard(3, 4, seed=1)
+        np.testing.assert_array_equal(records, same_records)
+        other_records, _ = play_shard(4, 4, seed=1)
+        self.assertFalse(np.array_equal(
+            records['action'][:10], other_records['action'][:10]))
+
+    def test_generate_and_resume(self):
+        messages = []
+        self.assertEqual(generate(self.directory, 25, shard_size=10,
+                                  num_workers=2, log=messages.append), 25)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         [MANIFEST_NAME] + [SHARD_NAME % i for i in range(3)])
+        shard = np.load(os.path.join(self.directory, SHARD_NAME % 2))
+        self.assertEqual(len(shard['scores']), 5)
+        self.assertEqual(shard['records']['done'].sum(), 5)
+
+        os.remove(os.path.join(self.directory, SHARD_NAME % 1))
+        messages = []
+        self.assertEqual(generate(self.directory, 25, shard_size=10,
+                                  num_workers=2, log=messages.append), 10)
+        self.assertIn('resuming: 2 of 3 shards already written', messages)
+
+        for kwargs in ({'shard_size': 5}, {'seed': 1},
+                       {'adversary': 'greedy'}):
+            with self.assertRaises(ValueError):
+                generate(self.directory, 25, **dict(
+                    dict(shard_size=10, num_workers=1), **kwargs))
+        os.remove(os.path.join(self.directory, MANIFEST_NAME))
+        with self.assertRaises(ValueError):
+            generate(self.directory, 25, shard_size=10, num_workers=1)
+
+    def test_cli(self):
+        args = cli.build_parser().parse_args(
+            ['selfplay', self.directory, '--games', '3', '--workers', '1'])
+        self.assertEqual(args.function, cli.selfplay)
+        self.assertEqual((args.games, args.shard_size, args.workers),
+                         (3, 1000, 1))
+
+        args = cli.build_parser().parse_args(
+            ['selfplay', self.directory, '--player', 'ppo2'])
+        with self.assertRaises(SystemExit):
+            args.function(args)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.shared_memory_vec_env import SharedMemoryVecEnv
+
+
+class TestSharedMemoryVecEnv(unittest.TestCase):
+    NUM_ENVS = 6
+    NUM_STEPS = 200
+
+    def test_same_games_as_azul_env(self):
+        vec_env = SharedMemoryVecEnv(self.NUM_ENVS, num_workers=3, seed=10)
+        envs = [AzulEnv() for _ in range(self.NUM_ENVS)]
+        for i, env in enumerate(envs):
+            env.seed(10 + i)
+
+        try:
+            observations = vec_env.reset()
+            for i, env in enumerate(envs):
+                np.testing.assert_array_equal(observations[i], env.reset())
+
+            np_random = np.random.RandomState(0)
+            for _ in range(self.NUM_STEPS):
+                actions = np_random.randint(vec_env.action_space.nvec,
+                                            size=(self.NUM_ENVS, 3))
+                observations, rewards, dones, infos = vec_env.step(actions)
+                for i, env in enumerate(envs):
+                    observation, reward, done, info = env.step(actions[i])
+                    self.assertEqual(rewards[i], reward)
+                    self.assertEqual(dones[i], done)
+                    self.assertEqual(infos[i].get('info'), info.get('info'))
+                    if done:
+                        np.testing.assert_array_equal(
+                            infos[i]['terminal_observation'], observation)
+                        observation = env.reset()
+                    np.testing.assert_array_equal(observations[i],
+                                                  observation)
+                    np.testing.assert_array_equal(infos[i]['action_mask'],
+                                                  env.action_masks())
+        finally:
+            vec_env.close()
+
+    def test_profiling(self):
+        vec_env = SharedMemoryVecEnv(self.NUM_ENVS, num_workers=2,
+                                     env_kwargs={'profile': True})
+        try:
+            vec_env.reset()
+            for _ in range(10):
+                vec_env.step(np.zeros((self.NUM_ENVS, 3), dtype=int))
+            stats = vec_env.stats()
+        finally:
+            vec_env.close()
+        self.assertEqual(stats['step']['calls'], 10 * self.NUM_ENVS)
+        self.assertEqual(stats['empty_pick']['calls'],
+                         10 * self.NUM_ENVS)  # color 0 of the empty center
+
+    def test_observation_dtype(self):
+        vec_env = SharedMemoryVecEnv(
+            2, num_workers=1, seed=0,
+            env_kwargs={'observation_dtype': np.float32})
+        env = AzulEnv(observation_dtype=np.float32)
+        env.seed(1)
+        try:
+            observations = vec_env.reset()
+        finally:
+            vec_env.close()
+        self.assertEqual(observations.dtype, np.float32)
+        np.testing.assert_array_equal(observations[1], env.reset())
+
+    def test_vec_env_methods(self):
+        vec_env = SharedMemoryVecEnv(self.NUM_ENVS, num_workers=2, seed=0)
+        env = AzulEnv()
+        try:
+            self.assertEqual(vec_env.seed(5), list(range(5, 11)))
+            env.seed(8)
+            np.testing.assert_array_equal(vec_env.reset()[3], env.reset())
+
+            actions = np.zeros((self.NUM_ENVS, 3), dtype=int)
+            actions[:, 0] = 1
+            vec_env.step_async(actions)
+            observations = vec_env.step_wait()[0]
+            np.testing.assert_array_equal(observations[3],
+                                          env.step(actions[3])[0])
+
+            self.assertEqual(vec_env.get_attr('reward_type'),
+                             ['score'] * self.NUM_ENVS)
+            vec_env.set_attr('reward_type', 'win', indices=[4, 1])
+            self.assertEqual(vec_env.get_attr('reward_type', [1, 0, 4]),
+                             ['win', 'score', 'win'])
+            self.assertEqual(vec_env.env_method('get_state', False,
+                                                indices=3),
+                             [env.get_state(False)])
+            with self.assertRaises(AttributeError):
+                vec_env.env_method('missing')
+            self.assertEqual(vec_env.get_attr('num_actions'),
+                             [1] * self.NUM_ENVS)  # still usable
+            self.assertIsNotNone(
+                vec_env.getattr_depth_check('num_envs', True))
+        finally:
+            vec_env.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
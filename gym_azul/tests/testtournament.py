@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.adversary import (ADVERSARIES, RandomAdversary,
+                                     register_adversary)
+from gym_azul.tournament import (Tournament, fit_elo, parse_policy,
+                                 play_match, separated)
+
+
+class FirstLineAdversary(RandomAdversary):
+    """Always fills the first pattern line."""
+
+    def act(self):
+        factory_idx, color_idx, _ = super().act()
+        return factory_idx, color_idx, 0
+
+
+class TestTournament(unittest.TestCase):
+    def setUp(self):
+        register_adversary('test-first-line', FirstLineAdversary)
+
+    def tearDown(self):
+        del ADVERSARIES['test-first-line']
+
+    def test_parse_policy(self):
+        self.assertEqual(parse_policy('random'), ('random', None))
+        self.assertEqual(parse_policy('ppo2:models/a.zip'),
+                         ('ppo2', 'models/a.zip'))
+
+    def test_play_match(self):
+        task = (0, 1, 'random', 'test-first-line', 6, [0, 0, 0, 1])
+        idx_a, idx_b, scores = play_match(task)
+        self.assertEqual((idx_a, idx_b), (0, 1))
+        self.assertEqual(scores.shape, (6, 2))
+        _, _, same_scores = play_match(task)
+        np.testing.assert_array_equal(scores, same_scores)
+
+    def test_fit_elo(self):
+        np_random = np.random.RandomState(0)
+        true_ratings = np.array([-200., 0., 200.])
+        games = np.full((3, 3), 2000) * (1 - np.eye(3, dtype=int))
+        expected = 1 / (1 + 10 ** ((true_ratings[None, :] -
+                                    true_ratings[:, None]) / 400))
+        points = np.triu(np_random.binomial(games, expected), 1)
+        points = points + np.tril(games - points.T, -1)
+
+        ratings, covariance = fit_elo(points, games)
+        np.testing.assert_allclose(ratings, true_ratings, atol=20)
+        self.assertAlmostEqual(ratings.sum(), 0)
+        self.assertTrue(separated(ratings, covariance))
+        self.assertFalse(separated(ratings, covariance * 1e4))
+
+    def test_unbeaten_policy(self):
+        ratings, _ = fit_elo(np.array([[0, 10], [0, 0]]),
+                             np.array([[0, 10], [10, 0]]))
+        self.assertTrue(np.all(np.isfinite(ratings)))
+        self.assertGreater(ratings[0], ratings[1])
+
+    def test_early_stop(self):
+        messages = []
+        league = Tournament(['test-first-line', 'random'], games_per_round=10,
+                            max_rounds=20, num_workers=1)
+        league.run(log=messages.append)
+        self.assertLess(league.num_rounds, 20)
+        self.assertEqual(league.games[0, 1], 10 * league.num_rounds)
+        ratings, _ = league.ratings()
+        self.assertEqual(ratings[0] > ratings[1],
+                         league.points[0, 1] > league.points[1, 0])
+        self.assertTrue(messages[-1].endswith(' separated'))
+        self.assertEqual(league.score_quantiles().shape, (2, 5))
+        self.assertIn('test-first-line', league.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
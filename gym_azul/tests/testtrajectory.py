@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import gc
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.trajectory import TrajectoryReader, TrajectoryRecorder
+
+
+class TestTrajectory(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'games.trj')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def recorder(self, buffer_size=16):
+        env = AzulEnv()
+        env.seed(0)
+        return TrajectoryRecorder(env, self.path, buffer_size=buffer_size)
+
+    def play(self, recorder, num_episodes):
+        env = recorder.unwrapped
+        episodes = []
+        for _ in range(num_episodes):
+            steps = []
+            observation = recorder.reset()
+            done = False
+            while not done:
+                action = env.action_space.sample()
+                previous = observation.copy()
+                observation, reward, done, _ = recorder.step(action)
+                steps.append((previous, action, reward, done))
+            episodes.append(steps)
+        return episodes
+
+    def test_replay(self):
+        with self.recorder() as recorder:
+            episodes = self.play(recorder, 3)
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(reader.num_episodes, 3)
+        self.assertEqual(len(reader), sum(map(len, episodes)))
+        self.assertEqual(reader.records.dtype.itemsize, 73)
+        for steps, records in zip(episodes, reader.episodes()):
+            observations, actions, rewards, dones = zip(*steps)
+            np.testing.assert_array_equal(records['observation'],
+                                          observations)
+            np.testing.assert_array_equal(records['action'], actions)
+            np.testing.assert_array_equal(records['reward'], rewards)
+            np.testing.assert_array_equal(records['done'], dones)
+        np.testing.assert_array_equal(reader.episode(1),
+                                      list(reader.episodes())[1])
+        self.assertIsInstance(reader.observations.base, np.memmap)
+
+    def test_encoded_env(self):
+        env = AzulEnv(observation_encoding='one_hot')
+        env.seed(0)
+        raw_env = AzulEnv()
+        raw_env.seed(0)
+        with TrajectoryRecorder(env, self.path) as recorder:
+            recorder.reset()
+            raw_observations = [raw_env.reset().copy()]
+            for _ in range(10):
+                action = env.action_space.sample()
+                recorder.step(action)
+                raw_observations.append(raw_env.step(action)[0].copy())
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(reader.records.dtype.itemsize, 73)
+        np.testing.assert_array_equal(reader.observations,
+                                      raw_observations[:10])
+
+    def test_append(self):
+        with self.recorder() as recorder:
+            first = self.play(recorder, 1)
+        with self.recorder() as recorder:
+            self.play(recorder, 2)
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(reader.num_episodes, 3)
+        self.assertEqual(len(reader.episode(0)), len(first[0]))
+
+        with open(self.path, 'r+b') as trajectory_file:
+            trajectory_file.write(b'AZULTRJ0')
+        with self.assertRaises(ValueError):
+            TrajectoryRecorder(AzulEnv(), self.path)
+        with self.assertRaises(ValueError):
+            TrajectoryReader(self.path)
+
+    def test_read_while_recording(self):
+        with self.recorder(buffer_size=4096) as recorder:
+            episodes = self.play(recorder, 1)
+            self.assertEqual(len(TrajectoryReader(self.path)), 0)
+            recorder.flush()
+            self.assertEqual(len(TrajectoryReader(self.path)),
+                             len(episodes[0]))
+
+            with open(self.path, 'ab') as trajectory_file:
+                trajectory_file.write(b'\x00' * 10)
+            self.assertEqual(len(TrajectoryReader(self.path)),
+                             len(episodes[0]))
+
+    def test_flush_without_close(self):
+        with self.assertRaises(RuntimeError):
+            with self.recorder(buffer_size=4096) as recorder:
+                first = self.play(recorder, 1)
+                raise RuntimeError
+        self.assertEqual(TrajectoryReader(self.path).num_episodes, 1)
+
+        recorder = self.recorder(buffer_size=4096)
+        second = self.play(recorder, 1)
+        del recorder
+        gc.collect()
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(reader.num_episodes, 2)
+        self.assertEqual(len(reader), len(first[0]) + len(second[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import unittest
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.envs.moves import generate_moves
+from gym_azul.envs.transposition_table import TranspositionTable
+from gym_azul.envs.zobrist import ZobristFactories, ZobristWall
+
+
+def make_env(**kwargs):
+    return AzulEnv(wall_type='zobrist', factories_type='zobrist', **kwargs)
+
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental_hash(self):
+        env = make_env(adversary='greedy')
+        env.seed(0)
+        hashes = {}
+        for _ in range(3):
+            env.reset()
+            done = False
+            while not done:
+                for part in (env.factories, env.wall, env.adversary.wall):
+                    self.assertEqual(part.hash, part.compute_hash())
+                # equal hashes only for equal positions
+                position = env.get_state(include_rng=False)[:-8]
+                self.assertEqual(
+                    hashes.setdefault(env.position_hash(), position),
+                    position)
+
+                moves, _ = generate_moves(env.factories, env.wall)
+                move = moves[env.np_random.randint(len(moves))]
+                _, _, done, _ = env.step(move)
+
+    def test_set_state(self):
+        env = make_env()
+        env.seed(0)
+        env.reset()
+        state = env.get_state()
+        position_hash = env.position_hash()
+        for _ in range(10):
+            moves, _ = generate_moves(env.factories, env.wall)
+            env.step(moves[0])
+        self.assertNotEqual(env.position_hash(), position_hash)
+        env.set_state(state)
+        self.assertEqual(env.position_hash(), position_hash)
+
+    def test_transpositions(self):
+        walls = [ZobristWall(AzulEnv.NUM_COLORS) for _ in range(2)]
+        walls[0].add_tiles(0, 2, 1, False)
+        walls[0].add_tiles(1, 3, 4, True)
+        walls[1].add_tiles(1, 3, 4, False)
+        walls[1].add_tiles(0, 2, 1, True)
+        self.assertEqual(walls[0].hash, walls[1].hash)
+        self.assertNotEqual(walls[0].hash, 0)
+
+        factories = [
+            ZobristFactories(AzulEnv.NUM_COLORS, AzulEnv.FACTORY_SIZE,
+                             AzulEnv.NUM_FACTORIES, np.random.RandomState(0))
+            for _ in range(2)]
+        picks = [divmod(int(factories[0].legal_picks()[i]),
+                        AzulEnv.NUM_COLORS) for i in (0, -1)]
+        for pick in picks:
+            factories[0].pick_tiles(*pick)
+        for pick in reversed(picks):
+            factories[1].pick_tiles(*pick)
+        self.assertEqual(factories[0].hash, factories[1].hash)
+
+    def test_same_as_base_classes(self):
+        env = AzulEnv()
+        env.seed(0)
+        env.reset()
+        zobrist_env = make_env()
+        zobrist_env.seed(0)
+        zobrist_env.reset()
+        for _ in range(60):
+            moves, _ = generate_moves(env.factories, env.wall)
+            move = moves[env.np_random.randint(len(moves))]
+            zobrist_env.np_random.randint(len(moves))
+            observation, reward, done, _ = env.step(move)
+            zobrist_observation, zobrist_reward, _, _ = \
+                zobrist_env.step(move)
+            np.testing.assert_array_equal(zobrist_observation, observation)
+            self.assertEqual(zobrist_reward, reward)
+            if done:
+                break
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_get_put(self):
+        table = TranspositionTable(8)
+        self.assertIsNone(table.get(5))
+        table.put(5, 'a', depth=2)
+        self.assertEqual(table.get(5), 'a')
+        self.assertEqual(table.get(5, depth=2), 'a')
+        self.assertIsNone(table.get(5, depth=3))
+        self.assertEqual(table.get(6, default=0), 0)
+        self.assertEqual(len(table), 1)
+
+        stats = table.stats()
+        self.assertEqual(stats['probes'], 5)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['hit_rate'], 0.4)
+        self.assertEqual(stats['load'], 1 / 8)
+
+    def test_replacement(self):
+        table = TranspositionTable(4)  # buckets of keys 0, 2, ... and 1, 3
+        table.put(0, 'deep', depth=5)
+        table.put(2, 'shallow', depth=1)
+        self.assertEqual(table.get(0), 'deep')
+        self.assertEqual(table.get(2), 'shallow')
+
+        table.put(4, 'newer', depth=1)  # replaces the shallow entry
+        self.assertIsNone(table.get(2))
+        self.assertEqual(table.get(0), 'deep')
+        self.assertEqual(table.get(4), 'newer')
+
+        table.put(6, 'deeper', depth=6)  # demotes the deep entry
+        self.assertEqual(table.get(6), 'deeper')
+        self.assertEqual(table.get(0), 'deep')
+        self.assertIsNone(table.get(4))
+        self.assertEqual(table.stats()['replacements'], 2)
+
+        table.put(0, 'deepest', depth=7)  # moves up, no duplicate
+        self.assertEqual(table.get(0), 'deepest')
+        self.assertEqual(len(table), 1 + 1)
+
+        table.put(0, 'shallower', depth=1)  # the deeper entry is kept
+        self.assertEqual(table.get(0, depth=4), 'deepest')
+        self.assertEqual(len(table), 2)
+
+        table.clear()
+        table.put(1, 'shallow', depth=1)
+        table.put(3, 'deep', depth=5)  # demotes the shallow entry
+        table.put(1, 'deeper', depth=6)  # moves up, no duplicate
+        self.assertEqual(table.keys, [None, None, 1, 3])
+        self.assertEqual(table.get(1, depth=6), 'deeper')
+        self.assertEqual(table.get(3, depth=5), 'deep')
+
+        table.clear()
+        self.assertEqual(len(table), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
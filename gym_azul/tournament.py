@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Gabriel Mendonça
+
+import itertools
+import multiprocessing as mp
+
+import numpy as np
+
+from gym_azul.envs.azul_env import AzulEnv
+from gym_azul.selfplay import make_player
+
+ELO_SCALE = 400 / np.log(10)
+
+
+def parse_policy(spec):
+    """Splits 'name' or 'name:model_path' into (name, model_path)."""
+    name, _, model_path = spec.partition(':')
+    return name, model_path or None
+
+
+def play_match(task):
+    """Plays games between two policies, alternating the first seat.
+
+    Returns the (score_a, score_b) of every game.
+    """
+    idx_a, idx_b, spec_a, spec_b, num_games, seed = task
+    seeds = np.random.SeedSequence(seed).generate_state(2)
+    seats = []
+    for seed, (first, second) in zip(seeds, [(spec_a, spec_b),
+                                             (spec_b, spec_a)]):
+        adversary, adversary_model = parse_policy(second)
+        env = AzulEnv(adversary=adversary, adv_model_path=adversary_model)
+        env.seed(int(seed))
+        seats.append((env, make_player(env, *parse_policy(first))))
+
+    scores = np.zeros((num_games, 2), dtype=np.int16)
+    for game_idx in range(num_games):
+        env, agent = seats[game_idx % 2]
+        env.reset()
+        done = False
+        while not done:
+            _, _, done, _ = env.step(np.array(agent.act()))
+        scores[game_idx] = env.score, env.adversary.score
+        if game_idx % 2:
+            scores[game_idx] = scores[game_idx, ::-1]
+    return idx_a, idx_b, scores
+
+
+def fit_elo(points, games, prior_games=1, num_iterations=50):
+    """Bradley-Terry ratings on the Elo scale, centered on zero.
+
+    `points[i, j]` is what policy i scored against j (1 per win, 0.5 per
+    draw) in `games[i, j]` games. Every pair also gets `prior_games`
+    virtual draws, so that unbeaten policies have finite ratings. Returns
+    the ratings and their covariance matrix.
+    """
+    num_policies = len(points)
+    off_diagonal = 1 - np.eye(num_policies)
+    points = points + prior_games / 2 * off_diagonal
+    games = games + prior_games * off_diagonal
+    strengths = np.zeros(num_policies)
+    for _ in range(num_iterations):
+        expected = 1 / (1 + np.exp(strengths[None, :] - strengths[:, None]))
+        gradient = np.sum(points - games * expected, axis=1)
+        weights = games * expected * (1 - expected)
+        information = np.diag(weights.sum(axis=1)) - weights
+        step = np.linalg.pinv(information) @ gradient
+        strengths += step
+        strengths -= strengths.mean()
+        if np.abs(step).max() < 1e-9:
+            break
+    covariance = np.linalg.pinv(information) * ELO_SCALE ** 2
+    return strengths * ELO_SCALE, covariance
+
+
+def separated(ratings, covariance, z=1.96):
+    """Whether every policy is rated apart from its neighbours in the
+    ranking by more than `z` standard errors of the difference.
+    """
+    order = np.argsort(ratings)
+    for a, b in zip(order[:-1], order[1:]):
+        variance = covariance[a, a] + covariance[b, b] - 2 * covariance[a, b]
+        if ratings[b] - ratings[a] <= z * np.sqrt(max(variance, 0)):
+            return False
+    return True
+
+
+class Tournament:
+    """Round-robin league between adversary policies.
+
+    Policies are registered adversary names, optionally followed by a
+    model path (e.g. 'ppo2:checkpoints/model_100'). Each round plays
+    `games_per_round` games for every pair of policies across a process
+    pool. Worker processes keep their loaded models in the adversaries'
+    model cache, so a model is loaded once per worker. The league stops
+    once the ratings are separated (see `separated`) after at least
+    `min_rounds` rounds, or after `max_rounds` rounds.
+    """
+
+    def __init__(self, policies, games_per_round=10, min_rounds=2,
+                 max_rounds=100, num_workers=None, seed=0, z=1.96):
+        self.policies = list(policies)
+        self.games_per_round = games_per_round
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.num_workers = num_workers
+        self.seed = seed
+        self.z = z
+
+        num_policies = len(self.policies)
+        self.points = np.zeros((num_policies, num_policies))
+        self.games = np.zeros((num_policies, num_policies), dtype=int)
+        self.scores = [[] for _ in self.policies]
+        self.num_rounds = 0
+
+    def run(self, log=print):
+        pairs = list(itertools.combinations(range(len(self.policies)), 2))
+        with mp.Pool(self.num_workers) as pool:
+            while self.num_rounds < self.max_rounds:
+                tasks = [(a, b, self.policies[a], self.policies[b],
+                          self.games_per_round,
+                          [self.seed, self.num_rounds, a, b])
+                         for a, b in pairs]
+                for result in pool.imap_unordered(play_match, tasks):
+                    self.add_results(*result)
+                self.num_rounds += 1
+
+                ratings, covariance = self.ratings()
+                stop = (self.num_rounds >= self.min_rounds and
+                        separated(ratings, covariance, self.z))
+                log('round %d: %d games, %s' %
+                    (self.num_rounds, self.games.sum() // 2,
+                     'separated' if stop else 'not separated'))
+                if stop:
+                    break
+        return self
+
+    def add_results(self, idx_a, idx_b, scores):
+        score_a, score_b = scores.T.astype(int)
+        points = np.sum(score_a > score_b) + 0.5 * np.sum(score_a == score_b)
+        self.points[idx_a, idx_b] += points
+        self.points[idx_b, idx_a] += len(scores) - points
+        self.games[idx_a, idx_b] += len(scores)
+        self.games[idx_b, idx_a] += len(scores)
+        self.scores[idx_a].extend(score_a)
+        self.scores[idx_b].extend(score_b)
+
+    def ratings(self):
+        return fit_elo(self.points, self.games)
+
+    def win_rates(self):
+        """Points per game of every policy against every other one."""
+        with np.errstate(invalid='ignore'):
+            return self.points / self.games
+
+    def score_quantiles(self, quantiles=(0.1, 0.25, 0.5, 0.75, 0.9)):
+        """Quantiles of the final scores of every policy."""
+        return np.array([np.quantile(scores, quantiles) if scores
+                         else np.full(len(quantiles), np.nan)
+                         for scores in self.scores])
+
+    def summary(self):
+        """One line per policy, from the highest rated to the lowest."""
+        ratings, covariance = self.ratings()
+        errors = self.z * np.sqrt(np.maximum(np.diag(covariance), 0))
+        lines = ['%-30s %7s %6s %8s %6s %6s' %
+                 ('policy', 'elo', '+/-', 'win rate', 'score', 'std')]
+        for i in np.argsort(-ratings):
+            scores = np.array(self.scores[i] or [np.nan])
+            lines.append('%-30s %7.1f %6.1f %8.3f %6.1f %6.1f' %
+                         (self.policies[i], ratings[i], errors[i],
+                          self.points[i].sum() / max(self.games[i].sum(), 1),
+                          scores.mean(), scores.std()))
+        return '\n'.join(lines)
@@ -2,5 +2,8 @@ from setuptools import setup
 
 setup(name='gym_azul',
       version='0.0.1',
-      install_requires=['gym']
+      install_requires=['gym'],
+      entry_points={
+          'console_scripts': ['gym_azul=gym_azul.cli:main'],
+      }
 )